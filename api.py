@@ -0,0 +1,442 @@
+"""
+🏛️ SchemeMitra - Headless HTTP API
+
+JSON endpoints for partner integrations (chatbots, SMS gateways) that need
+search, match scores and eligibility explanations without a browser session
+or a Streamlit rerun. It runs as a separate ASGI process and shares the
+catalog (schemes.json, hot-reloaded), the on-disk explanation cache and the
+Azure HTTP client code with the Streamlit app:
+
+    uvicorn api:api --host 0.0.0.0 --port 8000 --workers 4
+    python api.py --port 8000
+
+Endpoints:
+    GET  /health                 catalog version and scheme count
+    GET  /ready                  start-up report; 503 until the background warm-up has finished
+    GET  /schemes/{scheme_id}    one scheme record
+    POST /search                 {"query", "ministry", "beneficiary", "category", "ranked", "semantic", "profile", "limit", "offset"}
+    POST /score                  {"profile", "scheme_ids"}
+    POST /explain                {"scheme_id", "profile"}
+    POST /batch                  {"requests": [{"op": "search" | "score" | "explain", ...}, ...]}
+    GET  /metrics                Prometheus metrics of this process
+"""
+
+import os
+import sys
+import json
+import asyncio
+import logging
+import argparse
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+# Importing the app outside `streamlit run` is supported ("bare mode"); silence its warnings
+logging.getLogger("streamlit").setLevel(logging.ERROR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import app as schememitra
+logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+logger = logging.getLogger("schememitra.api")
+
+DEFAULT_PROFILE = "General user"
+
+# Results per search unless the request asks for fewer
+API_DEFAULT_LIMIT = 20
+API_MAX_LIMIT = int(os.getenv("SCHEMEMITRA_API_MAX_LIMIT", "100"))
+
+# Upper bound on operations in one /batch request
+API_MAX_BATCH = int(os.getenv("SCHEMEMITRA_API_MAX_BATCH", "100"))
+
+# Retry-After (seconds) sent with 503 answers while Azure OpenAI calls are throttled locally
+API_BUSY_RETRY_AFTER = int(os.getenv("SCHEMEMITRA_API_BUSY_RETRY_AFTER", "5"))
+
+API_REQUEST_METRIC = "schememitra_api_request_duration_seconds"
+schememitra.METRIC_HELP[API_REQUEST_METRIC] = "Latency of headless API requests by route and status."
+
+class ApiError(Exception):
+    """Client error reported as {"error": message} with the given HTTP status."""
+
+    def __init__(self, message: str, status: int = 400, retry_after: Optional[int] = None):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        self.retry_after = retry_after
+
+    def as_entry(self) -> Dict:
+        """The error as one /batch response entry."""
+        entry = {"error": self.message, "status": self.status}
+        if self.retry_after is not None:
+            entry["retry_after"] = self.retry_after
+        return entry
+
+# ============================================================================
+# OPERATIONS (shared by the single endpoints and /batch)
+# ============================================================================
+
+def current_catalog() -> schememitra.SchemeCatalog:
+    """The latest catalog snapshot (the store re-checks schemes.json every few seconds)."""
+    return schememitra.get_catalog_store().current()
+
+def _text(payload: Dict, field: str, default: str = "") -> str:
+    value = payload.get(field, default)
+    if value is None:
+        return default
+    if not isinstance(value, str):
+        raise ApiError(f"'{field}' must be a string")
+    return value
+
+def _int(payload: Dict, field: str, default: int, minimum: int, maximum: int) -> int:
+    value = payload.get(field, default)
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ApiError(f"'{field}' must be an integer")
+    return min(max(minimum, value), maximum)
+
+def _bool(payload: Dict, field: str, default: bool = False) -> bool:
+    value = payload.get(field, default)
+    if value is None:
+        return default
+    if not isinstance(value, bool):
+        raise ApiError(f"'{field}' must be true or false")
+    return value
+
+def explanation_error(explanation: str) -> Optional[ApiError]:
+    """
+    The HTTP error for an explanation the app answered with a warning, or None.
+    Busy (local rate limit, or a coalesced call still running) tells the client to
+    back off; a missing configuration is ours; anything else failed upstream.
+    """
+    if explanation == schememitra.RATE_LIMITED_MESSAGE:
+        return ApiError(explanation, status=503, retry_after=API_BUSY_RETRY_AFTER)
+    if explanation == schememitra.NOT_CONFIGURED_MESSAGE:
+        return ApiError(explanation, status=503)
+    if explanation.startswith("⚠️"):
+        return ApiError(explanation, status=502)
+    return None
+
+def runs_blocking(op: str, operation: Dict, catalog: schememitra.SchemeCatalog) -> bool:
+    """
+    Keep operations that may first build a catalog index (seconds on a large catalog) off the
+    event loop: semantic and ranked searches, and keyword searches and scoring until the
+    warm-up has built the search index or score matrix.
+    """
+    if op == "score":
+        needed = ['keyword_matrix']
+    elif operation.get("semantic") is True or operation.get("ranked") is True:
+        return True
+    else:
+        # A search with a profile also reads match scores
+        needed = ['search_index'] if operation.get("profile") is None else ['search_index', 'keyword_matrix']
+    return not all(catalog.has_derived(name) for name in needed)
+
+def _scheme(catalog: schememitra.SchemeCatalog, scheme_id, field: str = "scheme_id") -> Dict:
+    if not isinstance(scheme_id, str):
+        raise ApiError(f"'{field}' must be a string")
+    scheme = catalog.by_id.get(scheme_id)
+    if scheme is None:
+        raise ApiError(f"Unknown scheme id: {scheme_id}", status=404)
+    return scheme
+
+def _match_scores(catalog: schememitra.SchemeCatalog, scheme_ids: List[str], profile: str) -> List[int]:
+    """Match scores read from the catalog's precomputed score vector (memoized per profile)."""
+    matrix = schememitra.KeywordFeatureMatrix.for_schemes(catalog.schemes)
+    scores = matrix.score(profile)
+    return [int(scores[matrix.positions[scheme_id]]) for scheme_id in scheme_ids]
+
+def op_search(payload: Dict, catalog: schememitra.SchemeCatalog) -> Dict:
+    query = _text(payload, "query")
+    limit = _int(payload, "limit", API_DEFAULT_LIMIT, 0, API_MAX_LIMIT)
+    offset = _int(payload, "offset", 0, 0, len(catalog.schemes))
+    results = schememitra.filter_schemes(
+        catalog.schemes,
+        search_query=query,
+        ministry_filter=_text(payload, "ministry", "All Ministries"),
+        beneficiary_filter=_text(payload, "beneficiary", "All Types"),
+        category_filter=_text(payload, "category", "All Categories"),
+        ranked=_bool(payload, "ranked"),
+        semantic=_bool(payload, "semantic")
+    )
+    page = [dict(scheme) for scheme in results[offset:offset + limit]]
+
+    if payload.get("profile") is not None:
+        scores = _match_scores(catalog, [scheme['id'] for scheme in page], _text(payload, "profile"))
+        page = [dict(scheme, match_score=match_score) for scheme, match_score in zip(page, scores)]
+
+    return {"total": len(results), "offset": offset, "results": page}
+
+def op_score(payload: Dict, catalog: schememitra.SchemeCatalog) -> Dict:
+    profile = _text(payload, "profile", DEFAULT_PROFILE)
+    scheme_ids = payload.get("scheme_ids")
+    if not isinstance(scheme_ids, list) or not scheme_ids:
+        raise ApiError("'scheme_ids' must be a non-empty list")
+    if len(scheme_ids) > API_MAX_LIMIT:
+        raise ApiError(f"At most {API_MAX_LIMIT} scheme_ids per request")
+    if not all(isinstance(scheme_id, str) for scheme_id in scheme_ids):
+        raise ApiError("'scheme_ids' must be a list of strings")
+
+    for scheme_id in scheme_ids:
+        _scheme(catalog, scheme_id)
+    return {"profile": profile, "scores": dict(zip(scheme_ids, _match_scores(catalog, scheme_ids, profile)))}
+
+def prepare_explain(payload: Dict, catalog: schememitra.SchemeCatalog) -> Tuple[Dict, str]:
+    """Validate an explain request on the event loop before handing it to a worker thread."""
+    scheme = _scheme(catalog, payload.get("scheme_id"))
+    return scheme, _text(payload, "profile", DEFAULT_PROFILE)
+
+def op_explain(scheme: Dict, profile: str, catalog: schememitra.SchemeCatalog,
+               priority: int = schememitra.PRIORITY_INTERACTIVE) -> Dict:
+    """Blocking: may call Azure OpenAI. Run it in the thread pool."""
+    cache = schememitra.get_explanation_cache(catalog)
+    explanation = schememitra.lookup_explanation(scheme, profile, cache)
+    cached = explanation is not None
+    if cached:
+        schememitra.METRICS.increment(schememitra.CACHE_METRIC, cache="explanations", result="hit")
+    else:
+        explanation = schememitra.explain_eligibility(scheme, profile, cache=cache, priority=priority)
+    error = explanation_error(explanation)
+    if error is not None:
+        raise error
+    return {"scheme_id": scheme['id'], "profile": profile, "explanation": explanation,
+            "match_score": _match_scores(catalog, [scheme['id']], profile)[0], "cached": cached}
+
+def explain_calls(schemes: List[Dict]) -> int:
+    """Most Azure OpenAI calls op_explain_batch can have in flight at once for these schemes."""
+    if not schememitra.EXPLANATION_BATCH_MODE:
+        return len(schemes)
+    batch_size = max(1, schememitra.EXPLANATION_BATCH_SIZE)
+    return (len(schemes) + batch_size - 1) // batch_size
+
+def op_explain_batch(schemes: List[Dict], profile: str, catalog: schememitra.SchemeCatalog,
+                     max_in_flight: int = schememitra.LLM_MAX_IN_FLIGHT) -> List[Dict]:
+    """
+    Blocking: explain several schemes for one profile at background priority,
+    EXPLANATION_BATCH_SIZE schemes per structured Azure OpenAI call and up to
+    max_in_flight calls at once. Returns one response (or {"error", "status"})
+    per scheme, in order.
+    """
+    if not schememitra.EXPLANATION_BATCH_MODE:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_in_flight, len(schemes)))) as pool:
+            return list(pool.map(lambda scheme: _explain_or_error(scheme, profile, catalog), schemes))
+
+    cache = schememitra.get_explanation_cache(catalog)
+    cached = {scheme['id'] for scheme in schemes
+              if schememitra.lookup_explanation(scheme, profile, cache) is not None}
+    explanations = dict(schememitra.generate_explanations_batched(
+        schemes, profile, max_in_flight=max_in_flight, priority=schememitra.PRIORITY_BACKGROUND, cache=cache))
+    scores = dict(zip([scheme['id'] for scheme in schemes],
+                      _match_scores(catalog, [scheme['id'] for scheme in schemes], profile)))
+
+    responses = []
+    for scheme in schemes:
+        explanation = explanations[scheme['id']]
+        error = explanation_error(explanation)
+        if error is not None:
+            responses.append(error.as_entry())
+        else:
+            responses.append({"scheme_id": scheme['id'], "profile": profile, "explanation": explanation,
+                              "match_score": scores[scheme['id']], "cached": scheme['id'] in cached})
+    return responses
+
+def _explain_or_error(scheme: Dict, profile: str, catalog: schememitra.SchemeCatalog) -> Dict:
+    try:
+        return op_explain(scheme, profile, catalog, schememitra.PRIORITY_BACKGROUND)
+    except ApiError as e:
+        return e.as_entry()
+
+class ExplainSlots:
+    """
+    Azure OpenAI calls in flight in this process, at most limit (LLM_MAX_IN_FLIGHT,
+    like in the app). A batch claims one slot per call it runs at once. Claims are
+    taken one at a time, so two batches never each hold part of what the other needs.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self._free = asyncio.Semaphore(self.limit)
+        self._claiming = asyncio.Lock()
+
+    @contextlib.asynccontextmanager
+    async def claim(self, count: int = 1):
+        """Hold up to count slots (at most limit) for the block; yields how many are held."""
+        wanted = min(max(1, count), self.limit)
+        held = 0
+        try:
+            async with self._claiming:
+                while held < wanted:
+                    await self._free.acquire()
+                    held += 1
+            yield held
+        finally:
+            for _ in range(held):
+                self._free.release()
+
+async def run_explain(payload: Dict, catalog: schememitra.SchemeCatalog, slots: ExplainSlots,
+                      priority: int = schememitra.PRIORITY_INTERACTIVE) -> Dict:
+    scheme, profile = prepare_explain(payload, catalog)
+    async with slots.claim():
+        return await run_in_threadpool(op_explain, scheme, profile, catalog, priority)
+
+# ============================================================================
+# HTTP LAYER
+# ============================================================================
+
+async def read_payload(request: Request) -> Dict:
+    try:
+        payload = json.loads(await request.body() or b"{}")
+    except ValueError:
+        raise ApiError("Request body must be JSON")
+    if not isinstance(payload, dict):
+        raise ApiError("Request body must be a JSON object")
+    return payload
+
+def endpoint(route: str):
+    """Wrap a handler with error-to-JSON mapping (ApiError as its status, anything else as 500) and a latency span."""
+    def decorator(handler):
+        async def wrapped(request: Request):
+            with schememitra.METRICS.span(API_REQUEST_METRIC, route=route, status="200") as span:
+                try:
+                    return JSONResponse(await handler(request))
+                except ApiError as e:
+                    span.labels['status'] = str(e.status)
+                    headers = None if e.retry_after is None else {"Retry-After": str(e.retry_after)}
+                    return JSONResponse({"error": e.message}, status_code=e.status, headers=headers)
+                except Exception as e:
+                    # A bug answers in the same JSON shape, and the span records the 500 rather than 200
+                    span.labels['status'] = "500"
+                    logger.exception("Unexpected error in %s", route)
+                    return JSONResponse({"error": f"Unexpected error: {e}"}, status_code=500)
+        return wrapped
+    return decorator
+
+@endpoint("/health")
+async def health(request: Request) -> Dict:
+    store = schememitra.get_catalog_store()
+    catalog = store.current()
+    return {"status": "ok" if catalog.schemes else "degraded", "catalog_version": catalog.version,
+            "schemes": len(catalog.schemes), "catalog_error": store.error}
+
+@endpoint("/schemes/{scheme_id}")
+async def get_scheme(request: Request) -> Dict:
+    return dict(_scheme(current_catalog(), request.path_params["scheme_id"]))
+
+@endpoint("/search")
+async def search(request: Request) -> Dict:
+    payload = await read_payload(request)
+    catalog = current_catalog()
+    if runs_blocking("search", payload, catalog):
+        return await run_in_threadpool(op_search, payload, catalog)
+    return op_search(payload, catalog)
+
+@endpoint("/score")
+async def score(request: Request) -> Dict:
+    payload = await read_payload(request)
+    catalog = current_catalog()
+    if runs_blocking("score", payload, catalog):
+        return await run_in_threadpool(op_score, payload, catalog)
+    return op_score(payload, catalog)
+
+@endpoint("/explain")
+async def explain(request: Request) -> Dict:
+    return await run_explain(await read_payload(request), current_catalog(), request.app.state.explain_slots)
+
+BATCH_OPERATIONS = {"search": op_search, "score": op_score}
+
+@endpoint("/batch")
+async def batch(request: Request) -> Dict:
+    """
+    Run many operations against one catalog snapshot. Search and score run
+    inline once the catalog's indexes are warm; explanations are grouped by
+    profile and answered with batched Azure OpenAI calls in the thread pool
+    at background priority, behind single /explain calls. Each entry
+    succeeds or fails on its own.
+    """
+    payload = await read_payload(request)
+    operations = payload.get("requests")
+    if not isinstance(operations, list):
+        raise ApiError("'requests' must be a list")
+    if len(operations) > API_MAX_BATCH:
+        raise ApiError(f"At most {API_MAX_BATCH} operations per batch")
+
+    catalog = current_catalog()
+    responses: List[Optional[Dict]] = [None] * len(operations)
+    explains: Dict[str, List[Tuple[int, Dict]]] = {}
+
+    for index, operation in enumerate(operations):
+        try:
+            if not isinstance(operation, dict):
+                raise ApiError("Each operation must be a JSON object")
+            op = operation.get("op")
+            if op == "explain":
+                scheme, profile = prepare_explain(operation, catalog)
+                explains.setdefault(profile, []).append((index, scheme))
+                continue
+            if op not in BATCH_OPERATIONS:
+                raise ApiError(f"Unknown op: {op!r}")
+            if runs_blocking(op, operation, catalog):
+                responses[index] = await run_in_threadpool(BATCH_OPERATIONS[op], operation, catalog)
+            else:
+                responses[index] = BATCH_OPERATIONS[op](operation, catalog)
+        except ApiError as e:
+            responses[index] = e.as_entry()
+        except Exception as e:
+            # A bug in one operation must not fail the others
+            responses[index] = {"error": f"Unexpected error: {e}", "status": 500}
+
+    async def run(profile: str, entries: List[Tuple[int, Dict]]):
+        try:
+            schemes = [scheme for _, scheme in entries]
+            async with request.app.state.explain_slots.claim(explain_calls(schemes)) as in_flight:
+                results = await run_in_threadpool(op_explain_batch, schemes, profile, catalog, in_flight)
+        except Exception as e:
+            results = [{"error": f"Unexpected error: {e}", "status": 500}] * len(entries)
+        for (index, scheme), result in zip(entries, results):
+            responses[index] = result
+
+    await asyncio.gather(*(run(profile, entries) for profile, entries in explains.items()))
+    return {"responses": responses}
+
+async def ready(request: Request):
+    """Readiness probe: importing the app starts the warm-up, so hold traffic until it is done."""
+    report = schememitra.STARTUP.as_dict()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+async def metrics(request: Request):
+    return PlainTextResponse(schememitra.METRICS.render_prometheus(),
+                             media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@contextlib.asynccontextmanager
+async def lifespan(app: Starlette):
+    # Made here so the slots belong to the event loop serving this app, not whichever loop first used them
+    app.state.explain_slots = ExplainSlots(schememitra.LLM_MAX_IN_FLIGHT)
+    yield
+
+api = Starlette(lifespan=lifespan, routes=[
+    Route("/health", health, methods=["GET"]),
+    Route("/ready", ready, methods=["GET"]),
+    Route("/schemes/{scheme_id}", get_scheme, methods=["GET"]),
+    Route("/search", search, methods=["POST"]),
+    Route("/score", score, methods=["POST"]),
+    Route("/explain", explain, methods=["POST"]),
+    Route("/batch", batch, methods=["POST"]),
+    Route("/metrics", metrics, methods=["GET"]),
+])
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the SchemeMitra headless HTTP API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (each loads its own catalog)")
+    args = parser.parse_args()
+
+    uvicorn.run("api:api", host=args.host, port=args.port, workers=args.workers, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -4,20 +4,59 @@ A modern web application to help Indians discover government schemes they are el
 Built with Streamlit, Azure OpenAI, and Azure Text Analytics.
 """
 
+import time
+
+# Start of this script run, taken before the heavier imports below (see STARTUP & READINESS)
+RUN_STARTED = time.perf_counter()
+
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 import json
 import os
+import hashlib
+import math
+import re
+import zlib
+from functools import lru_cache
+import sqlite3
+import threading
+import random
+import heapq
+import socket
+import secrets
+import atexit
+import gc
+try:
+    import fcntl
+except ImportError:  # Windows: coalescing stays in-process
+    fcntl = None
+from email.utils import parsedate_to_datetime
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from collections import OrderedDict
+from collections.abc import Mapping
+from contextlib import contextmanager
+from bisect import bisect_left
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from datetime import datetime
-from dotenv import load_dotenv
-import requests
-from typing import List, Dict, Tuple
+from urllib.parse import urlparse, unquote
+import numpy as np
+from typing import List, Dict, Tuple, Optional, Iterator
 
 # ============================================================================
 # CONFIGURATION & SETUP
 # ============================================================================
 
+# requests and dotenv are imported where they are used: requests only on AI paths (or by the
+# background warm-up), dotenv once per process, so neither is on the first render's critical path
+
+@st.cache_resource
+def load_environment() -> bool:
+    """Load .env into the environment once per process (not on every rerun)."""
+    from dotenv import load_dotenv
+    return load_dotenv()
+
 # Load environment variables
-load_dotenv()
+load_environment()
 
 # Page configuration
 st.set_page_config(
@@ -28,153 +67,2042 @@ st.set_page_config(
 )
 
 # Initialize session state
+# Bookmarks and expanded cards are sets of scheme ids: O(1) membership, and
+# per-session memory does not grow with the catalog
 if 'bookmarked_schemes' not in st.session_state:
-    st.session_state.bookmarked_schemes = []
+    st.session_state.bookmarked_schemes = set()
 
 if 'language' not in st.session_state:
     st.session_state.language = 'en'
 
+# Profile form inputs (widget keys, seeded here so a restored session can override them)
+if 'profile_age' not in st.session_state:
+    st.session_state.profile_age = 30
+
+if 'profile_skills' not in st.session_state:
+    st.session_state.profile_skills = ""
+
 if 'accessibility_mode' not in st.session_state:
     st.session_state.accessibility_mode = False
 
-if 'search_history' not in st.session_state:
-    st.session_state.search_history = []
+if 'search_history' not in st.session_state:
+    st.session_state.search_history = []
+
+if 'expanded_schemes' not in st.session_state:
+    st.session_state.expanded_schemes = set()
+
+if 'results_page' not in st.session_state:
+    st.session_state.results_page = 1
+
+if 'results_signature' not in st.session_state:
+    st.session_state.results_signature = None
+
+# ============================================================================
+# AZURE AI SERVICES CONFIGURATION
+# ============================================================================
+
+AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
+AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
+AZURE_OPENAI_DEPLOYMENT_NAME = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-35-turbo")
+AZURE_TEXTANALYTICS_KEY = os.getenv("AZURE_TEXTANALYTICS_KEY")
+AZURE_TEXTANALYTICS_ENDPOINT = os.getenv("AZURE_TEXTANALYTICS_ENDPOINT")
+
+# API version for Azure OpenAI
+AZURE_OPENAI_API_VERSION = "2023-05-15"
+
+# Eligibility prompt version (see ELIGIBILITY_PROMPTS). Add a new version whenever the prompt
+# changes so cached explanations are not reused. Weighted versions run an A/B test, e.g.
+# "v1:50,v2:50"; each scheme/profile pair is assigned a version deterministically.
+ELIGIBILITY_PROMPT_VERSIONS = os.getenv("SCHEMEMITRA_PROMPT_VERSIONS", "v2")
+
+# ============================================================================
+# EXPLANATION CACHE CONFIGURATION
+# ============================================================================
+
+EXPLANATION_CACHE_PATH = os.getenv("SCHEMEMITRA_CACHE_PATH", ".schememitra_cache.sqlite3")
+EXPLANATION_CACHE_MAX_ENTRIES = int(os.getenv("SCHEMEMITRA_CACHE_MAX_ENTRIES", "5000"))
+EXPLANATION_CACHE_TTL_SECONDS = int(os.getenv("SCHEMEMITRA_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# A cache hit records its access time only if the stored one is older than this (seconds)
+EXPLANATION_CACHE_TOUCH_SECONDS = int(os.getenv("SCHEMEMITRA_CACHE_TOUCH_SECONDS", "300"))
+
+# Identical in-flight explanation requests share one Azure call. Lock files in this
+# directory extend that across processes sharing the cache (empty disables it).
+SINGLE_FLIGHT_LOCK_DIR = os.getenv("SCHEMEMITRA_SINGLE_FLIGHT_LOCK_DIR", EXPLANATION_CACHE_PATH + ".locks")
+SINGLE_FLIGHT_TIMEOUT_SECONDS = float(os.getenv("SCHEMEMITRA_SINGLE_FLIGHT_TIMEOUT_SECONDS", "60"))
+
+# Text Analytics entity recognition: documents per request (service limit) and cache size
+TEXT_ANALYTICS_BATCH_SIZE = int(os.getenv("SCHEMEMITRA_TEXT_ANALYTICS_BATCH_SIZE", "5"))
+TEXT_ANALYTICS_CACHE_MAX_ENTRIES = int(os.getenv("SCHEMEMITRA_TEXT_ANALYTICS_CACHE_MAX_ENTRIES", "10000"))
+TEXT_ANALYTICS_API_VERSION = "v3.1"
+
+# Stream explanation tokens to the UI as they are generated (falls back to full responses when off)
+AZURE_OPENAI_STREAM = os.getenv("SCHEMEMITRA_STREAM_EXPLANATIONS", "true").lower() in ("1", "true", "yes")
+
+# Number of scheme cards rendered per results page in the Finder tab
+RESULTS_PAGE_SIZE = max(1, int(os.getenv("SCHEMEMITRA_RESULTS_PAGE_SIZE", "10")))
+
+# Maximum number of Azure OpenAI explanation requests in flight per page render
+LLM_MAX_IN_FLIGHT = int(os.getenv("SCHEMEMITRA_LLM_MAX_IN_FLIGHT", "4"))
+
+# Explain several schemes for one profile in a single structured (JSON) call,
+# at most this many schemes per call
+EXPLANATION_BATCH_MODE = os.getenv("SCHEMEMITRA_BATCH_EXPLANATIONS", "true").lower() in ("1", "true", "yes")
+EXPLANATION_BATCH_SIZE = max(1, int(os.getenv("SCHEMEMITRA_EXPLANATION_BATCH_SIZE", "5")))
+
+# ============================================================================
+# AZURE HTTP CLIENT CONFIGURATION
+# ============================================================================
+
+AZURE_HTTP_POOL_SIZE = int(os.getenv("SCHEMEMITRA_HTTP_POOL_SIZE", "16"))
+AZURE_HTTP_MAX_RETRIES = int(os.getenv("SCHEMEMITRA_HTTP_MAX_RETRIES", "3"))
+AZURE_HTTP_BACKOFF_BASE = float(os.getenv("SCHEMEMITRA_HTTP_BACKOFF_BASE", "0.5"))
+AZURE_HTTP_BACKOFF_MAX = float(os.getenv("SCHEMEMITRA_HTTP_BACKOFF_MAX", "8"))
+# A throttled response asking for a longer wait than this is returned at once (shown as busy)
+AZURE_HTTP_MAX_RETRY_AFTER = float(os.getenv("SCHEMEMITRA_HTTP_MAX_RETRY_AFTER", "10"))
+AZURE_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("SCHEMEMITRA_CIRCUIT_FAILURE_THRESHOLD", "5"))
+AZURE_CIRCUIT_RESET_SECONDS = float(os.getenv("SCHEMEMITRA_CIRCUIT_RESET_SECONDS", "30"))
+
+# Client-side limits matching the Azure OpenAI deployment quota (0 disables a limit),
+# and how long a request may queue for capacity before giving up
+AZURE_OPENAI_TOKENS_PER_MINUTE = int(os.getenv("SCHEMEMITRA_AZURE_OPENAI_TPM", "120000"))
+AZURE_OPENAI_REQUESTS_PER_MINUTE = int(os.getenv("SCHEMEMITRA_AZURE_OPENAI_RPM", "720"))
+AZURE_RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("SCHEMEMITRA_RATE_LIMIT_MAX_WAIT_SECONDS", "30"))
+
+# ============================================================================
+# SESSION STORE CONFIGURATION
+# ============================================================================
+
+# Where bookmarks, expanded cards, language and profile are kept so any replica
+# can serve any session: "memory" (this process only), "sqlite" or redis://[:password@]host:port/db
+SESSION_STORE_URL = os.getenv("SCHEMEMITRA_SESSION_STORE", "memory")
+SESSION_STORE_PATH = os.getenv("SCHEMEMITRA_SESSION_STORE_PATH", ".schememitra_sessions.sqlite3")
+SESSION_TTL_SECONDS = int(os.getenv("SCHEMEMITRA_SESSION_TTL_SECONDS", str(30 * 24 * 3600)))
+
+# Changes are written behind, batched across sessions, at most this often (0 writes synchronously)
+SESSION_FLUSH_SECONDS = float(os.getenv("SCHEMEMITRA_SESSION_FLUSH_SECONDS", "0.25"))
+
+# ============================================================================
+# METRICS CONFIGURATION
+# ============================================================================
+
+# Port for the Prometheus /metrics and /ready listener (0 disables it)
+METRICS_PORT = int(os.getenv("SCHEMEMITRA_METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("SCHEMEMITRA_METRICS_HOST", "127.0.0.1")
+
+# Show per-rerun timings and process-wide histograms in the sidebar
+METRICS_DEBUG_PANEL = os.getenv("SCHEMEMITRA_DEBUG_PANEL", "false").lower() in ("1", "true", "yes")
+
+# ============================================================================
+# WARM-UP CONFIGURATION
+# ============================================================================
+
+# Build catalog indexes and score matrices and open Azure connections on a background thread
+# (off: build them inline during the first run, before it renders)
+BACKGROUND_WARMUP = os.getenv("SCHEMEMITRA_BACKGROUND_WARMUP", "true").lower() in ("1", "true", "yes")
+
+# The semantic index is the slowest structure to build and only semantic search needs it
+WARMUP_SEMANTIC_INDEX = os.getenv("SCHEMEMITRA_WARMUP_SEMANTIC_INDEX", "true").lower() in ("1", "true", "yes")
+
+# Timeout (seconds) for each request that pre-opens a connection to an Azure endpoint
+WARMUP_CONNECT_TIMEOUT = float(os.getenv("SCHEMEMITRA_WARMUP_CONNECT_TIMEOUT", "5"))
+
+# ============================================================================
+# STARTUP & READINESS
+# ============================================================================
+
+class StartupReport:
+    """
+    Start-up timings of this process: each phase of the first script run (imports,
+    catalog load) and of the background warm-up, the time to first render, and the
+    readiness flag an orchestrator polls before sending traffic.
+    """
+    
+    def __init__(self, run_started: float):
+        self.run_started = run_started
+        self.phases: Dict[str, float] = {}
+        self.first_render_seconds: Optional[float] = None
+        self.warmup_seconds: Optional[float] = None
+        self.warmup_error: Optional[str] = None
+        self.ready = threading.Event()
+        self._lock = threading.Lock()
+    
+    def record(self, phase: str, seconds: float):
+        """Record a phase duration; only its first occurrence in the process counts."""
+        with self._lock:
+            self.phases.setdefault(phase, seconds)
+    
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+    
+    def mark_first_render(self) -> bool:
+        """Record the time from the start of the first run to the end of its render; True only once."""
+        with self._lock:
+            if self.first_render_seconds is not None:
+                return False
+            self.first_render_seconds = time.perf_counter() - self.run_started
+            return True
+    
+    def mark_ready(self, warmup_seconds: float, error: Optional[str] = None):
+        with self._lock:
+            self.warmup_seconds = warmup_seconds
+            self.warmup_error = error
+        self.ready.set()
+    
+    def as_dict(self) -> Dict:
+        """JSON-friendly report (milliseconds) for /ready endpoints and the debug panel."""
+        def ms(seconds: Optional[float]) -> Optional[float]:
+            return None if seconds is None else round(seconds * 1000, 1)
+        with self._lock:
+            return {
+                "ready": self.ready.is_set(),
+                "time_to_first_render_ms": ms(self.first_render_seconds),
+                "warmup_ms": ms(self.warmup_seconds),
+                "warmup_error": self.warmup_error,
+                "phases_ms": {phase: ms(seconds) for phase, seconds in self.phases.items()}
+            }
+
+@st.cache_resource
+def get_startup_report(_run_started: float) -> StartupReport:
+    """Return the process-wide start-up report, timed from the first run (argument not hashed)."""
+    return StartupReport(_run_started)
+
+STARTUP = get_startup_report(RUN_STARTED)
+STARTUP.record("imports", time.perf_counter() - RUN_STARTED)
+
+# ============================================================================
+# DATA LOADING
+# ============================================================================
+
+SCHEMES_PATH = os.getenv("SCHEMEMITRA_SCHEMES_PATH", "schemes.json")
+
+# How often (seconds) the data file is checked for changes
+CATALOG_CHECK_SECONDS = float(os.getenv("SCHEMEMITRA_CATALOG_CHECK_SECONDS", "2"))
+
+SCHEME_FIELDS = ('id', 'name', 'ministry', 'category', 'beneficiary', 'benefit',
+                 'status', 'source_url', 'source_name', 'description')
+
+_SCHEME_FIELD_SET = frozenset(SCHEME_FIELDS)
+_MISSING = object()
+
+class SchemeRecord(Mapping):
+    """
+    Read-only scheme record with one slot per schemes.json field instead of a
+    per-record dict. It is indexed like the original dict (scheme['name']),
+    so search, scoring and rendering code works on records and plain dicts
+    alike; dict(record) gives back the JSON object. Fields outside
+    SCHEME_FIELDS are kept in a small overflow dict.
+    """
+    
+    __slots__ = tuple(f"_{field}" for field in SCHEME_FIELDS) + ('_extra',)
+    
+    def __init__(self, data: Dict):
+        # Fill the slots through their descriptors: __setattr__ is blocked, and this is the catalog load's hot loop
+        get = data.get
+        for set_slot, field in _SCHEME_SLOT_SETTERS:
+            set_slot(self, get(field, _MISSING))
+        extra = None
+        if not _SCHEME_FIELD_SET.issuperset(data):
+            extra = {k: v for k, v in data.items() if k not in _SCHEME_FIELD_SET}
+        _set_extra(self, extra)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("SchemeRecord is read-only")
+    
+    def __getitem__(self, key: str):
+        if key in _SCHEME_FIELD_SET:
+            value = getattr(self, f"_{key}")
+            if value is not _MISSING:
+                return value
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+    
+    def __iter__(self) -> Iterator[str]:
+        for field in SCHEME_FIELDS:
+            if getattr(self, f"_{field}") is not _MISSING:
+                yield field
+        if self._extra is not None:
+            yield from self._extra
+    
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+    
+    def __repr__(self) -> str:
+        return f"SchemeRecord({dict(self)!r})"
+
+_SCHEME_SLOT_SETTERS = tuple((getattr(SchemeRecord, f"_{field}").__set__, field) for field in SCHEME_FIELDS)
+_set_extra = SchemeRecord._extra.__set__
+
+@contextmanager
+def gc_paused():
+    """
+    Suspend the cyclic garbage collector while a catalog is bulk-built:
+    every few hundred new records would otherwise trigger a collection that
+    walks all the records built so far.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+class SchemeRepository:
+    """
+    Id-indexed view of one catalog snapshot: O(1) lookup of a record or its
+    catalog position by scheme id, so session state only needs to hold ids.
+    """
+    
+    def __init__(self, schemes: List[Dict]):
+        self.schemes = schemes
+        ids = [s['id'] for s in schemes]
+        self.positions = dict(zip(ids, range(len(ids))))
+        self.by_id = dict(zip(ids, schemes))
+    
+    def __len__(self) -> int:
+        return len(self.schemes)
+    
+    def __contains__(self, scheme_id) -> bool:
+        return scheme_id in self.positions
+    
+    def get(self, scheme_id) -> Optional[Dict]:
+        return self.by_id.get(scheme_id)
+    
+    def get_many(self, scheme_ids) -> List[Dict]:
+        """Records for the given ids in catalog order; ids no longer in the catalog are skipped."""
+        positions = sorted(self.positions[sid] for sid in scheme_ids if sid in self.positions)
+        return [self.schemes[pos] for pos in positions]
+
+def scheme_fingerprint(scheme: Dict) -> str:
+    """Stable content hash of a scheme record, used to detect catalog changes."""
+    payload = json.dumps(dict(scheme), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+class SchemeCatalog:
+    """
+    Immutable snapshot of schemes.json plus the structures derived from it
+    (search index, facets, score matrix). Derived structures are built on
+    first use; after a reload they are rebuilt incrementally from the
+    previous snapshot, re-processing only schemes whose content changed.
+    """
+    
+    def __init__(self, schemes: List[Dict], version: Optional[str] = None,
+                 previous: Optional['SchemeCatalog'] = None):
+        self.schemes = schemes
+        self.version = version
+        self.loaded_at = time.time()
+        self._fingerprints: Optional[Dict[str, str]] = None
+        self.repository = SchemeRepository(schemes)
+        self.by_id = self.repository.by_id
+        
+        # Ids that are new or whose record changed since the previous snapshot
+        if previous is None:
+            self.changed_ids = None
+        else:
+            self.changed_ids = {
+                sid for sid, fp in self.fingerprints.items()
+                if previous.fingerprints.get(sid) != fp
+            }
+            # Only keep one generation of history alive
+            previous._previous = None
+        self._previous = previous
+        self._derived: Dict[str, object] = {}
+        self._lock = threading.Lock()
+    
+    @property
+    def fingerprints(self) -> Dict[str, str]:
+        """Content hash per scheme id, computed the first time a reload diffs against this snapshot."""
+        if self._fingerprints is None:
+            self._fingerprints = {s['id']: scheme_fingerprint(s) for s in self.schemes}
+        return self._fingerprints
+    
+    def derived(self, name: str, builder):
+        """
+        Return the derived structure called name, building it on first use.
+        builder(schemes, previous=..., changed_ids=...) receives the previous
+        snapshot's structure (if any) so it can rebuild incrementally.
+        """
+        value = self._derived.get(name)
+        if value is not None:
+            return value
+        with self._lock:
+            value = self._derived.get(name)
+            if value is None:
+                previous_value = None
+                if self._previous is not None:
+                    previous_value = self._previous._derived.get(name)
+                if previous_value is not None:
+                    value = builder(self.schemes, previous=previous_value, changed_ids=self.changed_ids)
+                else:
+                    value = builder(self.schemes)
+                self._derived[name] = value
+        return value
+    
+    def has_derived(self, name: str) -> bool:
+        """True once the derived structure called name has been built."""
+        return name in self._derived
+
+class CatalogStore:
+    """
+    Watches the schemes data file and atomically swaps in a new
+    SchemeCatalog when its content changes. Readers always get a complete
+    snapshot; a reload never blocks them.
+    """
+    
+    def __init__(self, path: str, check_seconds: float = 2.0):
+        self.path = path
+        self.check_seconds = check_seconds
+        self.error: Optional[str] = None
+        self._catalog = SchemeCatalog([], version=None)
+        self._stat_key = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self.refresh(force=True)
+    
+    def current(self) -> SchemeCatalog:
+        """Return the latest snapshot, checking the file at most every check_seconds."""
+        if time.monotonic() - self._last_check >= self.check_seconds:
+            self.refresh()
+        return self._catalog
+    
+    def refresh(self, force: bool = False) -> bool:
+        """Reload the file if its mtime/size and content hash changed. Returns True on swap."""
+        # If another thread is already reloading, keep serving the current snapshot
+        if not self._lock.acquire(blocking=force):
+            return False
+        try:
+            self._last_check = time.monotonic()
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                self.error = f"{os.path.basename(self.path)} not found. Please ensure the file exists in the project directory."
+                return False
+            
+            stat_key = (stat.st_mtime_ns, stat.st_size)
+            if stat_key == self._stat_key and not force:
+                return False
+            
+            with open(self.path, 'rb') as f:
+                raw = f.read()
+            version = hashlib.sha256(raw).hexdigest()
+            
+            try:
+                with gc_paused():
+                    schemes = [SchemeRecord(s) for s in json.loads(raw.decode('utf-8')).get('schemes', [])]
+            except ValueError as e:
+                # Possibly a half-written file: keep the old snapshot and retry next check
+                self.error = f"Could not parse {os.path.basename(self.path)}: {str(e)}"
+                return False
+            
+            self._stat_key = stat_key
+            self.error = None
+            if version == self._catalog.version:
+                return False
+            
+            previous = self._catalog if self._catalog.version is not None else None
+            with gc_paused():
+                self._catalog = SchemeCatalog(schemes, version=version, previous=previous)
+            return True
+        finally:
+            self._lock.release()
+
+@st.cache_resource
+def get_catalog_store() -> CatalogStore:
+    """Return the process-wide catalog store (survives script reruns)."""
+    return CatalogStore(SCHEMES_PATH, check_seconds=CATALOG_CHECK_SECONDS)
+
+def load_catalog() -> SchemeCatalog:
+    """Return the current catalog snapshot, hot-reloaded when schemes.json changes."""
+    store = get_catalog_store()
+    catalog = store.current()
+    if store.error:
+        st.error(f"❌ {store.error}")
+    return catalog
+
+def load_schemes() -> List[Dict]:
+    """Load schemes from JSON file (the current catalog snapshot; treat as read-only)."""
+    return load_catalog().schemes
+
+@st.cache_resource
+def _adhoc_catalogs() -> Dict[int, SchemeCatalog]:
+    """Catalog wrappers for scheme lists that did not come from the catalog store."""
+    return {}
+
+def catalog_for_schemes(schemes: List[Dict]) -> SchemeCatalog:
+    """Return the SchemeCatalog that owns this exact list object, wrapping it if needed."""
+    if CATALOG.schemes is schemes:
+        return CATALOG
+    current = get_catalog_store()._catalog
+    if current.schemes is schemes:
+        return current
+    
+    adhoc = _adhoc_catalogs()
+    catalog = adhoc.get(id(schemes))
+    if catalog is None or catalog.schemes is not schemes:
+        catalog = SchemeCatalog(schemes)
+        if len(adhoc) >= 4:
+            adhoc.pop(next(iter(adhoc)), None)
+        adhoc[id(schemes)] = catalog
+    return catalog
+
+# Pin one catalog snapshot for this whole script run so a reload mid-run cannot mix versions
+with STARTUP.phase("load_catalog"):
+    CATALOG = load_catalog()
+SCHEMES = CATALOG.schemes
+REPOSITORY = CATALOG.repository
+
+# Categories mapping
+CATEGORIES = {
+    'Farmers': '🌾',
+    'Women': '👩‍💼',
+    'Youth': '👨‍🎓',
+    'MSME': '🏭',
+    'Education': '📚',
+    'Senior Citizens': '👴'
+}
+
+CATEGORY_NAMES = list(CATEGORIES.keys())
+
+# ============================================================================
+# EXPLANATION CACHE
+# ============================================================================
+
+def normalize_profile(user_profile: str) -> str:
+    """Normalize a profile string so trivially different inputs share a cache entry."""
+    return " ".join(user_profile.lower().split())
+
+class ExplanationCache:
+    """
+    SQLite-backed cache for eligibility explanations.
+    Shared by every session and every process pointing at the same file.
+    Entries expire after a TTL and the least recently used ones are evicted
+    once the cache grows beyond max_entries. Hits only write their access time
+    once it is touch_seconds old, so recency is tracked to that resolution
+    and repeated hits on a hot entry stay read-only.
+    """
+    
+    def __init__(self, path: str, max_entries: int = 5000, ttl_seconds: int = 7 * 24 * 3600,
+                 touch_seconds: int = 300):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.touch_seconds = touch_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS explanations (
+                cache_key TEXT PRIMARY KEY,
+                scheme_id TEXT NOT NULL,
+                scheme_fingerprint TEXT NOT NULL,
+                explanation TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_explanations_access ON explanations(last_access)")
+        self._conn.commit()
+    
+    @staticmethod
+    def make_key(scheme: Dict, user_profile: str,
+                 deployment: str = AZURE_OPENAI_DEPLOYMENT_NAME,
+                 prompt_version: Optional[str] = None) -> str:
+        """
+        Build the cache key from scheme content, normalized profile, deployment and prompt version
+        (by default the version this scheme/profile pair is assigned).
+        """
+        if prompt_version is None:
+            prompt_version = choose_prompt_version(scheme['id'], user_profile)
+        raw = "|".join([
+            scheme['id'],
+            scheme_fingerprint(scheme),
+            normalize_profile(user_profile),
+            deployment or "",
+            prompt_version
+        ])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached explanation, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT explanation, created_at, last_access FROM explanations WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            explanation, created_at, last_access = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM explanations WHERE cache_key = ?", (key,))
+                self._conn.commit()
+                return None
+            if now - last_access >= self.touch_seconds:
+                self._conn.execute("UPDATE explanations SET last_access = ? WHERE cache_key = ?", (now, key))
+                self._conn.commit()
+            return explanation
+    
+    def put(self, key: str, scheme: Dict, explanation: str):
+        """Store an explanation and evict expired / least recently used entries."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO explanations VALUES (?, ?, ?, ?, ?, ?)",
+                (key, scheme['id'], scheme_fingerprint(scheme), explanation, now, now)
+            )
+            self._conn.execute("DELETE FROM explanations WHERE created_at < ?", (now - self.ttl_seconds,))
+            self._conn.execute("""
+                DELETE FROM explanations WHERE cache_key IN (
+                    SELECT cache_key FROM explanations ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            self._conn.commit()
+    
+    def invalidate_changed(self, schemes: List[Dict]) -> int:
+        """Drop entries for schemes that were removed or changed in schemes.json."""
+        current = {s['id']: scheme_fingerprint(s) for s in schemes}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT scheme_id, scheme_fingerprint FROM explanations"
+            ).fetchall()
+            stale = [(sid, fp) for sid, fp in rows if current.get(sid) != fp]
+            self._conn.executemany(
+                "DELETE FROM explanations WHERE scheme_id = ? AND scheme_fingerprint = ?", stale
+            )
+            self._conn.commit()
+        return len(stale)
+    
+    def clear(self):
+        """Remove every cached explanation."""
+        with self._lock:
+            self._conn.execute("DELETE FROM explanations")
+            self._conn.commit()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM explanations").fetchone()[0]
+
+@st.cache_resource
+def _open_explanation_cache() -> ExplanationCache:
+    return ExplanationCache(
+        EXPLANATION_CACHE_PATH,
+        max_entries=EXPLANATION_CACHE_MAX_ENTRIES,
+        ttl_seconds=EXPLANATION_CACHE_TTL_SECONDS,
+        touch_seconds=EXPLANATION_CACHE_TOUCH_SECONDS
+    )
+
+def get_explanation_cache(catalog: Optional[SchemeCatalog] = None) -> ExplanationCache:
+    """
+    Return the process-wide explanation cache, purging entries for changed schemes.
+    Defaults to this run's CATALOG; long-lived callers (the HTTP API) pass their current snapshot.
+    """
+    catalog = catalog or CATALOG
+    cache = _open_explanation_cache()
+    if getattr(cache, 'catalog_version', None) != catalog.version:
+        cache.invalidate_changed(catalog.schemes)
+        cache.catalog_version = catalog.version
+    return cache
+
+# ============================================================================
+# TEXT ANALYTICS CACHE
+# ============================================================================
+
+class EntityCache:
+    """
+    In-process LRU cache of Text Analytics results keyed by a content hash,
+    so repeated profile texts and search queries are analysed only once.
+    """
+    
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(text: str, language: str = "en") -> str:
+        raw = f"{TEXT_ANALYTICS_API_VERSION}|{language}|{text}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+            return result
+    
+    def put(self, key: str, result: Dict):
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+@st.cache_resource
+def get_entity_cache() -> EntityCache:
+    """Return the process-wide Text Analytics result cache."""
+    return EntityCache(TEXT_ANALYTICS_CACHE_MAX_ENTRIES)
+
+# ============================================================================
+# SESSION STORE
+# ============================================================================
+
+# Session state that must survive a reconnect to another replica, and its type
+PERSISTED_SESSION_KEYS = {
+    'bookmarked_schemes': set,
+    'expanded_schemes': set,
+    'language': str,
+    'last_user_profile': str,
+    'profile_age': int,
+    'profile_category': str,
+    'profile_skills': str
+}
+
+# Language codes and the labels of the sidebar radio (widget key "language_select")
+LANGUAGE_OPTIONS = {'en': "🇬🇧 English", 'hi': "🇮🇳 Hindi"}
+
+# The session id travels in a first-party cookie so a reconnect to any replica finds the same
+# state, without the id showing up in shared links, browser history or Referer headers
+SESSION_COOKIE = "schememitra_sid"
+# Older links carried the id as ?sid=...; it is removed from the URL and never adopted
+LEGACY_SESSION_ID_PARAM = "sid"
+_SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+
+class MemorySessionStore:
+    """Sessions kept in this process only (a single replica; the default)."""
+    
+    def __init__(self, ttl_seconds: int = SESSION_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._sessions: Dict[str, Tuple[float, Dict[str, str]]] = {}
+        self._lock = threading.Lock()
+    
+    def load(self, session_id: str) -> Dict[str, str]:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None or time.time() - entry[0] > self.ttl_seconds:
+                self._sessions.pop(session_id, None)
+                return {}
+            return dict(entry[1])
+    
+    def save_many(self, updates: Dict[str, Dict[str, str]]):
+        now = time.time()
+        with self._lock:
+            for session_id, fields in updates.items():
+                entry = self._sessions.get(session_id)
+                values = entry[1] if entry is not None else {}
+                values.update(fields)
+                self._sessions[session_id] = (now, values)
+            expired = [sid for sid, (touched, _) in self._sessions.items() if now - touched > self.ttl_seconds]
+            for session_id in expired:
+                del self._sessions[session_id]
+
+class SQLiteSessionStore:
+    """Sessions in a SQLite file, shared by every process on the host (or on a shared volume)."""
+    
+    def __init__(self, path: str, ttl_seconds: int = SESSION_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS session_state (
+                session_id TEXT NOT NULL,
+                field TEXT NOT NULL,
+                value TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (session_id, field)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_session_state_updated ON session_state(updated_at)")
+        self._conn.commit()
+    
+    def load(self, session_id: str) -> Dict[str, str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT field, value FROM session_state WHERE session_id = ? AND updated_at >= ?",
+                (session_id, time.time() - self.ttl_seconds)
+            ).fetchall()
+        return dict(rows)
+    
+    def save_many(self, updates: Dict[str, Dict[str, str]]):
+        """Write every pending field of every session in one transaction."""
+        now = time.time()
+        rows = [(sid, field, value, now) for sid, fields in updates.items() for field, value in fields.items()]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO session_state VALUES (?, ?, ?, ?)", rows)
+            self._conn.execute("DELETE FROM session_state WHERE updated_at < ?", (now - self.ttl_seconds,))
+            self._conn.commit()
+
+class RespError(Exception):
+    """Error reply from a Redis-protocol server."""
+
+class RedisSessionStore:
+    """
+    Sessions as hashes (one key per session, with a TTL) in any server that
+    speaks the Redis protocol (RESP2): Redis, Valkey, KeyDB or mock_redis.py.
+    Batched writes go out as one pipelined round trip.
+    """
+    
+    def __init__(self, url: str, ttl_seconds: int = SESSION_TTL_SECONDS,
+                 key_prefix: str = "schememitra:session:", timeout: float = 5.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def encode_command(*args) -> bytes:
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode('utf-8')
+            parts.append(f"${len(data)}\r\n".encode() + data + b"\r\n")
+        return b"".join(parts)
+    
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by the session store")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode('utf-8')
+        if kind == b"-":
+            raise RespError(payload.decode('utf-8'))
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            return self._reader.read(length + 2)[:-2].decode('utf-8')
+        if kind == b"*":
+            length = int(payload)
+            return None if length < 0 else [self._read_reply() for _ in range(length)]
+        raise ConnectionError(f"Unexpected reply from the session store: {line[:40]!r}")
+    
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._reader = self._sock.makefile('rb')
+        handshake = []
+        if self.password:
+            handshake.append(("AUTH", self.password))
+        if self.db:
+            handshake.append(("SELECT", self.db))
+        if handshake:
+            self._send(handshake)
+    
+    def _close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = self._reader = None
+    
+    def _send(self, commands: List[Tuple]) -> List:
+        self._sock.sendall(b"".join(self.encode_command(*command) for command in commands))
+        replies, error = [], None
+        for _ in commands:
+            try:
+                replies.append(self._read_reply())
+            except RespError as e:
+                error = error or e
+        if error is not None:
+            raise error
+        return replies
+    
+    def pipeline(self, commands: List[Tuple]) -> List:
+        """Send commands in one round trip, reconnecting once if the connection went stale."""
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._send(commands)
+                except (OSError, ConnectionError):
+                    self._close()
+                    if attempt:
+                        raise
+    
+    def load(self, session_id: str) -> Dict[str, str]:
+        flat = self.pipeline([("HGETALL", self.key_prefix + session_id)])[0] or []
+        return dict(zip(flat[::2], flat[1::2]))
+    
+    def save_many(self, updates: Dict[str, Dict[str, str]]):
+        commands = []
+        for session_id, fields in updates.items():
+            key = self.key_prefix + session_id
+            flat = [item for pair in fields.items() for item in pair]
+            commands.append(("HSET", key, *flat))
+            commands.append(("EXPIRE", key, self.ttl_seconds))
+        if commands:
+            self.pipeline(commands)
+
+class SessionWriteBuffer:
+    """
+    Read-through, write-behind front for a session store backend. Changed
+    fields are coalesced per session (latest value wins) and flushed by a
+    background thread every flush_seconds in one batch, so a rerun never
+    waits on the store. Loads see this process's unflushed writes.
+    """
+    
+    def __init__(self, backend, flush_seconds: float = SESSION_FLUSH_SECONDS):
+        self.backend = backend
+        self.flush_seconds = flush_seconds
+        self.error: Optional[str] = None
+        self._pending: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        if flush_seconds > 0:
+            threading.Thread(target=self._run, name="session-store-writer", daemon=True).start()
+        atexit.register(self.flush)
+    
+    def load(self, session_id: str) -> Dict[str, str]:
+        try:
+            values = self.backend.load(session_id)
+            self.error = None
+        except Exception as e:
+            # An unreachable store degrades to per-process state; it must not break the page
+            self.error = f"Session store unavailable: {str(e)}"
+            values = {}
+        with self._lock:
+            values.update(self._pending.get(session_id, {}))
+        return values
+    
+    def put(self, session_id: str, fields: Dict[str, str]):
+        with self._lock:
+            self._pending.setdefault(session_id, {}).update(fields)
+        if self.flush_seconds <= 0:
+            self.flush()
+    
+    def flush(self) -> int:
+        """Write every pending change in one batch. Returns the number of sessions written."""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return 0
+        try:
+            self.backend.save_many(batch)
+            self.error = None
+        except Exception as e:
+            self.error = f"Session store unavailable: {str(e)}"
+            # Keep the batch for the next flush unless a newer value arrived meanwhile
+            with self._lock:
+                for session_id, fields in batch.items():
+                    newer = self._pending.get(session_id, {})
+                    self._pending[session_id] = {**fields, **newer}
+            return 0
+        return len(batch)
+    
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_seconds)
+            self.flush()
+
+def open_session_backend(url: str):
+    """Create the backend named by SCHEMEMITRA_SESSION_STORE."""
+    if url.startswith(("redis://", "rediss://")):
+        if url.startswith("rediss://"):
+            raise ValueError("TLS (rediss://) session stores are not supported; use a local TLS proxy")
+        return RedisSessionStore(url)
+    if url == "sqlite":
+        return SQLiteSessionStore(SESSION_STORE_PATH)
+    if url == "memory":
+        return MemorySessionStore()
+    raise ValueError(f"Unknown SCHEMEMITRA_SESSION_STORE: {url!r}")
+
+@st.cache_resource
+def get_session_store() -> SessionWriteBuffer:
+    """Return the process-wide session store (survives script reruns)."""
+    return SessionWriteBuffer(open_session_backend(SESSION_STORE_URL))
+
+SESSION_STORE = get_session_store()
+
+def encode_session_value(value) -> str:
+    if isinstance(value, (set, frozenset)):
+        value = sorted(value)
+    return json.dumps(value, ensure_ascii=False)
+
+def decode_session_value(key: str, raw: str):
+    value = json.loads(raw)
+    kind = PERSISTED_SESSION_KEYS[key]
+    if kind is set:
+        if type(value) is not list:
+            raise TypeError(f"{key} must be a list")
+        return set(value)
+    if type(value) is not kind:
+        raise TypeError(f"{key} must be {kind.__name__}")
+    return value
+
+def session_cookie_script(session_id: str) -> str:
+    """A script that stores session_id in the session cookie for the session TTL."""
+    return (
+        f"<script>document.cookie = '{SESSION_COOKIE}={session_id}; Path=/; "
+        f"Max-Age={SESSION_TTL_SECONDS}; SameSite=Strict' + "
+        "(location.protocol === 'https:' ? '; Secure' : '');</script>"
+    )
+
+def current_session_id() -> str:
+    """The session id from the session cookie, issuing a new one (and its cookie) for first visits."""
+    if LEGACY_SESSION_ID_PARAM in st.query_params:
+        del st.query_params[LEGACY_SESSION_ID_PARAM]
+    session_id = st.context.cookies.get(SESSION_COOKIE)
+    if not isinstance(session_id, str) or not _SESSION_ID_PATTERN.match(session_id):
+        session_id = secrets.token_urlsafe(18)
+        st.html(session_cookie_script(session_id), unsafe_allow_javascript=True)
+    return session_id
+
+def restore_session_state():
+    """
+    Load persisted keys into st.session_state once per Streamlit session
+    (a new tab, or a reconnect that landed on another replica). Later reruns
+    read st.session_state only.
+    """
+    if '_session_synced' in st.session_state:
+        return
+    session_id = current_session_id()
+    synced = {}
+    for key, raw in SESSION_STORE.load(session_id).items():
+        if key not in PERSISTED_SESSION_KEYS:
+            continue
+        try:
+            st.session_state[key] = decode_session_value(key, raw)
+        except (ValueError, TypeError):
+            continue
+        synced[key] = raw
+    # Widgets take their value from session state, so seed the ones backing persisted keys
+    # before they are created; otherwise their defaults overwrite the restored values
+    if st.session_state.language in LANGUAGE_OPTIONS:
+        st.session_state.language_select = LANGUAGE_OPTIONS[st.session_state.language]
+    st.session_state._session_id = session_id
+    st.session_state._session_synced = synced
+
+def persist_session_state():
+    """Queue the persisted keys that changed during this rerun (one batched write)."""
+    synced = st.session_state.get('_session_synced')
+    if synced is None:
+        return
+    changes = {}
+    for key in PERSISTED_SESSION_KEYS:
+        if key not in st.session_state:
+            continue
+        raw = encode_session_value(st.session_state[key])
+        if synced.get(key) != raw:
+            changes[key] = synced[key] = raw
+    if changes:
+        SESSION_STORE.put(st.session_state._session_id, changes)
+
+# ============================================================================
+# METRICS & TRACING
+# ============================================================================
+
+METRIC_BUCKETS_SECONDS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+STAGE_METRIC = "schememitra_stage_duration_seconds"
+AZURE_REQUEST_METRIC = "schememitra_azure_request_duration_seconds"
+AZURE_TOKENS_METRIC = "schememitra_azure_tokens_total"
+CACHE_METRIC = "schememitra_cache_requests_total"
+COALESCED_METRIC = "schememitra_llm_coalesced_total"
+BATCH_FALLBACK_METRIC = "schememitra_llm_batch_fallbacks_total"
+QUEUE_WAIT_METRIC = "schememitra_llm_queue_wait_seconds"
+QUEUE_DEPTH_METRIC = "schememitra_llm_queue_depth"
+RATE_LIMITED_METRIC = "schememitra_llm_rate_limited_total"
+STARTUP_METRIC = "schememitra_startup_phase_seconds"
+FIRST_RENDER_METRIC = "schememitra_time_to_first_render_seconds"
+READY_METRIC = "schememitra_ready"
+
+METRIC_HELP = {
+    STAGE_METRIC: "Time spent in each stage of a Streamlit rerun.",
+    AZURE_REQUEST_METRIC: "Latency of Azure OpenAI and Text Analytics requests, including retries.",
+    AZURE_TOKENS_METRIC: "Prompt and completion tokens sent to / received from Azure OpenAI.",
+    CACHE_METRIC: "Explanation and entity cache lookups by result.",
+    COALESCED_METRIC: "Explanation requests answered by another caller's in-flight Azure call.",
+    BATCH_FALLBACK_METRIC: "Schemes from a batch explanation call that had to be explained individually.",
+    QUEUE_WAIT_METRIC: "Time Azure OpenAI requests waited for rate-limit capacity, by priority.",
+    QUEUE_DEPTH_METRIC: "Azure OpenAI requests currently queued for rate-limit capacity, by priority.",
+    RATE_LIMITED_METRIC: "Azure OpenAI requests that gave up after waiting for rate-limit capacity.",
+    STARTUP_METRIC: "Duration of each start-up phase (first run and background warm-up).",
+    FIRST_RENDER_METRIC: "Time from the start of the first script run to the end of its render.",
+    READY_METRIC: "1 once the background warm-up has finished, else 0.",
+}
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token) for when Azure reports no usage."""
+    return (len(text) + 3) // 4
+
+class Histogram:
+    """Cumulative-bucket latency histogram (Prometheus semantics: value <= le)."""
+    
+    def __init__(self, buckets: Tuple[float, ...] = METRIC_BUCKETS_SECONDS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+    
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (max bucket for the overflow)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.buckets[-1]
+
+class Span:
+    """A timed region; labels may be updated (e.g. the response status) before it ends."""
+    
+    __slots__ = ("name", "labels", "start", "duration")
+    
+    def __init__(self, name: str, labels: Dict[str, str]):
+        self.name = name
+        self.labels = labels
+        self.start = time.perf_counter()
+        self.duration = 0.0
+
+class MetricsRegistry:
+    """
+    Process-wide histograms, counters and gauges, shared by every session and worker thread.
+    Spans opened on a thread with an active trace are also kept for that
+    rerun's debug panel.
+    """
+    
+    def __init__(self, buckets: Tuple[float, ...] = METRIC_BUCKETS_SECONDS):
+        self.buckets = buckets
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._gauges: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+    
+    def observe(self, name: str, seconds: float, **labels: str):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+    
+    def increment(self, name: str, value: float = 1, **labels: str):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+    
+    def set_gauge(self, name: str, value: float, **labels: str):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._gauges[key] = value
+    
+    @contextmanager
+    def span(self, name: str, **labels: str) -> Iterator[Span]:
+        """Time the block and record it in the name histogram with the (possibly updated) labels."""
+        span = Span(name, labels)
+        try:
+            yield span
+        finally:
+            span.duration = time.perf_counter() - span.start
+            self.observe(name, span.duration, **span.labels)
+            trace = getattr(self._local, 'trace', None)
+            if trace is not None:
+                trace.append(span)
+    
+    def stage(self, stage: str):
+        """Span for one stage of main()."""
+        return self.span(STAGE_METRIC, stage=stage)
+    
+    def start_trace(self):
+        """Start collecting this thread's spans (one Streamlit rerun)."""
+        self._local.trace = []
+    
+    def finish_trace(self) -> List[Span]:
+        trace = getattr(self._local, 'trace', None) or []
+        self._local.trace = None
+        return trace
+    
+    def histogram_rows(self) -> List[Dict]:
+        """Summary of every histogram series for the debug panel."""
+        with self._lock:
+            items = [(name, labels, h.count, h.sum, h.quantile(0.5), h.quantile(0.95))
+                     for (name, labels), h in self._histograms.items()]
+        return [
+            {
+                "metric": name.replace("schememitra_", "").replace("_duration_seconds", ""),
+                "labels": ", ".join(f"{k}={v}" for k, v in labels),
+                "count": count,
+                "mean ms": round(total / count * 1000, 2) if count else 0.0,
+                "p50 ms ≤": round(p50 * 1000, 1),
+                "p95 ms ≤": round(p95 * 1000, 1),
+            }
+            for name, labels, count, total, p50, p95 in sorted(items)
+        ]
+    
+    def counter_rows(self) -> List[Dict]:
+        """Current counter and gauge values for the debug panel."""
+        with self._lock:
+            items = sorted(list(self._counters.items()) + list(self._gauges.items()))
+        return [
+            {"metric": name.replace("schememitra_", ""), "labels": ", ".join(f"{k}={v}" for k, v in labels), "value": value}
+            for (name, labels), value in items
+        ]
+    
+    @staticmethod
+    def _format_labels(labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ""
+        escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+        return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+    
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            histograms = {key: (list(h.counts), h.sum, h.count) for key, h in self._histograms.items()}
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+        
+        lines = []
+        for metric in sorted({name for name, _ in histograms}):
+            lines.append(f"# HELP {metric} {METRIC_HELP.get(metric, metric)}")
+            lines.append(f"# TYPE {metric} histogram")
+            for (name, labels), (counts, total, count) in sorted(histograms.items()):
+                if name != metric:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{metric}_bucket{self._format_labels(labels, (('le', repr(bound)),))} {cumulative}")
+                lines.append(f"{metric}_bucket{self._format_labels(labels, (('le', '+Inf'),))} {count}")
+                lines.append(f"{metric}_sum{self._format_labels(labels)} {total}")
+                lines.append(f"{metric}_count{self._format_labels(labels)} {count}")
+        for kind, series in (("counter", counters), ("gauge", gauges)):
+            for metric in sorted({name for name, _ in series}):
+                lines.append(f"# HELP {metric} {METRIC_HELP.get(metric, metric)}")
+                lines.append(f"# TYPE {metric} {kind}")
+                for (name, labels), value in sorted(series.items()):
+                    if name == metric:
+                        lines.append(f"{metric}{self._format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+def start_metrics_server(registry: MetricsRegistry, host: str, port: int,
+                         startup: Optional[StartupReport] = None) -> ThreadingHTTPServer:
+    """
+    Serve registry.render_prometheus() on GET /metrics from a daemon thread, and the
+    start-up report on GET /ready (503 until the warm-up has finished).
+    """
+    
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?", 1)[0]
+            if path == "/metrics":
+                status, content_type = 200, "text/plain; version=0.0.4; charset=utf-8"
+                body = registry.render_prometheus().encode("utf-8")
+            elif path == "/ready" and startup is not None:
+                report = startup.as_dict()
+                status, content_type = (200 if report["ready"] else 503), "application/json"
+                body = json.dumps(report).encode("utf-8")
+            else:
+                self.send_error(404)
+                return
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="schememitra-metrics", daemon=True).start()
+    return server
+
+@st.cache_resource
+def get_metrics_registry() -> MetricsRegistry:
+    """Return the process-wide metrics registry, starting the /metrics listener if configured."""
+    registry = MetricsRegistry()
+    registry.server_error = None
+    if METRICS_PORT:
+        try:
+            registry.server = start_metrics_server(registry, METRICS_HOST, METRICS_PORT, STARTUP)
+        except OSError as e:
+            # Shown in the debug panel; the app itself keeps working without the endpoint
+            registry.server_error = f"Could not start metrics endpoint on {METRICS_HOST}:{METRICS_PORT}: {e}"
+    return registry
+
+# Like the HTTP client below, the registry must survive reruns, so it comes from cache_resource
+METRICS = get_metrics_registry()
+
+# ============================================================================
+# REQUEST COALESCING
+# ============================================================================
+
+class Flight:
+    """One in-flight call; followers wait for the leader's result or exception."""
+    
+    def __init__(self):
+        self._done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+    
+    def wait(self, timeout: Optional[float] = None):
+        if not self._done.wait(timeout):
+            raise TimeoutError("Timed out waiting for an identical in-flight request")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key onto one in-flight call.
+    The first caller (the leader) does the work; callers arriving while it
+    runs wait and receive the same result. Nothing is remembered afterwards -
+    caching finished results is the explanation cache's job.
+    """
+    
+    def __init__(self):
+        self._flights: Dict[str, Flight] = {}
+        self._lock = threading.Lock()
+    
+    def join(self, key: str) -> Tuple[Flight, bool]:
+        """Return (flight, is_leader). A leader must call finish() exactly once."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[key] = Flight()
+            return flight, True
+    
+    def finish(self, key: str, flight: Flight, result=None, error: Optional[BaseException] = None):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight.result, flight.error = result, error
+        flight._done.set()
+    
+    def do(self, key: str, fn, timeout: Optional[float] = None) -> Tuple[object, bool]:
+        """Run fn() once per key at a time. Returns (result, shared) where shared means we waited on another caller."""
+        flight, leader = self.join(key)
+        if not leader:
+            return flight.wait(timeout), True
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, flight, error=e)
+            raise
+        self.finish(key, flight, result)
+        return result, False
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+@st.cache_resource
+def get_single_flight() -> SingleFlight:
+    """Return the process-wide single-flight group for explanation requests."""
+    return SingleFlight()
+
+# Survives reruns and is shared by every session and worker thread
+SINGLE_FLIGHT = get_single_flight()
+
+# Lock files are striped so the directory stays bounded
+SINGLE_FLIGHT_LOCK_STRIPES = 4096
+
+@contextmanager
+def cross_process_lock(key: str, lock_dir: str = SINGLE_FLIGHT_LOCK_DIR,
+                       timeout: float = SINGLE_FLIGHT_TIMEOUT_SECONDS) -> Iterator[bool]:
+    """
+    Hold an exclusive lock file for key so other processes sharing the cache
+    wait for this one's result. Yields False (without locking) when lock files
+    are unavailable or the wait times out - the caller then just proceeds.
+    """
+    if fcntl is None or not lock_dir:
+        yield False
+        return
+    stripe = int(key[:8], 16) % SINGLE_FLIGHT_LOCK_STRIPES
+    try:
+        os.makedirs(lock_dir, exist_ok=True)
+        handle = open(os.path.join(lock_dir, f"{stripe:04x}.lock"), "a+")
+    except OSError:
+        yield False
+        return
+    
+    with handle:
+        deadline = time.monotonic() + timeout
+        acquired = False
+        while True:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                acquired = True
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    break
+                time.sleep(0.05)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+# ============================================================================
+# AZURE HTTP CLIENT
+# ============================================================================
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class CircuitOpenError(Exception):
+    """
+    Raised without touching the network while the circuit breaker is open.
+    Not a requests exception so requests need not be imported to define it;
+    callers catch it alongside requests.exceptions.RequestException.
+    """
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+    After failure_threshold failures in a row the circuit opens and calls
+    fail fast for reset_seconds; then a single trial call is let through.
+    Throttling (429) means the endpoint is up, so it is not a failure.
+    """
+    
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+    
+    @property
+    def state(self) -> str:
+        """One of 'closed', 'open' or 'half-open'."""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_seconds:
+                return "half-open"
+            return "open"
+    
+    def allow_request(self) -> bool:
+        """Return True if a call may go out now."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_seconds or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+    
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+    
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+    
+    def record_throttled(self):
+        """Neither a failure nor a success, but it settles a half-open trial so another may go out."""
+        with self._lock:
+            self._trial_in_flight = False
+
+def parse_retry_after(response: 'requests.Response') -> Optional[float]:
+    """Read the server-requested delay (seconds) from Retry-After / retry-after-ms headers."""
+    retry_after_ms = response.headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000.0)
+        except ValueError:
+            pass
+    
+    retry_after = response.headers.get("Retry-After")
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class AzureHttpClient:
+    """
+    Shared HTTP client for Azure AI calls.
+    Keeps TLS connections alive in a pool, retries 429/5xx and connection
+    errors with jittered exponential backoff (honouring Retry-After up to
+    max_retry_after; a longer requested wait returns the response at once), and
+    fails fast through a circuit breaker while the endpoint is unhealthy.
+    requests is imported, and the session built, on first use (or by warm()).
+    """
+    
+    def __init__(self, pool_size: int = 16, max_retries: int = 3,
+                 backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 max_retry_after: float = 10.0,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 sleep=time.sleep):
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self._sleep = sleep
+        self._session = None
+        self._session_lock = threading.Lock()
+    
+    @property
+    def session(self) -> 'requests.Session':
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=0)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+        return self._session
+    
+    def warm(self, urls: List[str], timeout: float = 5.0) -> int:
+        """
+        Open a pooled keep-alive connection (DNS, TCP and TLS) to each URL ahead of the
+        first Azure call. Any HTTP answer will do; it bypasses retries and the circuit
+        breaker. Returns the number of endpoints that answered.
+        """
+        import requests
+        session = self.session
+        opened = 0
+        for url in urls:
+            try:
+                session.head(url, timeout=timeout)
+                opened += 1
+            except requests.exceptions.RequestException:
+                pass
+        return opened
+    
+    def _backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+    
+    def post(self, url: str, **kwargs) -> 'requests.Response':
+        """
+        POST with retries. Returns the final response (which may still be an
+        error status - callers use raise_for_status as before) or raises a
+        requests exception once retries are exhausted.
+        """
+        import requests
+        if not self.circuit_breaker.allow_request():
+            raise CircuitOpenError(f"Circuit open for Azure endpoint, retry in {self.circuit_breaker.reset_seconds:.0f}s")
+        
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.max_retries:
+                    self.circuit_breaker.record_failure()
+                    raise
+                self._sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+            except Exception:
+                # Any other error still settles the call, or a half-open trial would never be released
+                self.circuit_breaker.record_failure()
+                raise
+            
+            if response.status_code not in RETRYABLE_STATUS_CODES:
+                self.circuit_breaker.record_success()
+                return response
+            
+            # The caller runs on a page render: rather than block for a long Retry-After, report busy now
+            retry_after = parse_retry_after(response)
+            if retry_after is not None and retry_after > self.max_retry_after:
+                self._record_unhealthy(response)
+                return response
+            
+            if attempt >= self.max_retries:
+                self._record_unhealthy(response)
+                return response
+            
+            self._sleep(self._backoff(attempt, retry_after))
+            response.close()
+            attempt += 1
+    
+    def _record_unhealthy(self, response: 'requests.Response'):
+        """Count a 5xx answer we stopped retrying as a failure; a 429 only settles the call."""
+        if response.status_code == 429:
+            self.circuit_breaker.record_throttled()
+        else:
+            self.circuit_breaker.record_failure()
+    
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+@st.cache_resource
+def get_azure_http_client() -> AzureHttpClient:
+    """Return the process-wide Azure HTTP client (survives script reruns)."""
+    return AzureHttpClient(
+        pool_size=AZURE_HTTP_POOL_SIZE,
+        max_retries=AZURE_HTTP_MAX_RETRIES,
+        backoff_base=AZURE_HTTP_BACKOFF_BASE,
+        backoff_max=AZURE_HTTP_BACKOFF_MAX,
+        max_retry_after=AZURE_HTTP_MAX_RETRY_AFTER,
+        circuit_breaker=CircuitBreaker(AZURE_CIRCUIT_FAILURE_THRESHOLD, AZURE_CIRCUIT_RESET_SECONDS)
+    )
 
-if 'expanded_schemes' not in st.session_state:
-    st.session_state.expanded_schemes = []
+# Every session and worker thread shares one connection pool and circuit breaker.
+# Streamlit re-executes this module on each rerun, so the client must come from cache_resource.
+AZURE_HTTP_CLIENT = get_azure_http_client()
 
 # ============================================================================
-# AZURE AI SERVICES CONFIGURATION
+# AZURE RATE LIMITING
 # ============================================================================
 
-AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
-AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
-AZURE_OPENAI_DEPLOYMENT_NAME = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-35-turbo")
-AZURE_TEXTANALYTICS_KEY = os.getenv("AZURE_TEXTANALYTICS_KEY")
-AZURE_TEXTANALYTICS_ENDPOINT = os.getenv("AZURE_TEXTANALYTICS_ENDPOINT")
+# Lower value = served first
+PRIORITY_INTERACTIVE = 0   # a user just expanded a card or asked the API for one explanation
+PRIORITY_BACKGROUND = 1    # batch and prefetch work
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BACKGROUND: "background"}
 
-# API version for Azure OpenAI
-AZURE_OPENAI_API_VERSION = "2023-05-15"
+class TokenBucketRateLimiter:
+    """
+    Client-side token buckets for the deployment's tokens-per-minute and
+    requests-per-minute quotas. Callers queue until both buckets can pay for
+    their request instead of being answered with 429s; the queue is served
+    strictly by priority, then arrival order.
+    """
+    
+    def __init__(self, tokens_per_minute: int, requests_per_minute: int, clock=time.monotonic):
+        self.tokens_per_minute = tokens_per_minute
+        self.requests_per_minute = requests_per_minute
+        self._clock = clock
+        self._tokens = float(tokens_per_minute)
+        self._requests = float(requests_per_minute)
+        self._updated = clock()
+        self._waiting: List[Tuple[int, int]] = []
+        self._sequence = 0
+        self._cond = threading.Condition()
+    
+    def _refill(self):
+        now = self._clock()
+        elapsed = now - self._updated
+        self._updated = now
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+        if self.requests_per_minute:
+            self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+    
+    def _shortfall_seconds(self, cost: int) -> float:
+        """Seconds until both buckets can pay for a request costing cost tokens."""
+        waits = [0.0]
+        if self.tokens_per_minute:
+            # A request bigger than the whole bucket waits for a full bucket
+            needed = min(cost, self.tokens_per_minute) - self._tokens
+            waits.append(needed * 60 / self.tokens_per_minute)
+        if self.requests_per_minute:
+            waits.append((1 - self._requests) * 60 / self.requests_per_minute)
+        return max(waits)
+    
+    def acquire(self, cost: int, priority: int = PRIORITY_INTERACTIVE,
+                timeout: Optional[float] = None) -> bool:
+        """Block until the request may be sent (True) or timeout seconds pass (False)."""
+        if not self.tokens_per_minute and not self.requests_per_minute:
+            return True
+        
+        deadline = None if timeout is None else self._clock() + timeout
+        with self._cond:
+            self._sequence += 1
+            ticket = (priority, self._sequence)
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    self._refill()
+                    wait = self._shortfall_seconds(cost) if self._waiting[0] == ticket else None
+                    if wait is not None and wait <= 0:
+                        if self.tokens_per_minute:
+                            self._tokens -= min(cost, self.tokens_per_minute)
+                        if self.requests_per_minute:
+                            self._requests -= 1
+                        return True
+                    if deadline is not None:
+                        remaining = deadline - self._clock()
+                        if remaining <= 0:
+                            return False
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            finally:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+    
+    def queue_depth(self) -> Dict[str, int]:
+        """Number of queued requests per priority name."""
+        with self._cond:
+            depth = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _ in self._waiting:
+                name = PRIORITY_NAMES.get(priority, str(priority))
+                depth[name] = depth.get(name, 0) + 1
+            return depth
 
-# ============================================================================
-# DATA LOADING
-# ============================================================================
+@st.cache_resource
+def get_rate_limiter() -> TokenBucketRateLimiter:
+    """Return the process-wide Azure OpenAI rate limiter (survives script reruns)."""
+    return TokenBucketRateLimiter(AZURE_OPENAI_TOKENS_PER_MINUTE, AZURE_OPENAI_REQUESTS_PER_MINUTE)
 
-@st.cache_data
-def load_schemes() -> List[Dict]:
-    """Load schemes from JSON file."""
-    try:
-        with open('schemes.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return data.get('schemes', [])
-    except FileNotFoundError:
-        st.error("❌ schemes.json not found. Please ensure the file exists in the project directory.")
-        return []
+AZURE_RATE_LIMITER = get_rate_limiter()
 
-# Load schemes
-SCHEMES = load_schemes()
+def estimate_request_tokens(prompt: str, max_tokens: int, system_prompt: Optional[str] = None) -> int:
+    """Quota cost of a chat completion as Azure counts it: prompt tokens plus max_tokens."""
+    return estimate_tokens(SYSTEM_PROMPT if system_prompt is None else system_prompt) + estimate_tokens(prompt) + max_tokens
 
-# Categories mapping
-CATEGORIES = {
-    'Farmers': '🌾',
-    'Women': '👩‍💼',
-    'Youth': '👨‍🎓',
-    'MSME': '🏭',
-    'Education': '📚',
-    'Senior Citizens': '👴'
-}
+def wait_for_capacity(prompt: str, max_tokens: int, priority: int, system_prompt: Optional[str] = None) -> bool:
+    """Queue for rate-limit capacity, recording wait time and queue depth."""
+    priority_name = PRIORITY_NAMES.get(priority, str(priority))
+    with METRICS.span(QUEUE_WAIT_METRIC, priority=priority_name):
+        for name, depth in AZURE_RATE_LIMITER.queue_depth().items():
+            METRICS.set_gauge(QUEUE_DEPTH_METRIC, depth + (name == priority_name), priority=name)
+        allowed = AZURE_RATE_LIMITER.acquire(estimate_request_tokens(prompt, max_tokens, system_prompt), priority,
+                                             timeout=AZURE_RATE_LIMIT_MAX_WAIT_SECONDS)
+    for name, depth in AZURE_RATE_LIMITER.queue_depth().items():
+        METRICS.set_gauge(QUEUE_DEPTH_METRIC, depth, priority=name)
+    if not allowed:
+        METRICS.increment(RATE_LIMITED_METRIC, priority=priority_name)
+    return allowed
 
-CATEGORY_NAMES = list(CATEGORIES.keys())
+RATE_LIMITED_MESSAGE = "⚠️ Azure OpenAI is busy right now. Please try again in a moment."
+NOT_CONFIGURED_MESSAGE = "⚠️ Azure OpenAI not configured. Please set your API credentials in .env file."
 
 # ============================================================================
 # AZURE AI FUNCTIONS
 # ============================================================================
 
-def call_azure_openai(prompt: str, max_tokens: int = 200) -> str:
+SYSTEM_PROMPT = "You are a helpful assistant that explains Indian government schemes in simple, non-legal language. Be concise and clear."
+
+def build_azure_openai_request(prompt: str, max_tokens: int, stream: bool = False,
+                               system_prompt: str = SYSTEM_PROMPT) -> Tuple[str, Dict, Dict]:
+    """Build (url, headers, body) for a chat-completions call."""
+    headers = {
+        "Content-Type": "application/json",
+        "api-key": AZURE_OPENAI_API_KEY
+    }
+    
+    data = {
+        "messages": [
+            {
+                "role": "system",
+                "content": system_prompt
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ],
+        "temperature": 0.7,
+        "max_tokens": max_tokens,
+        "top_p": 0.95
+    }
+    if stream:
+        data["stream"] = True
+    
+    url = f"{AZURE_OPENAI_ENDPOINT}/openai/deployments/{AZURE_OPENAI_DEPLOYMENT_NAME}/chat/completions?api-version={AZURE_OPENAI_API_VERSION}"
+    
+    return url, headers, data
+
+def call_azure_openai(prompt: str, max_tokens: int = 200,
+                      priority: int = PRIORITY_INTERACTIVE,
+                      system_prompt: str = SYSTEM_PROMPT,
+                      prompt_version: Optional[str] = None) -> str:
     """
     Call Azure OpenAI API to generate responses.
     Used for eligibility explanations and scheme matching.
+    Waits in the rate limiter's queue (by priority) when the quota is used up.
+    prompt_version labels the latency and token metrics for A/B comparisons.
     """
     if not all([AZURE_OPENAI_API_KEY, AZURE_OPENAI_ENDPOINT]):
-        return "⚠️ Azure OpenAI not configured. Please set your API credentials in .env file."
+        return NOT_CONFIGURED_MESSAGE
     
-    try:
-        headers = {
-            "Content-Type": "application/json",
-            "api-key": AZURE_OPENAI_API_KEY
-        }
-        
-        data = {
-            "messages": [
-                {
-                    "role": "system",
-                    "content": "You are a helpful assistant that explains Indian government schemes in simple, non-legal language. Be concise and clear."
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            "temperature": 0.7,
-            "max_tokens": max_tokens,
-            "top_p": 0.95
-        }
-        
-        url = f"{AZURE_OPENAI_ENDPOINT}/openai/deployments/{AZURE_OPENAI_DEPLOYMENT_NAME}/chat/completions?api-version={AZURE_OPENAI_API_VERSION}"
-        
-        response = requests.post(url, json=data, headers=headers, timeout=10)
-        response.raise_for_status()
+    if not wait_for_capacity(prompt, max_tokens, priority, system_prompt):
+        return RATE_LIMITED_MESSAGE
+    
+    import requests
+    version_labels = {"prompt_version": prompt_version} if prompt_version else {}
+    with METRICS.span(AZURE_REQUEST_METRIC, service="openai", status="error", **version_labels) as span:
+        try:
+            url, headers, data = build_azure_openai_request(prompt, max_tokens, system_prompt=system_prompt)
+            
+            response = AZURE_HTTP_CLIENT.post(url, json=data, headers=headers, timeout=10)
+            span.labels['status'] = str(response.status_code)
+            if response.status_code == 429:
+                return RATE_LIMITED_MESSAGE
+            response.raise_for_status()
+            
+            result = response.json()
+            record_token_usage(result.get('usage'), prompt, system_prompt=system_prompt, prompt_version=prompt_version)
+            return result['choices'][0]['message']['content'].strip()
         
-        result = response.json()
-        return result['choices'][0]['message']['content'].strip()
+        except (CircuitOpenError, requests.exceptions.RequestException) as e:
+            return f"⚠️ Error calling Azure OpenAI: {str(e)}"
+        except Exception as e:
+            return f"⚠️ Unexpected error: {str(e)}"
+
+def record_token_usage(usage: Optional[Dict], prompt: str, completion_tokens: int = 0,
+                       system_prompt: str = SYSTEM_PROMPT, prompt_version: Optional[str] = None):
+    """Count tokens from the response's usage block, or estimate them when Azure sends none (streaming)."""
+    if usage:
+        prompt_tokens, completion_tokens = usage.get('prompt_tokens', 0), usage.get('completion_tokens', 0)
+    else:
+        prompt_tokens = estimate_tokens(system_prompt) + estimate_tokens(prompt)
+    version_labels = {"prompt_version": prompt_version} if prompt_version else {}
+    METRICS.increment(AZURE_TOKENS_METRIC, prompt_tokens, service="openai", kind="prompt", **version_labels)
+    METRICS.increment(AZURE_TOKENS_METRIC, completion_tokens, service="openai", kind="completion", **version_labels)
+
+def stream_azure_openai(prompt: str, max_tokens: int = 200,
+                        priority: int = PRIORITY_INTERACTIVE,
+                        system_prompt: str = SYSTEM_PROMPT,
+                        prompt_version: Optional[str] = None) -> Iterator[str]:
+    """
+    Call Azure OpenAI with stream=true and yield content tokens as they arrive.
+    Errors are yielded as a single "⚠️ ..." chunk, like call_azure_openai returns them.
+    """
+    if not all([AZURE_OPENAI_API_KEY, AZURE_OPENAI_ENDPOINT]):
+        yield NOT_CONFIGURED_MESSAGE
+        return
     
-    except requests.exceptions.RequestException as e:
-        return f"⚠️ Error calling Azure OpenAI: {str(e)}"
-    except Exception as e:
-        return f"⚠️ Unexpected error: {str(e)}"
+    if not wait_for_capacity(prompt, max_tokens, priority, system_prompt):
+        yield RATE_LIMITED_MESSAGE
+        return
+    
+    import requests
+    # The span covers the whole stream, so its latency is time-to-last-token
+    version_labels = {"prompt_version": prompt_version} if prompt_version else {}
+    with METRICS.span(AZURE_REQUEST_METRIC, service="openai_stream", status="error", **version_labels) as span:
+        try:
+            url, headers, data = build_azure_openai_request(prompt, max_tokens, stream=True, system_prompt=system_prompt)
+            
+            response = AZURE_HTTP_CLIENT.post(url, json=data, headers=headers, timeout=10, stream=True)
+            span.labels['status'] = str(response.status_code)
+            with response:
+                if response.status_code == 429:
+                    yield RATE_LIMITED_MESSAGE
+                    return
+                response.raise_for_status()
+                response.encoding = 'utf-8'
+                
+                # Server-sent events: one "data: {json}" line per chunk, ending with "data: [DONE]"
+                chunks = 0
+                usage = None
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data:"):
+                        continue
+                    payload = line[len("data:"):].strip()
+                    if payload == "[DONE]":
+                        break
+                    chunk = json.loads(payload)
+                    usage = chunk.get('usage') or usage
+                    if not chunk.get('choices'):
+                        continue
+                    content = chunk['choices'][0].get('delta', {}).get('content')
+                    if content:
+                        chunks += 1
+                        yield content
+                
+                # Each content chunk carries roughly one token
+                record_token_usage(usage, prompt, chunks, system_prompt=system_prompt, prompt_version=prompt_version)
+        
+        except (CircuitOpenError, requests.exceptions.RequestException) as e:
+            yield f"⚠️ Error calling Azure OpenAI: {str(e)}"
+        except Exception as e:
+            yield f"⚠️ Unexpected error: {str(e)}"
 
 def analyze_text_azure(text: str) -> Dict:
     """
     Analyze user input using Azure Text Analytics.
     Extracts key entities and sentiment.
     """
+    return analyze_texts_azure([text])[0]
+
+def analyze_texts_azure(texts: List[str], language: str = "en",
+                        batch_size: int = TEXT_ANALYTICS_BATCH_SIZE,
+                        cache: Optional[EntityCache] = None) -> List[Dict]:
+    """
+    Run entity recognition over many texts.
+    Cached texts are answered locally; the rest are de-duplicated and packed
+    batch_size documents per request. Returns one result per input, each
+    shaped like a single-document response ({"documents": [...], "errors": [...]}
+    or {"error": "..."}). Only successful results are cached.
+    """
     if not all([AZURE_TEXTANALYTICS_KEY, AZURE_TEXTANALYTICS_ENDPOINT]):
-        return {"error": "Azure Text Analytics not configured"}
+        return [{"error": "Azure Text Analytics not configured"} for _ in texts]
+    
+    if cache is None:
+        cache = get_entity_cache()
     
+    keys = [EntityCache.make_key(text, language) for text in texts]
+    results: Dict[str, Dict] = {}
+    pending: Dict[str, str] = {}
+    for key, text in zip(keys, texts):
+        cached = cache.get(key)
+        if cached is not None:
+            results[key] = cached
+        else:
+            pending.setdefault(key, text)
+        METRICS.increment(CACHE_METRIC, cache="entities", result="miss" if cached is None else "hit")
+    
+    pending_items = list(pending.items())
+    for start in range(0, len(pending_items), max(1, batch_size)):
+        batch = pending_items[start:start + max(1, batch_size)]
+        results.update(_recognize_entities_batch(batch, language, cache))
+    
+    return [results[key] for key in keys]
+
+def _recognize_entities_batch(batch: List[Tuple[str, str]], language: str,
+                              cache: EntityCache) -> Dict[str, Dict]:
+    """Send one entity-recognition request for (key, text) pairs and fan the response out per key."""
+    import requests
     try:
         headers = {
             "Content-Type": "application/json",
             "Ocp-Apim-Subscription-Key": AZURE_TEXTANALYTICS_KEY
         }
         
+        # Document ids are positions in the batch
         data = {
             "documents": [
                 {
-                    "id": "1",
-                    "language": "en",
+                    "id": str(i),
+                    "language": language,
                     "text": text
                 }
+                for i, (_, text) in enumerate(batch)
             ]
         }
         
-        url = f"{AZURE_TEXTANALYTICS_ENDPOINT}/text/analytics/v3.1/entities/recognition/general"
+        url = f"{AZURE_TEXTANALYTICS_ENDPOINT}/text/analytics/{TEXT_ANALYTICS_API_VERSION}/entities/recognition/general"
         
-        response = requests.post(url, json=data, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        return response.json()
+        with METRICS.span(AZURE_REQUEST_METRIC, service="textanalytics", status="error") as span:
+            response = AZURE_HTTP_CLIENT.post(url, json=data, headers=headers, timeout=10)
+            span.labels['status'] = str(response.status_code)
+            response.raise_for_status()
+            
+            result = response.json()
     
-    except requests.exceptions.RequestException as e:
-        return {"error": f"Error calling Azure Text Analytics: {str(e)}"}
+    except (CircuitOpenError, requests.exceptions.RequestException) as e:
+        return {key: {"error": f"Error calling Azure Text Analytics: {str(e)}"} for key, _ in batch}
     except Exception as e:
-        return {"error": f"Unexpected error: {str(e)}"}
+        return {key: {"error": f"Unexpected error: {str(e)}"} for key, _ in batch}
+    
+    model_version = result.get('modelVersion')
+    documents = {doc['id']: doc for doc in result.get('documents', [])}
+    errors = {err['id']: err for err in result.get('errors', [])}
+    
+    fanned_out = {}
+    for i, (key, _) in enumerate(batch):
+        doc_id = str(i)
+        if doc_id in documents:
+            documents[doc_id]['id'] = "1"
+            fanned_out[key] = {"documents": [documents[doc_id]], "errors": [], "modelVersion": model_version}
+            cache.put(key, fanned_out[key])
+        elif doc_id in errors:
+            errors[doc_id]['id'] = "1"
+            fanned_out[key] = {"documents": [], "errors": [errors[doc_id]], "modelVersion": model_version}
+        else:
+            fanned_out[key] = {"error": "Azure Text Analytics returned no result for this document"}
+    return fanned_out
 
-def generate_eligibility_explanation(scheme: Dict, user_profile: str) -> Tuple[str, int]:
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+def compact_scheme_context(scheme: Dict) -> str:
+    """Whitespace-free scheme summary used as the prompt's context block."""
+    def clean(value) -> str:
+        return _WHITESPACE_PATTERN.sub(" ", str(value)).strip()
+    return (f"Scheme: {clean(scheme['name'])}\n"
+            f"Ministry: {clean(scheme['ministry'])}\n"
+            f"For: {clean(scheme['beneficiary'])}\n"
+            f"Benefit: {clean(scheme['benefit'])}")
+
+class SchemePromptContexts:
     """
-    Generate AI-powered eligibility explanation and match score.
-    Returns: (explanation_text, match_score_percentage)
+    Compact prompt context blocks (and their token estimates) for every scheme,
+    built once per catalog snapshot instead of on every explanation request.
+    After a reload only changed schemes are rebuilt.
     """
-    prompt = f"""
+    
+    def __init__(self, schemes: List[Dict], previous: Optional['SchemePromptContexts'] = None,
+                 changed_ids: Optional[set] = None):
+        self.schemes = schemes
+        self.positions = {scheme['id']: pos for pos, scheme in enumerate(schemes)}
+        self.blocks: Dict[str, str] = {}
+        self.tokens: Dict[str, int] = {}
+        for scheme in schemes:
+            scheme_id = scheme['id']
+            if previous is not None and changed_ids is not None and scheme_id not in changed_ids \
+                    and scheme_id in previous.blocks:
+                self.blocks[scheme_id] = previous.blocks[scheme_id]
+                self.tokens[scheme_id] = previous.tokens[scheme_id]
+            else:
+                self.blocks[scheme_id] = compact_scheme_context(scheme)
+                self.tokens[scheme_id] = estimate_tokens(self.blocks[scheme_id])
+    
+    @classmethod
+    def for_schemes(cls, schemes: List[Dict]) -> 'SchemePromptContexts':
+        """Return the contexts for this exact list object, building them on first use."""
+        return catalog_for_schemes(schemes).derived('prompt_contexts', cls)
+    
+    @classmethod
+    def context_for(cls, scheme: Dict) -> str:
+        """
+        The precompiled block of the catalog snapshot this exact record belongs to: the
+        store's latest (after a hot reload in a long-lived process such as the API) or
+        the one pinned for this script run. Other records are compacted on the fly.
+        """
+        for catalog in (get_catalog_store()._catalog, CATALOG):
+            if catalog.by_id.get(scheme['id']) is scheme:
+                return catalog.derived('prompt_contexts', cls).get(scheme)
+        return compact_scheme_context(scheme)
+    
+    def get(self, scheme: Dict) -> str:
+        pos = self.positions.get(scheme['id'])
+        if pos is None or self.schemes[pos] is not scheme:
+            return compact_scheme_context(scheme)
+        return self.blocks[scheme['id']]
+
+def _legacy_eligibility_prompt(scheme: Dict, user_profile: str) -> str:
+    """v1: the original indented prompt, kept so it can be A/B compared against v2."""
+    return f"""
     Scheme Name: {scheme['name']}
     Ministry: {scheme['ministry']}
     Beneficiary Type: {scheme['beneficiary']}
@@ -189,41 +2117,468 @@ def generate_eligibility_explanation(scheme: Dict, user_profile: str) -> Tuple[s
     
     Keep language simple and non-legal.
     """
+
+def _compact_eligibility_prompt(scheme: Dict, user_profile: str) -> str:
+    """v2: precompiled context block and a one-line instruction."""
+    context = SchemePromptContexts.context_for(scheme)
+    return (f"{context}\nUser: {user_profile}\n"
+            "In 2-3 simple sentences: why the user might be eligible, any eligibility gaps, next steps.")
+
+# Prompt versions: system message plus user-prompt builder
+ELIGIBILITY_PROMPTS = {
+    "v1": {"system": SYSTEM_PROMPT, "build": _legacy_eligibility_prompt},
+    "v2": {"system": "Explain Indian government schemes in simple, non-legal language. Be concise.",
+           "build": _compact_eligibility_prompt},
+}
+
+def parse_prompt_versions(spec: str) -> List[Tuple[str, float]]:
+    """Parse "v2" or "v1:50,v2:50" into (version, weight) pairs, skipping unknown versions."""
+    variants = []
+    for part in spec.split(","):
+        name, _, weight = part.strip().partition(":")
+        if name in ELIGIBILITY_PROMPTS:
+            try:
+                variants.append((name, max(0.0, float(weight)) if weight else 1.0))
+            except ValueError:
+                continue
+    variants = [(name, weight) for name, weight in variants if weight > 0]
+    return variants or [("v2", 1.0)]
+
+PROMPT_VARIANTS = parse_prompt_versions(ELIGIBILITY_PROMPT_VERSIONS)
+
+def choose_prompt_version(scheme_id: str, user_profile: str) -> str:
+    """Deterministic A/B assignment, so a scheme/profile pair always gets the same prompt (and cache entry)."""
+    if len(PROMPT_VARIANTS) == 1:
+        return PROMPT_VARIANTS[0][0]
+    digest = hashlib.sha1(f"{scheme_id}|{normalize_profile(user_profile)}".encode('utf-8')).hexdigest()
+    point = int(digest[:8], 16) / 0x100000000 * sum(weight for _, weight in PROMPT_VARIANTS)
+    for name, weight in PROMPT_VARIANTS:
+        point -= weight
+        if point < 0:
+            return name
+    return PROMPT_VARIANTS[-1][0]
+
+def build_eligibility_request(scheme: Dict, user_profile: str,
+                              prompt_version: Optional[str] = None) -> Tuple[str, str, str]:
+    """Return (prompt_version, system_prompt, user_prompt) for one scheme and profile."""
+    version = prompt_version or choose_prompt_version(scheme['id'], user_profile)
+    prompt = ELIGIBILITY_PROMPTS[version]
+    return version, prompt["system"], prompt["build"](scheme, user_profile)
+
+def build_eligibility_prompt(scheme: Dict, user_profile: str) -> str:
+    """Build the eligibility-explanation prompt for one scheme and profile."""
+    return build_eligibility_request(scheme, user_profile)[2]
+
+def lookup_explanation(scheme: Dict, user_profile: str, cache: ExplanationCache) -> Optional[str]:
+    """A cached explanation from the pair's A/B prompt version, else from a batch call."""
+    cached = cache.get(ExplanationCache.make_key(scheme, user_profile))
+    if cached is None:
+        cached = cache.get(ExplanationCache.make_key(scheme, user_profile, prompt_version=BATCH_PROMPT_VERSION))
+    return cached
+
+def explain_eligibility(scheme: Dict, user_profile: str,
+                        cache: Optional[ExplanationCache] = None,
+                        priority: int = PRIORITY_INTERACTIVE) -> str:
+    """
+    Generate the AI-powered eligibility explanation for a single scheme.
+    This is the only path that reaches Azure OpenAI - call it lazily,
+    e.g. when a card is expanded, never just to obtain a match score.
+    Results are served from the shared explanation cache when available.
+    Pass the cache explicitly when calling from a worker thread, and
+    PRIORITY_BACKGROUND for work no user is waiting on.
+    """
+    if cache is None:
+        cache = get_explanation_cache()
+    cache_key = ExplanationCache.make_key(scheme, user_profile)
+    cached = lookup_explanation(scheme, user_profile, cache)
+    METRICS.increment(CACHE_METRIC, cache="explanations", result="miss" if cached is None else "hit")
+    if cached is not None:
+        return cached
+    
+    # Concurrent sessions asking for the same explanation share one Azure call
+    try:
+        explanation, shared = SINGLE_FLIGHT.do(
+            cache_key,
+            lambda: _explain_uncached(scheme, user_profile, cache, cache_key, priority),
+            timeout=SINGLE_FLIGHT_TIMEOUT_SECONDS
+        )
+    except TimeoutError:
+        # The call we waited on is still running: report busy, as the rate limiter does
+        return lookup_explanation(scheme, user_profile, cache) or RATE_LIMITED_MESSAGE
+    if shared:
+        METRICS.increment(COALESCED_METRIC, scope="process")
+    return explanation
+
+def _explain_uncached(scheme: Dict, user_profile: str, cache: ExplanationCache, cache_key: str,
+                      priority: int = PRIORITY_INTERACTIVE) -> str:
+    """Leader path of explain_eligibility: one Azure call per key across processes sharing the cache."""
+    with cross_process_lock(cache_key) as locked:
+        # Another process may have produced it while we waited for the lock
+        if locked:
+            cached = lookup_explanation(scheme, user_profile, cache)
+            if cached is not None:
+                METRICS.increment(COALESCED_METRIC, scope="cross_process")
+                return cached
+        
+        version, system_prompt, prompt = build_eligibility_request(scheme, user_profile)
+        explanation = call_azure_openai(prompt, max_tokens=150, priority=priority,
+                                        system_prompt=system_prompt, prompt_version=version)
+        
+        # Never cache configuration or transport errors
+        if not explanation.startswith("⚠️"):
+            cache.put(cache_key, scheme, explanation)
+    
+    return explanation
+
+def stream_eligibility_explanation(scheme: Dict, user_profile: str,
+                                   cache: Optional[ExplanationCache] = None) -> Iterator[str]:
+    """
+    Streaming variant of explain_eligibility for st.write_stream.
+    A cached explanation is yielded in one piece; a fresh one is cached once complete.
+    """
+    if cache is None:
+        cache = get_explanation_cache()
+    cache_key = ExplanationCache.make_key(scheme, user_profile)
+    cached = lookup_explanation(scheme, user_profile, cache)
+    METRICS.increment(CACHE_METRIC, cache="explanations", result="miss" if cached is None else "hit")
+    if cached is not None:
+        yield cached
+        return
+    
+    # Someone else is already generating it: wait and show their result in one piece
+    flight, leader = SINGLE_FLIGHT.join(cache_key)
+    if not leader:
+        METRICS.increment(COALESCED_METRIC, scope="process")
+        try:
+            yield flight.wait(SINGLE_FLIGHT_TIMEOUT_SECONDS)
+        except Exception:
+            yield explain_eligibility(scheme, user_profile, cache)
+        return
     
-    explanation = call_azure_openai(prompt, max_tokens=150)
+    parts = []
+    explanation = None
+    try:
+        with cross_process_lock(cache_key) as locked:
+            cached = lookup_explanation(scheme, user_profile, cache) if locked else None
+            if cached is not None:
+                METRICS.increment(COALESCED_METRIC, scope="cross_process")
+                explanation = cached
+                yield cached
+                return
+            
+            version, system_prompt, prompt = build_eligibility_request(scheme, user_profile)
+            for token in stream_azure_openai(prompt, max_tokens=150, system_prompt=system_prompt,
+                                             prompt_version=version):
+                parts.append(token)
+                yield token
+            
+            explanation = "".join(parts).strip()
+            if explanation and not explanation.startswith("⚠️") and not any(p.startswith("⚠️") for p in parts):
+                cache.put(cache_key, scheme, explanation)
+    finally:
+        # A stream abandoned part-way leaves followers to generate it themselves
+        if explanation is None:
+            SINGLE_FLIGHT.finish(cache_key, flight, error=RuntimeError("Explanation stream was interrupted"))
+        else:
+            SINGLE_FLIGHT.finish(cache_key, flight, explanation)
+
+def generate_eligibility_explanation(scheme: Dict, user_profile: str) -> Tuple[str, int]:
+    """
+    Generate AI-powered eligibility explanation and match score.
+    Returns: (explanation_text, match_score_percentage)
+    """
+    explanation = explain_eligibility(scheme, user_profile)
     
     # Calculate match score (in production, this would be more sophisticated)
     # For now, based on keyword matching
-    match_score = calculate_match_score(scheme, user_profile)
+    match_score = get_match_score(scheme, user_profile)
     
     return explanation, match_score
 
+def generate_explanations_concurrently(schemes: List[Dict], user_profile: str,
+                                       max_in_flight: int = LLM_MAX_IN_FLIGHT,
+                                       priority: int = PRIORITY_INTERACTIVE) -> Iterator[Tuple[str, str]]:
+    """
+    Generate explanations for several schemes in parallel.
+    At most max_in_flight Azure OpenAI calls run at once; results are
+    yielded as (scheme_id, explanation) in completion order.
+    """
+    unique_schemes = {s['id']: s for s in schemes}
+    if not unique_schemes:
+        return
+    
+    # Resolve the shared cache on the calling thread; workers have no Streamlit context
+    cache = get_explanation_cache()
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(max_in_flight, len(unique_schemes)))) as pool:
+        futures = {
+            pool.submit(explain_eligibility, scheme, user_profile, cache, priority): scheme_id
+            for scheme_id, scheme in unique_schemes.items()
+        }
+        for future in as_completed(futures):
+            try:
+                explanation = future.result()
+            except Exception as e:
+                explanation = f"⚠️ Unexpected error: {str(e)}"
+            yield futures[future], explanation
+
+BATCH_PROMPT_VERSION = "batch-v1"
+BATCH_SYSTEM_PROMPT = ELIGIBILITY_PROMPTS["v2"]["system"] + " Reply with JSON only."
+
+# Completion budget per scheme in a batch call (a single explanation gets 150)
+BATCH_TOKENS_PER_SCHEME = 130
+
+def build_batch_explanation_prompt(schemes: List[Dict], user_profile: str) -> str:
+    """One prompt carrying the profile once and the compact context of every scheme."""
+    blocks = "\n\n".join(f"[{scheme['id']}]\n{SchemePromptContexts.context_for(scheme)}" for scheme in schemes)
+    return (f"User: {user_profile}\n\n{blocks}\n\n"
+            "For each scheme, in 2-3 simple sentences: why the user might be eligible, any eligibility gaps, next steps.\n"
+            'Format: {"explanations": [{"id": "<scheme id>", "explanation": "<text>"}]}')
+
+def parse_batch_explanations(text: str, expected_ids: List[str]) -> Dict[str, str]:
+    """
+    Extract {scheme_id: explanation} from a batch reply. Tolerates code fences and
+    prose around the JSON; entries with unknown ids or non-text explanations are dropped.
+    """
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end <= start:
+        return {}
+    try:
+        payload = json.loads(text[start:end + 1])
+    except ValueError:
+        return {}
+    
+    entries = payload.get("explanations") if isinstance(payload, dict) else None
+    if isinstance(entries, list):
+        pairs = [(e.get("id"), e.get("explanation")) for e in entries if isinstance(e, dict)]
+    elif isinstance(payload, dict):
+        pairs = list(payload.items())
+    else:
+        return {}
+    
+    expected = set(expected_ids)
+    return {
+        str(scheme_id): explanation.strip() for scheme_id, explanation in pairs
+        if str(scheme_id) in expected and isinstance(explanation, str) and explanation.strip()
+    }
+
+def _explain_chunk(chunk: List[Tuple[Dict, str]], user_profile: str, cache: ExplanationCache,
+                   priority: int) -> List[Tuple[Dict, Optional[str]]]:
+    """
+    Explain several (scheme, batch cache key) pairs with one call. Identical chunks
+    share that call across sessions and processes, like explain_eligibility.
+    Schemes missing from the reply come back with None, to be explained individually.
+    """
+    chunk_key = hashlib.sha256("|".join(key for _, key in chunk).encode('utf-8')).hexdigest()
+    try:
+        results, shared = SINGLE_FLIGHT.do(
+            chunk_key,
+            lambda: _explain_chunk_uncached(chunk, user_profile, cache, chunk_key, priority),
+            timeout=SINGLE_FLIGHT_TIMEOUT_SECONDS
+        )
+    except TimeoutError:
+        return [(scheme, cache.get(cache_key) or RATE_LIMITED_MESSAGE) for scheme, cache_key in chunk]
+    if shared:
+        METRICS.increment(COALESCED_METRIC, scope="process")
+    return results
+
+def _explain_chunk_uncached(chunk: List[Tuple[Dict, str]], user_profile: str, cache: ExplanationCache,
+                            chunk_key: str, priority: int) -> List[Tuple[Dict, Optional[str]]]:
+    """Leader path of _explain_chunk: one batch call per chunk across processes sharing the cache."""
+    with cross_process_lock(chunk_key) as locked:
+        # Another process may have produced them while we waited for the lock
+        if locked:
+            cached = [(scheme, cache.get(cache_key)) for scheme, cache_key in chunk]
+            if all(explanation is not None for _, explanation in cached):
+                METRICS.increment(COALESCED_METRIC, scope="cross_process")
+                return cached
+        
+        schemes = [scheme for scheme, _ in chunk]
+        reply = call_azure_openai(
+            build_batch_explanation_prompt(schemes, user_profile),
+            max_tokens=BATCH_TOKENS_PER_SCHEME * len(chunk),
+            priority=priority,
+            system_prompt=BATCH_SYSTEM_PROMPT,
+            prompt_version=BATCH_PROMPT_VERSION
+        )
+        # A failed call (not configured, busy, transport error) is reported as-is for every scheme
+        if reply.startswith("⚠️"):
+            return [(scheme, reply) for scheme in schemes]
+        
+        # Stored under the batch prompt version, apart from the v1/v2 A/B entries
+        parsed = parse_batch_explanations(reply, [scheme['id'] for scheme in schemes])
+        results = []
+        for scheme, cache_key in chunk:
+            explanation = parsed.get(scheme['id'])
+            if explanation is not None:
+                cache.put(cache_key, scheme, explanation)
+            results.append((scheme, explanation))
+    return results
+
+def generate_explanations_batched(schemes: List[Dict], user_profile: str,
+                                  batch_size: int = EXPLANATION_BATCH_SIZE,
+                                  max_in_flight: int = LLM_MAX_IN_FLIGHT,
+                                  priority: int = PRIORITY_INTERACTIVE,
+                                  cache: Optional[ExplanationCache] = None) -> Iterator[Tuple[str, str]]:
+    """
+    Like generate_explanations_concurrently, but uncached schemes are explained
+    batch_size at a time in one structured call each, sending the profile and
+    system prompt once per batch instead of once per scheme. Entries missing
+    or malformed in a reply go back to the pool to be explained individually.
+    Results are cached per scheme and yielded as (scheme_id, explanation) as they finish.
+    """
+    unique_schemes = {s['id']: s for s in schemes}
+    if not unique_schemes:
+        return
+    if cache is None:
+        cache = get_explanation_cache()
+    
+    pending = []
+    for scheme_id, scheme in unique_schemes.items():
+        cached = lookup_explanation(scheme, user_profile, cache)
+        METRICS.increment(CACHE_METRIC, cache="explanations", result="miss" if cached is None else "hit")
+        if cached is not None:
+            yield scheme_id, cached
+        else:
+            pending.append((scheme, ExplanationCache.make_key(scheme, user_profile,
+                                                              prompt_version=BATCH_PROMPT_VERSION)))
+    if not pending:
+        return
+    
+    chunks = [pending[i:i + max(1, batch_size)] for i in range(0, len(pending), max(1, batch_size))]
+    # Sized for the worst case of every scheme falling back to its own call
+    with ThreadPoolExecutor(max_workers=max(1, min(max_in_flight, len(pending)))) as pool:
+        futures = {}
+        
+        def submit_single(scheme: Dict):
+            futures[pool.submit(explain_eligibility, scheme, user_profile, cache, priority)] = [scheme]
+        
+        for chunk in chunks:
+            if len(chunk) == 1:
+                submit_single(chunk[0][0])
+            else:
+                futures[pool.submit(_explain_chunk, chunk, user_profile, cache, priority)] = [s for s, _ in chunk]
+        
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk_schemes = futures.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = [(scheme, f"⚠️ Unexpected error: {str(e)}") for scheme in chunk_schemes]
+                if isinstance(result, str):
+                    result = [(chunk_schemes[0], result)]
+                for scheme, explanation in result:
+                    if explanation is None:
+                        METRICS.increment(BATCH_FALLBACK_METRIC)
+                        submit_single(scheme)
+                    else:
+                        yield scheme['id'], explanation
+
+# Keyword matching used for the eligibility match score
+MATCH_KEYWORDS = [
+    'farmer', 'women', 'youth', 'student', 'senior', 'elder', 'msme', 'business',
+    'entrepreneur', 'girl', 'female', 'young', 'old', 'small', 'enterprise'
+]
+MATCH_BASE_SCORE = 50
+MATCH_KEYWORD_SCORE = 5
+MATCH_MAX_SCORE = 95
+
 def calculate_match_score(scheme: Dict, user_profile: str) -> int:
     """Calculate match percentage based on keyword matching."""
     scheme_text = f"{scheme['name']} {scheme['beneficiary']} {scheme['category']}".lower()
     profile_text = user_profile.lower()
     
-    keywords = [
-        'farmer', 'women', 'youth', 'student', 'senior', 'elder', 'msme', 'business',
-        'entrepreneur', 'girl', 'female', 'young', 'old', 'small', 'enterprise'
-    ]
-    
-    matches = sum(1 for keyword in keywords if keyword in scheme_text and keyword in profile_text)
+    matches = sum(1 for keyword in MATCH_KEYWORDS if keyword in scheme_text and keyword in profile_text)
     
     # Base score + keyword matches
-    base_score = 50
-    additional_score = matches * 5
+    base_score = MATCH_BASE_SCORE
+    additional_score = matches * MATCH_KEYWORD_SCORE
+    
+    return min(MATCH_MAX_SCORE, base_score + additional_score)  # Cap at 95%
+
+def profile_keyword_vector(user_profile: str) -> np.ndarray:
+    """0/1 vector marking which match keywords occur in the profile."""
+    profile_text = user_profile.lower()
+    return np.array([keyword in profile_text for keyword in MATCH_KEYWORDS], dtype=np.int32)
+
+class KeywordFeatureMatrix:
+    """
+    Precomputed scheme x keyword matrix for vectorized match scoring.
+    score() gives the same result as calculate_match_score for every scheme
+    in the catalog with a single matrix-vector product.
+    Given a previous matrix and the changed scheme ids, rows of unchanged
+    schemes are copied over and only the changed rows are recomputed.
+    """
+    
+    _MAX_CACHED_PROFILES = 64
+    
+    def __init__(self, schemes: List[Dict], previous: Optional['KeywordFeatureMatrix'] = None,
+                 changed_ids: Optional[set] = None):
+        self.schemes = schemes
+        self.positions = {scheme['id']: pos for pos, scheme in enumerate(schemes)}
+        self.matrix = np.zeros((len(schemes), len(MATCH_KEYWORDS)), dtype=np.int32)
+        
+        if previous is None or changed_ids is None:
+            to_compute = range(len(schemes))
+        else:
+            reused = [
+                (pos, previous.positions[sid]) for sid, pos in self.positions.items()
+                if sid not in changed_ids and sid in previous.positions
+            ]
+            if reused:
+                new_rows, old_rows = (np.array(rows, dtype=np.intp) for rows in zip(*reused))
+                self.matrix[new_rows] = previous.matrix[old_rows]
+            to_compute = [self.positions[sid] for sid in changed_ids if sid in self.positions]
+        
+        for pos in to_compute:
+            scheme = schemes[pos]
+            scheme_text = f"{scheme['name']} {scheme['beneficiary']} {scheme['category']}".lower()
+            self.matrix[pos] = [keyword in scheme_text for keyword in MATCH_KEYWORDS]
+        # Shared by every session and script thread
+        self._profile_scores: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
     
-    return min(95, base_score + additional_score)  # Cap at 95%
+    @classmethod
+    def for_schemes(cls, schemes: List[Dict]) -> 'KeywordFeatureMatrix':
+        """Return the matrix for this exact list object, building it on first use."""
+        return catalog_for_schemes(schemes).derived('keyword_matrix', cls)
+    
+    def score(self, user_profile: str) -> np.ndarray:
+        """Match scores for the whole catalog, aligned with the scheme list (read-only)."""
+        profile_key = user_profile.lower()
+        scores = self._profile_scores.get(profile_key)
+        if scores is None:
+            matches = self.matrix @ profile_keyword_vector(user_profile)
+            scores = np.minimum(MATCH_MAX_SCORE, MATCH_BASE_SCORE + MATCH_KEYWORD_SCORE * matches)
+            scores.setflags(write=False)
+            with self._lock:
+                if profile_key not in self._profile_scores and len(self._profile_scores) >= self._MAX_CACHED_PROFILES:
+                    self._profile_scores.pop(next(iter(self._profile_scores)))
+                self._profile_scores[profile_key] = scores
+        return scores
+
+def get_match_score(scheme: Dict, user_profile: str) -> int:
+    """Match score for one scheme, read from the precomputed catalog scores."""
+    feature_matrix = KeywordFeatureMatrix.for_schemes(SCHEMES)
+    pos = feature_matrix.positions.get(scheme['id'])
+    if pos is None or feature_matrix.schemes[pos] is not scheme:
+        return calculate_match_score(scheme, user_profile)
+    return int(feature_matrix.score(user_profile)[pos])
 
 # ============================================================================
 # UI STYLING & EMBEDDED CSS
 # ============================================================================
 
-def inject_css():
-    """Inject custom CSS with India-inspired color palette and dark theme."""
-    css = """
-    <style>
+# Static assets: "auto" serves the stylesheet as a content-hashed file from ./static when
+# Streamlit's server.enableStaticServing is on (see .streamlit/config.toml), else inlines it
+STATIC_ASSETS_MODE = os.getenv("SCHEMEMITRA_STATIC_ASSETS", "auto")
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+# Stylesheet source, India-inspired color palette and dark theme. It is minified and
+# hashed once per process; reruns only ship a short <style> reference to it.
+APP_CSS = """
     /* Color Palette - India Inspired with Dark Theme */
     :root {
         --primary-blue: #0B5ED7;
@@ -317,27 +2672,408 @@ def inject_css():
         background-color: rgba(19, 136, 8, 0.1) !important;
     }
     
-    /* Info styling */
-    .stInfo {
-        border-left: 4px solid var(--primary-blue) !important;
-        background-color: rgba(11, 94, 215, 0.1) !important;
-    }
+    /* Info styling */
+    .stInfo {
+        border-left: 4px solid var(--primary-blue) !important;
+        background-color: rgba(11, 94, 215, 0.1) !important;
+    }
+    
+    /* Warning styling */
+    .stWarning {
+        border-left: 4px solid var(--secondary-saffron) !important;
+        background-color: rgba(255, 153, 51, 0.1) !important;
+    }
+    
+    /* Error styling */
+    .stError {
+        border-left: 4px solid var(--warning-navy) !important;
+        background-color: rgba(0, 51, 102, 0.1) !important;
+    }
+    
+    /* App background */
+    [data-testid="stAppViewContainer"] {
+        background-color: #0F172A;
+    }
+    
+    /* Landing page hero */
+    .hero-section {
+        background: linear-gradient(135deg, #0B5ED7 0%, #003366 100%);
+        padding: 5rem 3rem;
+        border-radius: 16px;
+        color: white;
+        text-align: center;
+        margin-bottom: 4rem;
+        box-shadow: 0 20px 60px rgba(0, 0, 0, 0.4);
+    }
+    .hero-title {
+        font-size: 3.5rem;
+        font-weight: 900;
+        margin: 0;
+        letter-spacing: -1px;
+    }
+    .hero-subtitle {
+        font-size: 1.6rem;
+        color: #FFD700;
+        margin: 1.5rem 0 0.5rem;
+        font-weight: 700;
+    }
+    .hero-description {
+        font-size: 1.1rem;
+        color: #D1D5DB;
+        margin: 0.5rem 0 0;
+        max-width: 600px;
+        margin-left: auto;
+        margin-right: auto;
+        line-height: 1.6;
+    }
+    
+    /* Landing page sections */
+    .sm-section-heading {
+        margin-bottom: 4rem;
+    }
+    .sm-section-heading h2 {
+        color: #FF9933;
+        font-size: 2.2rem;
+        text-align: center;
+        margin-bottom: 3rem;
+        font-weight: 800;
+    }
+    .sm-feature {
+        background: #1F2937;
+        padding: 2.5rem;
+        border-radius: 12px;
+        border: 2px solid #374151;
+        height: 100%;
+        transition: all 0.3s ease;
+    }
+    .sm-feature-icon {
+        font-size: 3rem;
+        margin-bottom: 1rem;
+        text-align: center;
+    }
+    .sm-feature h3 {
+        color: #FF9933;
+        margin: 0 0 0.75rem 0;
+        text-align: center;
+        font-size: 1.2rem;
+    }
+    .sm-feature p {
+        color: #D1D5DB;
+        margin: 0;
+        text-align: center;
+        line-height: 1.6;
+    }
+    .sm-step {
+        text-align: center;
+    }
+    .sm-step-number {
+        width: 80px;
+        height: 80px;
+        border-radius: 50%;
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        margin: 0 auto 1rem;
+        font-size: 2rem;
+        font-weight: 900;
+        color: #fff;
+    }
+    .sm-step-saffron {
+        background: linear-gradient(135deg, #FF9933, #FFB366);
+        color: #0F172A;
+    }
+    .sm-step-blue {
+        background: linear-gradient(135deg, #0B5ED7, #003366);
+    }
+    .sm-step-green {
+        background: linear-gradient(135deg, #138808, #1FBF1F);
+    }
+    .sm-step h4 {
+        color: #F3F4F6;
+        margin: 0 0 0.5rem 0;
+        font-size: 1rem;
+    }
+    .sm-step p {
+        color: #D1D5DB;
+        font-size: 0.85rem;
+        margin: 0;
+        line-height: 1.5;
+    }
+    .sm-tile {
+        text-align: center;
+        padding: 1.5rem;
+        background: #1F2937;
+        border-radius: 10px;
+        border: 2px solid #374151;
+    }
+    .sm-tile-icon {
+        font-size: 2.5rem;
+        margin-bottom: 0.5rem;
+    }
+    .sm-tile-name {
+        color: #F3F4F6;
+        font-weight: 600;
+        margin: 0;
+        font-size: 0.9rem;
+    }
+    .sm-tile-tech {
+        color: #FF9933;
+        font-weight: 700;
+        margin: 0;
+        font-size: 0.85rem;
+    }
+    .sm-tile-caption {
+        color: #D1D5DB;
+        font-size: 0.75rem;
+        margin: 0.5rem 0 0 0;
+    }
+    .sm-cta {
+        background: linear-gradient(135deg, #0B5ED7 0%, #FF9933 100%);
+        padding: 3.5rem 2.5rem;
+        border-radius: 12px;
+        text-align: center;
+        margin-bottom: 2rem;
+        box-shadow: 0 15px 40px rgba(11, 94, 215, 0.25);
+    }
+    .sm-cta h2 {
+        color: white;
+        font-size: 2.2rem;
+        margin: 0 0 1rem 0;
+        font-weight: 900;
+    }
+    .sm-cta p {
+        color: #F3F4F6;
+        font-size: 1.1rem;
+        margin: 0;
+        line-height: 1.6;
+    }
+    .sm-landing-disclaimer {
+        background: rgba(255, 153, 51, 0.1);
+        border: 2px solid #FF9933;
+        padding: 2rem;
+        border-radius: 10px;
+    }
+    .sm-landing-disclaimer .sm-title {
+        color: #FF9933;
+        font-weight: 800;
+        margin: 0 0 0.75rem 0;
+        font-size: 1.1rem;
+    }
+    .sm-landing-disclaimer .sm-body {
+        color: #D1D5DB;
+        margin: 0;
+        line-height: 1.8;
+    }
+    
+    /* Scheme cards (one per result) */
+    .sm-badge-active {
+        background-color: #138808;
+        color: white;
+        padding: 6px 12px;
+        border-radius: 20px;
+        font-size: 12px;
+        font-weight: bold;
+        text-align: center;
+        white-space: nowrap;
+    }
+    .sm-benefit {
+        background: rgba(255, 153, 51, 0.15);
+        padding: 1rem;
+        border-left: 3px solid #FF9933;
+        border-radius: 6px;
+        margin: 1rem 0;
+        color: #F3F4F6;
+    }
+    .sm-match {
+        display: flex;
+        align-items: center;
+        gap: 10px;
+        margin: 1rem 0;
+        padding: 0.8rem;
+        background: rgba(11, 94, 215, 0.15);
+        border-radius: 6px;
+        border: 1px solid #374151;
+    }
+    .sm-match-label {
+        font-size: 0.9rem;
+        color: #D1D5DB;
+    }
+    .sm-match-track {
+        flex: 1;
+        height: 8px;
+        background: #374151;
+        border-radius: 4px;
+        overflow: hidden;
+    }
+    .sm-match-fill {
+        height: 100%;
+        background: linear-gradient(90deg, #138808, #FF9933);
+    }
+    .sm-match-value {
+        font-weight: 700;
+        color: #FF9933;
+        min-width: 45px;
+        text-align: right;
+    }
+    """
+
+_CSS_COMMENT_PATTERN = re.compile(r"/\*.*?\*/", re.S)
+_CSS_PUNCTUATION_PATTERN = re.compile(r"\s*([{};,>])\s*")
+_HTML_GAP_PATTERN = re.compile(r">\s+<")
+
+def minify_css(css: str) -> str:
+    """Strip comments and redundant whitespace from a stylesheet."""
+    css = _CSS_COMMENT_PATTERN.sub("", css)
+    css = _WHITESPACE_PATTERN.sub(" ", css)
+    css = _CSS_PUNCTUATION_PATTERN.sub(r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+@lru_cache(maxsize=512)
+def compact_html(markup: str) -> str:
+    """Collapse the indentation and line breaks of an HTML snippet (memoized per snippet)."""
+    return _WHITESPACE_PATTERN.sub(" ", _HTML_GAP_PATTERN.sub("><", markup.strip()))
+
+def section_heading(title: str) -> str:
+    return f'<div class="sm-section-heading"><h2>{title}</h2></div>'
+
+LANDING_FEATURES = [
+    ("🤖", "AI-Powered Matching", "Azure OpenAI analyzes your profile and matches you with relevant schemes instantly."),
+    ("📊", "Real-Time Analysis", "Advanced Text Analytics extract your key information to determine eligibility accurately."),
+    ("📚", "12+ Schemes", "Verified schemes from government portals covering all major beneficiary categories."),
+    ("⭐", "Bookmarking", "Save your favorite schemes for later and build your personalized opportunities list."),
+    ("🔐", "Privacy First", "No login required. No personal data stored. No external tracking. Ever."),
+    ("🌐", "Official Links", "Every scheme links directly to official government portals for verification."),
+]
+
+LANDING_STEPS = [
+    ("1", "saffron", "Tell Us About Yourself", "Share basic information like age, category, and skills."),
+    ("2", "blue", "AI Analyzes", "Our AI engine matches you with relevant schemes."),
+    ("3", "green", "Review Results", "Check eligibility and learn why you match."),
+    ("4", "saffron", "Apply Now", "Bookmark and apply via official portals."),
+]
+
+LANDING_CATEGORIES = [
+    ("🌾", "Farmers"),
+    ("👩‍💼", "Women"),
+    ("👨‍🎓", "Youth"),
+    ("🏭", "MSME"),
+    ("📚", "Education"),
+    ("👴", "Seniors"),
+]
+
+LANDING_TECH_STACK = [
+    ("Streamlit", "Frontend"),
+    ("Python 3.9+", "Language"),
+    ("Azure OpenAI", "AI"),
+    ("Text Analytics", "NLP"),
+    ("Gov Data", "Source"),
+    ("Cloud", "Deploy"),
+]
+
+class StaticAssets:
+    """
+    The minified, content-hashed stylesheet and the precompiled landing page
+    markup, built once per process. When static serving is available the
+    stylesheet is written to ./static/schememitra.<hash>.css and each rerun
+    ships only an @import of it; otherwise the minified CSS is inlined.
+    """
+    
+    def __init__(self, css: str, mode: str = STATIC_ASSETS_MODE, static_dir: str = STATIC_DIR):
+        self.css = minify_css(css)
+        self.css_hash = hashlib.sha256(self.css.encode('utf-8')).hexdigest()[:12]
+        self.css_filename = f"schememitra.{self.css_hash}.css"
+        self.error: Optional[str] = None
+        self.served = mode == "auto" and self._static_serving_enabled() and self._publish(static_dir)
+        if self.served:
+            self.style_tag = f'<style>@import url("app/static/{self.css_filename}");</style>'
+        else:
+            self.style_tag = f"<style>{self.css}</style>"
+        self.landing = self._build_landing()
     
-    /* Warning styling */
-    .stWarning {
-        border-left: 4px solid var(--secondary-saffron) !important;
-        background-color: rgba(255, 153, 51, 0.1) !important;
-    }
+    @staticmethod
+    def _static_serving_enabled() -> bool:
+        try:
+            return bool(st.get_option("server.enableStaticServing"))
+        except Exception:
+            return False
     
-    /* Error styling */
-    .stError {
-        border-left: 4px solid var(--warning-navy) !important;
-        background-color: rgba(0, 51, 102, 0.1) !important;
-    }
+    def _publish(self, static_dir: str) -> bool:
+        """Write the stylesheet under its content hash (atomically; other replicas may race)."""
+        path = os.path.join(static_dir, self.css_filename)
+        try:
+            if not os.path.exists(path):
+                os.makedirs(static_dir, exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(self.css)
+                os.replace(tmp_path, path)
+            return True
+        except OSError as e:
+            self.error = f"Could not write {path}: {str(e)}"
+            return False
     
-    </style>
-    """
-    st.markdown(css, unsafe_allow_html=True)
+    @staticmethod
+    def _build_landing() -> Dict[str, object]:
+        return {
+            "hero": compact_html("""
+                <div class="hero-section">
+                    <div class="hero-title">🏛️ SchemeMitra</div>
+                    <div class="hero-subtitle">Your AI Assistant for Government Schemes</div>
+                    <p class="hero-description">
+                        Discover and apply for government schemes you're eligible for using advanced AI-powered analysis. 
+                        No login required. Completely free. Your privacy is our priority.
+                    </p>
+                </div>
+            """),
+            "features_heading": section_heading("✨ Key Features"),
+            "features": [
+                f'<div class="sm-feature"><div class="sm-feature-icon">{icon}</div><h3>{title}</h3><p>{text}</p></div>'
+                for icon, title, text in LANDING_FEATURES
+            ],
+            "steps_heading": section_heading("🚀 How It Works"),
+            "steps": [
+                f'<div class="sm-step"><div class="sm-step-number sm-step-{color}">{number}</div><h4>{title}</h4><p>{text}</p></div>'
+                for number, color, title, text in LANDING_STEPS
+            ],
+            "categories_heading": section_heading("📋 We Cover All Categories"),
+            "categories": [
+                f'<div class="sm-tile"><div class="sm-tile-icon">{emoji}</div><p class="sm-tile-name">{name}</p></div>'
+                for emoji, name in LANDING_CATEGORIES
+            ],
+            "tech_heading": section_heading("⚙️ Built With"),
+            "tech": [
+                f'<div class="sm-tile"><p class="sm-tile-tech">{tech}</p><p class="sm-tile-caption">{category}</p></div>'
+                for tech, category in LANDING_TECH_STACK
+            ],
+            "cta": compact_html("""
+                <div class="sm-cta">
+                    <h2>🎯 Ready to Find Your Schemes?</h2>
+                    <p>Click the <strong>Finder</strong> tab above to discover government schemes tailored to your profile in seconds.</p>
+                </div>
+            """),
+            "disclaimer": compact_html("""
+                <div class="sm-landing-disclaimer">
+                    <p class="sm-title">⚠️ Important Disclaimer</p>
+                    <p class="sm-body">
+                        <strong>SchemeMitra</strong> is an independent educational application and is <strong>NOT an official government portal</strong>. 
+                        This platform provides AI-powered guidance based on your input. 
+                        <strong>Always verify all information on official government websites</strong> before applying for any scheme. 
+                        We are not responsible for inaccuracies or outdated information. 
+                        For official details, eligibility criteria, and applications, please visit government portals directly.
+                    </p>
+                </div>
+            """),
+        }
+
+@st.cache_resource
+def get_static_assets() -> StaticAssets:
+    """Return the process-wide compiled assets (survives script reruns)."""
+    return StaticAssets(APP_CSS)
+
+def inject_css():
+    """Inject the app stylesheet (a short reference to the hashed file when served statically)."""
+    st.markdown(get_static_assets().style_tag, unsafe_allow_html=True)
 
 # ============================================================================
 # UI COMPONENTS
@@ -345,16 +3081,16 @@ def inject_css():
 
 def render_navbar():
     """Render the top navigation bar."""
-    st.markdown("""
+    st.markdown(compact_html("""
     <div style="background: linear-gradient(135deg, #0B5ED7 0%, #003366 100%); padding: 1.5rem 2rem; border-bottom: 3px solid #FF9933; margin: -1rem -1rem 2rem -1rem;">
         <div style="font-size: 2rem; font-weight: 800; color: #ffffff; text-align: center; letter-spacing: 0.5px; text-shadow: 2px 2px 4px rgba(0, 0, 0, 0.5);">🏛️ SchemeMitra</div>
         <div style="font-size: 0.9rem; color: #D1D5DB; text-align: center; margin-top: 0.5rem; font-weight: 500;">AI-Powered Government Scheme Finder</div>
     </div>
-    """, unsafe_allow_html=True)
+    """), unsafe_allow_html=True)
 
 def render_disclaimer():
     """Render the important disclaimer."""
-    st.markdown("""
+    st.markdown(compact_html("""
     <div style="background: #FFF3E0; border-left: 4px solid #FF9933; padding: 1.2rem; border-radius: 6px; margin-bottom: 2rem; font-size: 0.9rem; color: #5F3300;">
         <div style="font-weight: 700; margin-bottom: 0.5rem;">⚠️ Important Disclaimer</div>
         <div>
@@ -363,7 +3099,7 @@ def render_disclaimer():
             We are not responsible for inaccuracies. Consult official government offices for clarification.
         </div>
     </div>
-    """, unsafe_allow_html=True)
+    """), unsafe_allow_html=True)
 
 def render_category_selector():
     """Render category selector with circular icons."""
@@ -378,11 +3114,11 @@ def render_category_selector():
         'Senior Citizens': col3
     }
     
-    st.markdown("""
+    st.markdown(compact_html("""
     <div style="text-align: center; margin-bottom: 1.5rem;">
         <p style="font-weight: 700; color: #FF9933; margin-bottom: 1rem;">Browse by Category</p>
     </div>
-    """, unsafe_allow_html=True)
+    """), unsafe_allow_html=True)
     
     for idx, category in enumerate(CATEGORY_NAMES):
         if idx % 3 == 0:
@@ -395,13 +3131,13 @@ def render_category_selector():
 
 def render_search_section():
     """Render the search section with input and filters."""
-    st.markdown("""
+    st.markdown(compact_html("""
     <div style="background: #1F2937; padding: 2rem; border-radius: 12px; box-shadow: 0 4px 6px rgba(0, 0, 0, 0.3); margin-bottom: 2rem; border: 1px solid #374151;">
         <p style="font-size: 1.1rem; font-weight: 700; color: #FF9933; margin-bottom: 1rem;">
             🔍 Find Your Perfect Scheme
         </p>
     </div>
-    """, unsafe_allow_html=True)
+    """), unsafe_allow_html=True)
     
     col1, col2 = st.columns([4, 1])
     
@@ -415,29 +3151,62 @@ def render_search_section():
     with col2:
         search_button = st.button("🔍 Search", use_container_width=True)
     
-    return search_query, search_button
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        ranked = st.checkbox("🎯 Rank by relevance (match all words)", key="search_ranked")
+    
+    with col2:
+        semantic = st.checkbox("🧠 Semantic search (find related schemes)", key="search_semantic")
+    
+    return search_query, search_button, ranked, semantic
 
-def render_filters():
-    """Render filter panel."""
-    st.markdown("""
+def render_filters(search_query: str = "", ranked: bool = False, semantic: bool = False):
+    """
+    Render filter panel.
+    Options come from the precomputed facet index and show live "(n)" counts
+    for the current query and the other filters' selections.
+    """
+    st.markdown(compact_html("""
     <div style="margin-bottom: 2rem; font-weight: 700; color: #FF9933; font-size: 1.1rem;">
         ⚙️ Refine Your Search
     </div>
-    """, unsafe_allow_html=True)
+    """), unsafe_allow_html=True)
+    
+    index = SchemeSearchIndex.for_schemes(SCHEMES)
+    
+    # Current selections (from the previous interaction) drive the counts
+    ministry = st.session_state.get('filter_ministry', "All Ministries")
+    beneficiary = st.session_state.get('filter_beneficiary', "All Types")
+    category = st.session_state.get('selected_category', st.session_state.get('filter_category', "All Categories"))
+    query_ids = None
+    if semantic and search_query:
+        semantic_positions = SemanticIndex.for_schemes(SCHEMES).search(search_query)
+        query_ids = {SCHEMES[pos]['id'] for pos in semantic_positions}
+    counts = index.facet_counts(search_query, {
+        'ministry': None if ministry == "All Ministries" else ministry,
+        'beneficiary': None if beneficiary == "All Types" else beneficiary,
+        'category': None if category == "All Categories" else category
+    }, ranked=ranked, query_ids=query_ids)
+    
+    def with_count(field: str, all_label: str):
+        return lambda value: f"{value} ({counts[field].get(None if value == all_label else value, 0)})"
     
     col1, col2, col3 = st.columns(3)
     
     with col1:
         selected_ministry = st.selectbox(
             "Ministry / Department",
-            options=["All Ministries"] + sorted(set(s['ministry'] for s in SCHEMES)),
+            options=["All Ministries"] + index.facet_values('ministry'),
+            format_func=with_count('ministry', "All Ministries"),
             key="filter_ministry"
         )
     
     with col2:
         selected_beneficiary = st.selectbox(
             "Beneficiary Type",
-            options=["All Types"] + sorted(set(s['beneficiary'] for s in SCHEMES)),
+            options=["All Types"] + index.facet_values('beneficiary'),
+            format_func=with_count('beneficiary', "All Types"),
             key="filter_beneficiary"
         )
     
@@ -445,19 +3214,97 @@ def render_filters():
         selected_category = st.selectbox(
             "Category",
             options=["All Categories"] + CATEGORY_NAMES,
+            format_func=with_count('category', "All Categories"),
             key="filter_category"
         )
     
     return selected_ministry, selected_beneficiary, selected_category
 
-def render_scheme_card(scheme: Dict, idx: int):
-    """Render a single scheme card with all features."""
+# Fragment keys: a card interaction reruns only the fragments it affects, not the whole script
+BOOKMARKS_FRAGMENT_KEY = "bookmarks_panel"
+FEEDBACK_FRAGMENT_KEY = "feedback"
+CARD_KEY_PREFIXES = ("finder", "bookmarked")
+
+def card_fragment_key(key_prefix: str, scheme_id: str) -> str:
+    return f"card_{key_prefix}_{scheme_id}"
+
+def rerun_fragments(fragment_keys: List[str]):
+    """
+    From a widget callback: rerun only the named fragments. Session changes
+    are queued for the session store here because main() does not run.
+    If any target is no longer on the page, the whole app reruns instead.
+    """
+    persist_session_state()
+    live = st.session_state.get('_rendered_cards', set()) | {BOOKMARKS_FRAGMENT_KEY, FEEDBACK_FRAGMENT_KEY}
+    if fragment_keys and all(key in live for key in fragment_keys):
+        st.session_state._fragment_rerun = True
+        try:
+            st.rerun(scope=fragment_keys)
+        except StreamlitAPIException:
+            # Streamlit dropped a fragment we still thought was rendered
+            pass
+    st.session_state._fragment_rerun = False
+    st.rerun()
+
+def rendered_cards_for(scheme_id: str) -> List[str]:
+    """Fragment keys of the cards showing this scheme on the page right now."""
+    rendered = st.session_state.get('_rendered_cards', set())
+    return [key for key in (card_fragment_key(prefix, scheme_id) for prefix in CARD_KEY_PREFIXES) if key in rendered]
+
+def forget_rendered_cards(key_prefix: str):
+    """Drop one section's cards from the rendered set before that section renders them again."""
+    prefix = card_fragment_key(key_prefix, "")
+    rendered = st.session_state.get('_rendered_cards', set())
+    st.session_state._rendered_cards = {key for key in rendered if not key.startswith(prefix)}
+
+def toggle_expanded(scheme_id: str):
+    """Expand/collapse a scheme: reruns every card showing it (finder and bookmarks)."""
+    expanded = st.session_state.expanded_schemes
+    if scheme_id in expanded:
+        expanded.discard(scheme_id)
+    else:
+        expanded.add(scheme_id)
+    rerun_fragments(rendered_cards_for(scheme_id))
+
+def toggle_bookmark(scheme_id: str):
+    """Add/remove a bookmark: reruns the bookmarks panel and the scheme's finder card."""
+    bookmarks = st.session_state.bookmarked_schemes
+    if scheme_id in bookmarks:
+        bookmarks.discard(scheme_id)
+    else:
+        bookmarks.add(scheme_id)
+    finder_card = card_fragment_key("finder", scheme_id)
+    targets = [BOOKMARKS_FRAGMENT_KEY]
+    if finder_card in st.session_state.get('_rendered_cards', set()):
+        targets.append(finder_card)
+    rerun_fragments(targets)
+
+def render_scheme_card(scheme: Dict, idx: int, key_prefix: str = "finder",
+                       pending_explanations: Optional[List[Tuple[Dict, object]]] = None):
+    """
+    Render a single scheme card with all features, as its own fragment so
+    its buttons rerun only the card (see toggle_expanded / toggle_bookmark).
+    If pending_explanations is given, an expanded card only reserves a
+    placeholder and registers itself there, so explanations for all
+    expanded cards can be generated together by render_pending_explanations.
+    """
+    fragment_key = card_fragment_key(key_prefix, scheme['id'])
+    st.session_state.setdefault('_rendered_cards', set()).add(fragment_key)
+    st.fragment(_render_scheme_card_body, key=fragment_key)(scheme, idx, key_prefix, pending_explanations)
+
+def _render_scheme_card_body(scheme: Dict, idx: int, key_prefix: str,
+                             pending_explanations: Optional[List[Tuple[Dict, object]]]):
+    # On a fragment rerun nothing collects pending explanations: render them in place
+    if st.session_state.get('_fragment_rerun'):
+        pending_explanations = None
+    
     is_bookmarked = scheme['id'] in st.session_state.bookmarked_schemes
     is_expanded = scheme['id'] in st.session_state.expanded_schemes
     
-    # Determine match score
+    # Determine match score locally - no AI call is needed for the list view
     user_profile = st.session_state.get('last_user_profile', 'General user')
-    _, match_score = generate_eligibility_explanation(scheme, user_profile)
+    with METRICS.stage("scoring"):
+        match_score = get_match_score(scheme, user_profile)
     
     # Create card container with proper styling
     with st.container():
@@ -466,7 +3313,7 @@ def render_scheme_card(scheme: Dict, idx: int):
         with col1:
             st.markdown(f"### {scheme['name']}")
         with col2:
-            st.markdown(f'<div style="background-color: #138808; color: white; padding: 6px 12px; border-radius: 20px; font-size: 12px; font-weight: bold; text-align: center; white-space: nowrap;">✓ Active</div>', unsafe_allow_html=True)
+            st.markdown('<div class="sm-badge-active">✓ Active</div>', unsafe_allow_html=True)
         
         # Ministry and Beneficiary info
         col1, col2 = st.columns(2)
@@ -476,81 +3323,167 @@ def render_scheme_card(scheme: Dict, idx: int):
             st.markdown(f"**👥 Beneficiary:**  \n{scheme['beneficiary']}")
         
         # Benefit section
-        st.markdown(f"""
-        <div style="background: rgba(255, 153, 51, 0.15); padding: 1rem; border-left: 3px solid #FF9933; border-radius: 6px; margin: 1rem 0; color: #F3F4F6;">
-            <strong>💰 Benefit:</strong> {scheme['benefit']}
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(f'<div class="sm-benefit"><strong>💰 Benefit:</strong> {scheme["benefit"]}</div>',
+                    unsafe_allow_html=True)
         
         # Match score display
-        st.markdown(f"""
-        <div style="display: flex; align-items: center; gap: 10px; margin: 1rem 0; padding: 0.8rem; background: rgba(11, 94, 215, 0.15); border-radius: 6px; border: 1px solid #374151;">
-            <span style="font-size: 0.9rem; color: #D1D5DB;">Eligibility Match:</span>
-            <div style="flex: 1; height: 8px; background: #374151; border-radius: 4px; overflow: hidden;">
-                <div style="height: 100%; width: {match_score}%; background: linear-gradient(90deg, #138808, #FF9933);"></div>
-            </div>
-            <span style="font-weight: 700; color: #FF9933; min-width: 45px; text-align: right;">{match_score}%</span>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(
+            f'<div class="sm-match"><span class="sm-match-label">Eligibility Match:</span>'
+            f'<div class="sm-match-track"><div class="sm-match-fill" style="width: {match_score}%;"></div></div>'
+            f'<span class="sm-match-value">{match_score}%</span></div>',
+            unsafe_allow_html=True
+        )
         # Action buttons
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            if st.button("💡 Why I'm Eligible", key=f"expand_{scheme['id']}", use_container_width=True):
-                if scheme['id'] in st.session_state.expanded_schemes:
-                    st.session_state.expanded_schemes.remove(scheme['id'])
-                else:
-                    st.session_state.expanded_schemes.append(scheme['id'])
-                st.rerun()
+            st.button("💡 Why I'm Eligible", key=f"{key_prefix}_expand_{scheme['id']}", use_container_width=True,
+                      on_click=toggle_expanded, args=(scheme['id'],))
         
         with col2:
-            if st.button(f"{'⭐ Bookmarked' if is_bookmarked else '☆ Bookmark'}", 
-                         key=f"bookmark_{scheme['id']}", use_container_width=True):
-                if is_bookmarked:
-                    st.session_state.bookmarked_schemes.remove(scheme['id'])
-                else:
-                    st.session_state.bookmarked_schemes.append(scheme['id'])
-                st.rerun()
+            st.button(f"{'⭐ Bookmarked' if is_bookmarked else '☆ Bookmark'}", 
+                      key=f"{key_prefix}_bookmark_{scheme['id']}", use_container_width=True,
+                      on_click=toggle_bookmark, args=(scheme['id'],))
         
         with col3:
             st.link_button("🔗 Official Source", scheme['source_url'], use_container_width=True)
         
-        # Show eligibility explanation if expanded
-        if scheme['id'] in st.session_state.expanded_schemes:
-            with st.spinner("✨ Generating AI explanation..."):
-                explanation, _ = generate_eligibility_explanation(scheme, user_profile)
-                st.info(f"**Why you might be eligible:**\n\n{explanation}")
+        # Show eligibility explanation if expanded (lazy: only expanded cards call Azure)
+        if scheme['id'] in st.session_state.expanded_schemes and pending_explanations is not None:
+            placeholder = st.empty()
+            placeholder.info("✨ Generating AI explanation...")
+            pending_explanations.append((scheme, placeholder))
+        elif scheme['id'] in st.session_state.expanded_schemes:
+            if AZURE_OPENAI_STREAM:
+                render_streamed_explanation(scheme, user_profile, st.empty())
+            else:
+                with st.spinner("✨ Generating AI explanation..."):
+                    explanation = explain_eligibility(scheme, user_profile)
+                    st.info(f"**Why you might be eligible:**\n\n{explanation}")
         
         st.divider()
 
-def render_bookmarked_schemes():
-    """Render bookmarked schemes section."""
+def render_streamed_explanation(scheme: Dict, user_profile: str, placeholder) -> str:
+    """Stream an explanation into placeholder token by token, then show it as an info box."""
+    with placeholder.container():
+        st.markdown("**Why you might be eligible:**")
+        explanation = st.write_stream(stream_eligibility_explanation(scheme, user_profile))
+    placeholder.info(f"**Why you might be eligible:**\n\n{explanation}")
+    return explanation
+
+def render_pending_explanations(pending_explanations: List[Tuple[Dict, object]], user_profile: str):
+    """
+    Generate all pending explanations and fill each placeholder as it arrives.
+    A single uncached explanation is streamed for a fast first token;
+    several are generated in batched calls (or concurrently with batching off).
+    """
+    placeholders = {}
+    for scheme, placeholder in pending_explanations:
+        placeholders.setdefault(scheme['id'], []).append(placeholder)
+    
+    schemes = [scheme for scheme, _ in pending_explanations]
+    
+    if AZURE_OPENAI_STREAM:
+        cache = get_explanation_cache()
+        uncached = {s['id']: s for s in schemes if lookup_explanation(s, user_profile, cache) is None}
+        if len(uncached) == 1:
+            scheme = next(iter(uncached.values()))
+            first, *others = placeholders[scheme['id']]
+            explanation = render_streamed_explanation(scheme, user_profile, first)
+            for placeholder in others:
+                placeholder.info(f"**Why you might be eligible:**\n\n{explanation}")
+            schemes = [s for s in schemes if s['id'] != scheme['id']]
+    
+    if EXPLANATION_BATCH_MODE:
+        results = generate_explanations_batched(schemes, user_profile)
+    else:
+        results = generate_explanations_concurrently(schemes, user_profile)
+    for scheme_id, explanation in results:
+        for placeholder in placeholders[scheme_id]:
+            placeholder.info(f"**Why you might be eligible:**\n\n{explanation}")
+
+def set_results_page(page: int):
+    """Pager callback: the page change is in place before the rerun the click triggers."""
+    st.session_state.results_page = page
+
+def render_results_page(filtered_schemes: List[Dict], results_signature: Tuple,
+                        pending_explanations: Optional[List[Tuple[Dict, object]]] = None,
+                        page_size: int = RESULTS_PAGE_SIZE):
+    """
+    Render only the current page of results plus a pager.
+    The page number lives in session state and resets when the query or filters change.
+    """
+    if st.session_state.results_signature != results_signature:
+        st.session_state.results_signature = results_signature
+        st.session_state.results_page = 1
+    
+    total_pages = max(1, math.ceil(len(filtered_schemes) / page_size))
+    page = min(max(1, st.session_state.results_page), total_pages)
+    st.session_state.results_page = page
+    
+    start = (page - 1) * page_size
+    page_schemes = filtered_schemes[start:start + page_size]
+    
+    st.markdown(compact_html(f"""
+    <div style="padding: 0.8rem; background: rgba(11, 94, 215, 0.15); border-radius: 6px; margin-bottom: 1.5rem; text-align: center; font-weight: 600; color: #0B5ED7; border: 1px solid #374151;">
+        Found {len(filtered_schemes)} scheme(s) matching your criteria - showing {start + 1}-{start + len(page_schemes)}
+    </div>
+    """), unsafe_allow_html=True)
+    
+    for idx, scheme in enumerate(page_schemes, start + 1):
+        render_scheme_card(scheme, idx, pending_explanations=pending_explanations)
+    
+    if total_pages > 1:
+        col1, col2, col3 = st.columns([1, 2, 1])
+        
+        with col1:
+            st.button("⬅️ Previous", key="results_prev", disabled=page <= 1, use_container_width=True,
+                      on_click=set_results_page, args=(page - 1,))
+        
+        with col2:
+            st.markdown(f"<div style=\"text-align: center; padding-top: 0.5rem; color: #D1D5DB;\">Page {page} of {total_pages}</div>", unsafe_allow_html=True)
+        
+        with col3:
+            st.button("Next ➡️", key="results_next", disabled=page >= total_pages, use_container_width=True,
+                      on_click=set_results_page, args=(page + 1,))
+
+@st.fragment(key=BOOKMARKS_FRAGMENT_KEY)
+def render_bookmarked_schemes(pending_explanations: Optional[List[Tuple[Dict, object]]] = None):
+    """
+    Render bookmarked schemes section. A fragment, rendered (possibly empty)
+    on every run so a bookmark toggle anywhere can rerun just this panel.
+    """
+    # Cards removed by this rerun must not stay rerun targets
+    forget_rendered_cards("bookmarked")
+    
     if st.session_state.bookmarked_schemes:
-        st.markdown("""
+        st.markdown(compact_html("""
         <div style="margin-bottom: 2rem; margin-top: 3rem;">
             <h2 style="color: #FF9933; border-bottom: 3px solid #0B5ED7; padding-bottom: 0.5rem; font-size: 1.8rem;">
                 ⭐ My Bookmarked Schemes ({count})
             </h2>
         </div>
-        """.format(count=len(st.session_state.bookmarked_schemes)), unsafe_allow_html=True)
+        """.format(count=len(st.session_state.bookmarked_schemes))), unsafe_allow_html=True)
         
         st.info(f"📚 You have {len(st.session_state.bookmarked_schemes)} scheme(s) saved. Review them below:")
         
-        bookmarked = [s for s in SCHEMES if s['id'] in st.session_state.bookmarked_schemes]
+        bookmarked = REPOSITORY.get_many(st.session_state.bookmarked_schemes)
         
         if bookmarked:
             for idx, scheme in enumerate(bookmarked, 1):
-                render_scheme_card(scheme, idx)
+                render_scheme_card(scheme, idx, key_prefix="bookmarked",
+                                   pending_explanations=pending_explanations)
         else:
             st.warning("No bookmarked schemes found. Bookmark schemes from the Finder tab!")
 
+@st.fragment(key=FEEDBACK_FRAGMENT_KEY)
 def render_feedback_section():
-    """Render feedback section."""
-    st.markdown("""
+    """Render feedback section (a fragment: a vote reruns only this section)."""
+    st.markdown(compact_html("""
     <div style="background: rgba(11, 94, 215, 0.15); padding: 1.5rem; border-radius: 10px; border-left: 4px solid #0B5ED7; margin-top: 2rem; border: 1px solid #374151;">
         <p style="font-weight: 700; color: #FF9933; margin-bottom: 0.5rem;">📝 Was this helpful?</p>
     </div>
-    """, unsafe_allow_html=True)
+    """), unsafe_allow_html=True)
     
     col1, col2, col3 = st.columns([1, 1, 1])
     
@@ -566,9 +3499,45 @@ def render_feedback_section():
         if st.button("👎 Not helpful", key="feedback_no", use_container_width=True):
             st.warning("We'd love to hear your suggestions. Please reach out!")
 
+def render_debug_panel(trace: List[Span], rerun_seconds: float):
+    """Opt-in sidebar panel: this rerun's stage timings plus process-wide histograms and counters."""
+    with st.expander("📊 Performance Debug", expanded=False):
+        st.caption(f"This rerun: {rerun_seconds * 1000:.1f} ms")
+        
+        # Repeated spans (e.g. scoring once per card) are summed per stage/service
+        per_span: Dict[str, Dict] = {}
+        for span in trace:
+            label = span.labels.get('stage') or f"azure:{span.labels.get('service')} ({span.labels.get('status')})"
+            row = per_span.setdefault(label, {"span": label, "calls": 0, "ms": 0.0})
+            row["calls"] += 1
+            row["ms"] += span.duration * 1000
+        for row in per_span.values():
+            row["ms"] = round(row["ms"], 2)
+        if per_span:
+            st.dataframe(list(per_span.values()), hide_index=True, use_container_width=True)
+        
+        st.markdown("**Since process start**")
+        st.dataframe(METRICS.histogram_rows(), hide_index=True, use_container_width=True)
+        counters = METRICS.counter_rows()
+        if counters:
+            st.dataframe(counters, hide_index=True, use_container_width=True)
+        
+        startup = STARTUP.as_dict()
+        warmup = f"{startup['warmup_ms']} ms" if startup['ready'] else "in progress"
+        st.markdown("**Start-up**")
+        st.caption(f"Time to first render: {startup['time_to_first_render_ms']} ms · warm-up: {warmup}")
+        st.dataframe([{"phase": phase, "ms": ms} for phase, ms in startup['phases_ms'].items()],
+                     hide_index=True, use_container_width=True)
+        if startup['warmup_error']:
+            st.caption(f"⚠️ {startup['warmup_error']}")
+        if METRICS.server_error:
+            st.caption(f"⚠️ {METRICS.server_error}")
+        elif METRICS_PORT:
+            st.caption(f"Prometheus endpoint: http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+
 def render_footer():
     """Render footer."""
-    st.markdown("""
+    st.markdown(compact_html("""
     <div style="text-align: center; padding: 2rem; color: #D1D5DB; font-size: 0.9rem; border-top: 1px solid #374151; margin-top: 3rem;">
         <p><strong>🏛️ SchemeMitra</strong> © 2026 - AI Government Scheme Finder</p>
         <p>Built with ❤️ for the Imagine Cup | Data from official government portals</p>
@@ -576,319 +3545,730 @@ def render_footer():
             This is an educational MVP and not officially affiliated with the Government of India.
         </p>
     </div>
-    """, unsafe_allow_html=True)
+    """), unsafe_allow_html=True)
 
 # ============================================================================
 # FILTERING & SEARCH LOGIC
 # ============================================================================
 
+SEARCH_FIELDS = ('name', 'description', 'ministry', 'beneficiary')
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+def tokenize(text: str) -> List[str]:
+    """Split lower-cased text into word tokens."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+class SchemeSearchIndex:
+    """
+    Tokenized inverted index over the searchable scheme fields.
+    Built once per catalog; answers the same substring queries as the
+    original linear scan, plus an AND-of-terms mode ranked with BM25.
+    Documents are keyed by scheme id so that, after a catalog reload, the
+    index can be derived from the previous one by re-processing only the
+    changed schemes (copy-on-write; the previous index is never mutated).
+    """
+    
+    BM25_K1 = 1.5
+    BM25_B = 0.75
+    
+    FACET_FIELDS = ('ministry', 'beneficiary', 'category')
+    
+    def __init__(self, schemes: List[Dict], previous: Optional['SchemeSearchIndex'] = None,
+                 changed_ids: Optional[set] = None):
+        self.schemes = schemes
+        self.positions = {scheme['id']: pos for pos, scheme in enumerate(schemes)}
+        
+        if previous is None or changed_ids is None:
+            self.fields: Dict[str, tuple] = {}
+            self.doc_lengths: Dict[str, int] = {}
+            self.postings: Dict[str, Dict[str, int]] = {}
+            self.facets: Dict[str, Dict[str, set]] = {field: {} for field in self.FACET_FIELDS}
+            self.trigrams: Dict[str, set] = {}
+            self._total_length = 0
+            stale_ids, fresh_ids = set(), set(self.positions)
+            old_vocabulary = set()
+        else:
+            self.fields = dict(previous.fields)
+            self.doc_lengths = dict(previous.doc_lengths)
+            self.postings = dict(previous.postings)
+            self.facets = {field: dict(values) for field, values in previous.facets.items()}
+            self.trigrams = dict(previous.trigrams)
+            self._total_length = previous._total_length
+            removed_ids = set(previous.positions) - set(self.positions)
+            stale_ids = (set(changed_ids) & set(previous.positions)) | removed_ids
+            fresh_ids = set(changed_ids) & set(self.positions)
+            old_vocabulary = set(previous.postings)
+        
+        # Postings/facet sets shared with the previous index are copied before modification
+        owned_postings, owned_facets = set(), set()
+        
+        def own_posting(term: str) -> Dict[str, int]:
+            if term not in owned_postings:
+                self.postings[term] = dict(self.postings.get(term, {}))
+                owned_postings.add(term)
+            return self.postings[term]
+        
+        def own_facet(field: str, value: str) -> set:
+            if (field, value) not in owned_facets:
+                self.facets[field][value] = set(self.facets[field].get(value, set()))
+                owned_facets.add((field, value))
+            return self.facets[field][value]
+        
+        for sid in stale_ids:
+            old_scheme = previous.schemes[previous.positions[sid]]
+            for token in self._tokens(self.fields.pop(sid)):
+                own_posting(token).pop(sid, None)
+            self._total_length -= self.doc_lengths.pop(sid)
+            for field in self.FACET_FIELDS:
+                own_facet(field, old_scheme[field]).discard(sid)
+        
+        for sid in fresh_ids:
+            scheme = schemes[self.positions[sid]]
+            fields = tuple(scheme[f].lower() for f in SEARCH_FIELDS)
+            self.fields[sid] = fields
+            tokens = self._tokens(fields)
+            self.doc_lengths[sid] = len(tokens)
+            self._total_length += len(tokens)
+            for token in tokens:
+                posting = own_posting(token)
+                posting[sid] = posting.get(sid, 0) + 1
+            for field in self.FACET_FIELDS:
+                own_facet(field, scheme[field]).add(sid)
+        
+        for term in owned_postings:
+            if not self.postings[term]:
+                del self.postings[term]
+        for field, value in owned_facets:
+            if not self.facets[field][value]:
+                del self.facets[field][value]
+        
+        # Trigram index over the vocabulary for fast substring expansion of query terms
+        vocabulary = set(self.postings)
+        owned_grams = set()
+        for term, change in [(t, -1) for t in old_vocabulary - vocabulary] + [(t, 1) for t in vocabulary - old_vocabulary]:
+            for i in range(len(term) - 2):
+                gram = term[i:i + 3]
+                if gram not in owned_grams:
+                    self.trigrams[gram] = set(self.trigrams.get(gram, set()))
+                    owned_grams.add(gram)
+                if change > 0:
+                    self.trigrams[gram].add(term)
+                else:
+                    self.trigrams[gram].discard(term)
+        for gram in owned_grams:
+            if not self.trigrams[gram]:
+                del self.trigrams[gram]
+        
+        self.vocabulary = list(self.postings)
+        self.avg_doc_length = (self._total_length / len(self.doc_lengths)) if self.doc_lengths else 0.0
+        self._expansions: Dict[str, List[str]] = {}
+        self._term_docs: Dict[str, set] = {}
+        self._facet_values: Dict[str, List[str]] = {}
+        # Ranked mode scores whole postings arrays at once; all built on first use
+        self._posting_arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._term_scores: Dict[str, np.ndarray] = {}
+        self._facet_masks: Dict[Tuple[str, str], np.ndarray] = {}
+        self._length_norms: Optional[np.ndarray] = None
+    
+    @staticmethod
+    def _tokens(fields: tuple) -> List[str]:
+        return [t for field in fields for t in _TOKEN_PATTERN.findall(field)]
+    
+    @classmethod
+    def for_schemes(cls, schemes: List[Dict]) -> 'SchemeSearchIndex':
+        """Return the index for this exact list object, building it on first use."""
+        return catalog_for_schemes(schemes).derived('search_index', cls)
+    
+    def expand_term(self, term: str) -> List[str]:
+        """
+        All vocabulary terms that contain term as a substring, sorted so that
+        BM25 sums over them do not depend on set or hash order.
+        """
+        expansion = self._expansions.get(term)
+        if expansion is not None:
+            return expansion
+        
+        if len(term) >= 3:
+            grams = [self.trigrams.get(term[i:i + 3], set()) for i in range(len(term) - 2)]
+            candidates = self._intersect(grams)
+            expansion = sorted(v for v in candidates if term in v)
+        else:
+            expansion = sorted(v for v in self.vocabulary if term in v)
+        
+        if len(self._expansions) > 10000:
+            self._expansions.clear()
+        self._expansions[term] = expansion
+        return expansion
+    
+    def docs_containing(self, term: str) -> set:
+        """Ids of documents with at least one token containing term."""
+        docs = self._term_docs.get(term)
+        if docs is None:
+            docs = set()
+            for expanded in self.expand_term(term):
+                docs.update(self.postings[expanded])
+            if len(self._term_docs) > 10000:
+                self._term_docs.clear()
+            self._term_docs[term] = docs
+        return docs
+    
+    @staticmethod
+    def _intersect(sets: List[set]) -> set:
+        """Intersect id sets smallest-first. The result may alias an input - never mutate it."""
+        if not sets:
+            return set()
+        sets = sorted(sets, key=len)
+        result = sets[0]
+        for other in sets[1:]:
+            result = result & other
+            if not result:
+                break
+        return result
+    
+    def _candidates(self, terms: List[str]) -> set:
+        """Documents in which every query term appears inside some token (AND)."""
+        return self._intersect([self.docs_containing(t) for t in terms])
+    
+    def substring_match(self, query: str) -> set:
+        """
+        Ids of documents where the lower-cased query is a substring of any
+        search field - exactly the semantics of the original linear filter.
+        """
+        query_lower = query.lower()
+        terms = _TOKEN_PATTERN.findall(query_lower)
+        
+        if not terms:
+            # Punctuation/whitespace-only queries cannot use the index
+            return {sid for sid, fields in self.fields.items() if any(query_lower in f for f in fields)}
+        
+        candidates = self._candidates(terms)
+        
+        # A single bare word inside a token is a guaranteed substring hit
+        if len(terms) == 1 and terms[0] == query_lower:
+            return candidates
+        
+        return {sid for sid in candidates if any(query_lower in f for f in self.fields[sid])}
+    
+    def postings_array(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(catalog positions, term frequencies) of a vocabulary term's posting."""
+        arrays = self._posting_arrays.get(term)
+        if arrays is None:
+            posting = self.postings[term]
+            arrays = (np.fromiter(map(self.positions.__getitem__, posting), dtype=np.int32, count=len(posting)),
+                      np.fromiter(posting.values(), dtype=np.float32, count=len(posting)))
+            self._posting_arrays[term] = arrays
+        return arrays
+    
+    def term_scores(self, term: str) -> np.ndarray:
+        """
+        BM25 contribution of one query term to every document, by catalog
+        position (partial-token hits weigh half). Zero means no token of the
+        document contains the term.
+        """
+        scores = self._term_scores.get(term)
+        if scores is not None:
+            return scores
+        
+        if self._length_norms is None:
+            lengths = np.fromiter((self.doc_lengths[scheme['id']] for scheme in self.schemes),
+                                  dtype=np.float64, count=len(self.schemes))
+            self._length_norms = self.BM25_K1 * (1 - self.BM25_B + self.BM25_B * lengths / (self.avg_doc_length or 1))
+        
+        n_docs = len(self.schemes)
+        scores = np.zeros(n_docs)
+        for expanded in self.expand_term(term):
+            positions, tfs = self.postings_array(expanded)
+            weight = 1.0 if expanded == term else 0.5
+            idf = math.log(1 + (n_docs - len(positions) + 0.5) / (len(positions) + 0.5))
+            tfs = tfs.astype(np.float64)
+            # Positions are unique within a posting, so the fancy-indexed add does not lose hits
+            scores[positions] += weight * idf * tfs * (self.BM25_K1 + 1) / (tfs + self._length_norms[positions])
+        scores.setflags(write=False)
+        
+        # One float per scheme each, so far fewer of these are kept than expansions
+        if len(self._term_scores) >= 64:
+            self._term_scores.clear()
+        self._term_scores[term] = scores
+        return scores
+    
+    def bm25_scores(self, terms: List[str]) -> np.ndarray:
+        """BM25 relevance of every document for the query terms, by catalog position."""
+        scores = np.zeros(len(self.schemes))
+        for term in terms:
+            scores += self.term_scores(term)
+        return scores
+    
+    def facet_mask(self, field: str, value: str) -> np.ndarray:
+        """Boolean mask, by catalog position, of the documents with this facet value."""
+        mask = self._facet_masks.get((field, value))
+        if mask is None:
+            ids = self.facets[field].get(value, set())
+            mask = np.zeros(len(self.schemes), dtype=bool)
+            mask[np.fromiter(map(self.positions.__getitem__, ids), dtype=np.intp, count=len(ids))] = True
+            mask.setflags(write=False)
+            self._facet_masks[(field, value)] = mask
+        return mask
+    
+    def ranked_search(self, terms: List[str], selections: Dict[str, Optional[str]]) -> List[int]:
+        """
+        Catalog positions of the documents containing every term and the
+        selected facet values, best BM25 score first (ties in catalog order).
+        """
+        mask = np.ones(len(self.schemes), dtype=bool)
+        for term in terms:
+            mask &= self.term_scores(term) > 0
+        for field, value in selections.items():
+            if value is not None:
+                mask &= self.facet_mask(field, value)
+        
+        selected = np.flatnonzero(mask)
+        order = np.argsort(-self.bm25_scores(terms)[selected], kind='stable')
+        return selected[order].tolist()
+    
+    def facet_values(self, field: str) -> List[str]:
+        """Sorted distinct values of a facet field (computed once per index)."""
+        values = self._facet_values.get(field)
+        if values is None:
+            values = sorted(self.facets[field])
+            self._facet_values[field] = values
+        return values
+    
+    def _query_matches(self, query: str, ranked: bool) -> Optional[set]:
+        """Ids matching the query, or None when there is no query constraint."""
+        if not query:
+            return None
+        terms = tokenize(query)
+        if ranked and terms:
+            return self._candidates(terms)
+        return self.substring_match(query)
+    
+    def facet_counts(self, query: str = "", selections: Optional[Dict[str, Optional[str]]] = None,
+                     ranked: bool = False, query_ids: Optional[set] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Live counts for every facet value under the current filter state.
+        Each facet is counted against the query and the *other* facets'
+        selections, so users see what picking a value would return.
+        query_ids overrides the keyword query match (e.g. for semantic search).
+        """
+        selections = selections or {}
+        if query_ids is None:
+            query_ids = self._query_matches(query, ranked)
+        counts = {}
+        for field in self.FACET_FIELDS:
+            constraints = [] if query_ids is None else [query_ids]
+            for other, value in selections.items():
+                if other != field and value is not None:
+                    constraints.append(self.facets[other].get(value, set()))
+            
+            values = self.facets[field]
+            if not constraints:
+                counts[field] = {value: len(ids) for value, ids in values.items()}
+                counts[field][None] = len(self.schemes)
+                continue
+            
+            allowed = self._intersect(constraints)
+            counts[field] = {
+                value: len(ids & allowed)
+                for value, ids in values.items()
+            }
+            counts[field][None] = len(allowed)
+        return counts
+    
+    def search(self, query: str = "", ministry: Optional[str] = None,
+               beneficiary: Optional[str] = None, category: Optional[str] = None,
+               ranked: bool = False) -> List[int]:
+        """
+        Return catalog positions of matching schemes.
+        Default mode keeps catalog order and substring semantics; ranked mode
+        requires every query word and orders results by BM25 score.
+        """
+        terms = tokenize(query) if query else []
+        if ranked and terms:
+            return self.ranked_search(terms, {'ministry': ministry, 'beneficiary': beneficiary, 'category': category})
+        
+        constraints = []
+        for field, value in (('ministry', ministry), ('beneficiary', beneficiary), ('category', category)):
+            if value is not None:
+                constraints.append(self.facets[field].get(value, set()))
+        
+        query_ids = self._query_matches(query, ranked)
+        if query_ids is not None:
+            constraints.append(query_ids)
+        
+        if not constraints:
+            return list(range(len(self.schemes)))
+        
+        doc_ids = self._intersect(constraints)
+        return sorted(self.positions[sid] for sid in doc_ids)
+
+# Local semantic search: hashed word + character-trigram TF-IDF reduced with LSA
+SEMANTIC_HASH_DIM = 4096
+SEMANTIC_DIMENSIONS = int(os.getenv("SCHEMEMITRA_SEMANTIC_DIMENSIONS", "64"))
+SEMANTIC_FIT_SAMPLE = 5000
+SEMANTIC_TOP_K = int(os.getenv("SCHEMEMITRA_SEMANTIC_TOP_K", "50"))
+SEMANTIC_MIN_SIMILARITY = float(os.getenv("SCHEMEMITRA_SEMANTIC_MIN_SIMILARITY", "0.15"))
+
+@lru_cache(maxsize=200000)
+def _word_feature_buckets(word: str) -> Tuple[int, ...]:
+    """Hash buckets for a word and its character trigrams (memoized - words repeat a lot)."""
+    padded = f"#{word}#"
+    features = [f"w:{word}"] + [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+    return tuple(zlib.crc32(feature.encode('utf-8')) % SEMANTIC_HASH_DIM for feature in features)
+
+def semantic_features(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hashed sparse features for text: whole words plus character trigrams
+    (so "kisan" still overlaps "kisaan"). Returns (indices, counts).
+    """
+    counts: Dict[int, float] = {}
+    for word in tokenize(text):
+        for bucket in _word_feature_buckets(word):
+            counts[bucket] = counts.get(bucket, 0.0) + 1.0
+    return np.fromiter(counts.keys(), dtype=np.intp, count=len(counts)), \
+        np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+
+def randomized_svd_basis(matrix: np.ndarray, rank: int, oversample: int = 10,
+                         power_iterations: int = 2, seed: int = 0) -> np.ndarray:
+    """
+    Top-rank right singular vectors of matrix (columns of the returned
+    n_features x rank array), via randomized SVD - much cheaper than a full
+    SVD when rank is far below the matrix dimensions.
+    """
+    n_rows, n_cols = matrix.shape
+    if rank + oversample >= min(n_rows, n_cols):
+        _, _, vt = np.linalg.svd(matrix, full_matrices=False)
+        return vt[:rank].T
+    
+    rng = np.random.default_rng(seed)
+    sketch = matrix @ rng.standard_normal((n_cols, rank + oversample)).astype(matrix.dtype)
+    for _ in range(power_iterations):
+        sketch, _ = np.linalg.qr(sketch)
+        sketch = matrix @ (matrix.T @ sketch)
+    basis, _ = np.linalg.qr(sketch)
+    _, _, vt = np.linalg.svd(basis.T @ matrix, full_matrices=False)
+    return vt[:rank].T
+
+class SemanticIndex:
+    """
+    Precomputed embedding matrix for local semantic search - no network calls.
+    Each scheme's name, description and beneficiary become a TF-IDF vector
+    over hashed features, projected with LSA (truncated SVD fitted on up to
+    SEMANTIC_FIT_SAMPLE schemes) into one L2-normalized float32 matrix.
+    A query is a single matrix-vector product plus a top-k selection.
+    """
+    
+    def __init__(self, schemes: List[Dict], previous: Optional['SemanticIndex'] = None,
+                 changed_ids: Optional[set] = None):
+        self.schemes = schemes
+        self.positions = {scheme['id']: pos for pos, scheme in enumerate(schemes)}
+        self.ids = [scheme['id'] for scheme in schemes]
+        
+        if previous is None or changed_ids is None:
+            features = [self._scheme_features(s) for s in schemes]
+            self._fit(features)
+            self.matrix = self._embed(features)
+        else:
+            # Keep the fitted projection; only re-embed new or changed schemes
+            self.idf = previous.idf
+            self.projection = previous.projection
+            self.matrix = np.zeros((len(schemes), self.projection.shape[1]), dtype=np.float32)
+            reused = [
+                (pos, previous.positions[sid]) for sid, pos in self.positions.items()
+                if sid not in changed_ids and sid in previous.positions
+            ]
+            if reused:
+                new_rows, old_rows = (np.array(rows, dtype=np.intp) for rows in zip(*reused))
+                self.matrix[new_rows] = previous.matrix[old_rows]
+            changed_positions = [self.positions[sid] for sid in changed_ids if sid in self.positions]
+            if changed_positions:
+                changed_features = [self._scheme_features(schemes[pos]) for pos in changed_positions]
+                self.matrix[np.array(changed_positions, dtype=np.intp)] = self._embed(changed_features)
+    
+    @classmethod
+    def for_schemes(cls, schemes: List[Dict]) -> 'SemanticIndex':
+        """Return the semantic index for this exact list object, building it on first use."""
+        return catalog_for_schemes(schemes).derived('semantic_index', cls)
+    
+    @staticmethod
+    def _scheme_features(scheme: Dict) -> Tuple[np.ndarray, np.ndarray]:
+        return semantic_features(f"{scheme['name']} {scheme['name']} {scheme['description']} {scheme['beneficiary']}")
+    
+    def _fit(self, features: List[Tuple[np.ndarray, np.ndarray]]):
+        """Compute IDF weights and the LSA projection."""
+        n_docs = max(1, len(features))
+        doc_freq = np.zeros(SEMANTIC_HASH_DIM, dtype=np.float64)
+        for indices, _ in features:
+            doc_freq[indices] += 1
+        self.idf = (np.log((1 + n_docs) / (1 + doc_freq)) + 1).astype(np.float32)
+        
+        if len(features) > SEMANTIC_FIT_SAMPLE:
+            sample_rows = np.random.default_rng(0).choice(len(features), SEMANTIC_FIT_SAMPLE, replace=False)
+            sample = [features[i] for i in sample_rows]
+        else:
+            sample = features
+        
+        dense = self._tfidf_rows(sample)
+        dimensions = max(1, min(SEMANTIC_DIMENSIONS, len(sample)))
+        if len(sample):
+            self.projection = np.ascontiguousarray(randomized_svd_basis(dense, dimensions), dtype=np.float32)
+        else:
+            self.projection = np.zeros((SEMANTIC_HASH_DIM, dimensions), dtype=np.float32)
+    
+    def _tfidf_rows(self, features: List[Tuple[np.ndarray, np.ndarray]]) -> np.ndarray:
+        """Dense, L2-normalized TF-IDF rows (sublinear term frequency)."""
+        dense = np.zeros((len(features), SEMANTIC_HASH_DIM), dtype=np.float32)
+        for row, (indices, counts) in enumerate(features):
+            dense[row, indices] = (1 + np.log(counts)) * self.idf[indices]
+        norms = np.linalg.norm(dense, axis=1, keepdims=True)
+        np.divide(dense, norms, out=dense, where=norms > 0)
+        return dense
+    
+    def _embed(self, features: List[Tuple[np.ndarray, np.ndarray]], chunk_size: int = 2048) -> np.ndarray:
+        """Project TF-IDF rows into the LSA space and L2-normalize them."""
+        embedded = np.zeros((len(features), self.projection.shape[1]), dtype=np.float32)
+        for start in range(0, len(features), chunk_size):
+            embedded[start:start + chunk_size] = self._tfidf_rows(features[start:start + chunk_size]) @ self.projection
+        norms = np.linalg.norm(embedded, axis=1, keepdims=True)
+        np.divide(embedded, norms, out=embedded, where=norms > 0)
+        return embedded
+    
+    def search(self, query: str, top_k: int = SEMANTIC_TOP_K,
+               allowed_positions: Optional[List[int]] = None,
+               min_similarity: float = SEMANTIC_MIN_SIMILARITY) -> List[int]:
+        """Catalog positions of the top_k schemes by cosine similarity, best first."""
+        query_vector = self._embed([semantic_features(query)])[0]
+        if not len(self.schemes) or not query_vector.any():
+            return []
+        
+        similarities = self.matrix @ query_vector
+        if allowed_positions is not None:
+            allowed = np.asarray(allowed_positions, dtype=np.intp)
+            similarities = similarities[allowed]
+        else:
+            allowed = None
+        
+        k = min(top_k, len(similarities))
+        if k <= 0:
+            return []
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top], kind='stable')]
+        top = top[similarities[top] >= min_similarity]
+        
+        if allowed is not None:
+            top = allowed[top]
+        return top.tolist()
+
 def filter_schemes(schemes: List[Dict], 
                   search_query: str = "",
                   ministry_filter: str = "All Ministries",
                   beneficiary_filter: str = "All Types",
-                  category_filter: str = "All Categories") -> List[Dict]:
+                  category_filter: str = "All Categories",
+                  ranked: bool = False,
+                  semantic: bool = False) -> List[Dict]:
     """
     Filter schemes based on search query and filters.
+    Uses the catalog's inverted index; with ranked=True every query word must
+    match and results are ordered by relevance instead of catalog order.
+    With semantic=True the query is matched by meaning against the local
+    embedding matrix and the best matches are returned, most similar first.
     """
-    filtered = schemes.copy()
-    
-    # Search filter
-    if search_query:
-        search_lower = search_query.lower()
-        filtered = [
-            s for s in filtered
-            if (search_lower in s['name'].lower() or
-                search_lower in s['description'].lower() or
-                search_lower in s['ministry'].lower() or
-                search_lower in s['beneficiary'].lower())
-        ]
+    index = SchemeSearchIndex.for_schemes(schemes)
+    ministry = None if ministry_filter == "All Ministries" else ministry_filter
+    beneficiary = None if beneficiary_filter == "All Types" else beneficiary_filter
+    category = None if category_filter == "All Categories" else category_filter
     
-    # Ministry filter
-    if ministry_filter != "All Ministries":
-        filtered = [s for s in filtered if s['ministry'] == ministry_filter]
+    if semantic and search_query:
+        allowed = None
+        if ministry or beneficiary or category:
+            allowed = index.search("", ministry=ministry, beneficiary=beneficiary, category=category)
+        positions = SemanticIndex.for_schemes(schemes).search(search_query, allowed_positions=allowed)
+    else:
+        positions = index.search(search_query, ministry=ministry, beneficiary=beneficiary,
+                                 category=category, ranked=ranked)
+    return [schemes[pos] for pos in positions]
+
+# ============================================================================
+# BACKGROUND WARM-UP
+# ============================================================================
+
+# Derived structures in build order: the first render needs the search index and score
+# matrix, so they come first; the semantic index is by far the slowest and comes last
+WARMUP_STRUCTURES = [
+    ('search_index', SchemeSearchIndex),
+    ('keyword_matrix', KeywordFeatureMatrix),
+    ('prompt_contexts', SchemePromptContexts),
+    ('semantic_index', SemanticIndex),
+]
+
+# Built after the replica reports ready: only semantic search needs it, and it is built on demand
+WARMUP_AFTER_READY = {'semantic_index'}
+
+def publish_startup_metrics(report: StartupReport):
+    """Copy the start-up report into the metrics registry (phase gauges, readiness, first render)."""
+    for phase, seconds in list(report.phases.items()):
+        METRICS.set_gauge(STARTUP_METRIC, round(seconds, 6), phase=phase)
+    if report.first_render_seconds is not None:
+        METRICS.set_gauge(FIRST_RENDER_METRIC, round(report.first_render_seconds, 6))
+    METRICS.set_gauge(READY_METRIC, int(report.ready.is_set()))
+
+class CatalogWarmUp:
+    """
+    Builds each catalog snapshot's derived structures off the request thread, and on the
+    first snapshot also imports requests and pre-opens the Azure connections. The start-up
+    report turns ready once the structures every request path needs are built; the
+    semantic index and the connections follow on the same thread. Anything not yet built
+    when a run needs it is built on demand as before (derived() serialises the two).
+    """
     
-    # Beneficiary filter
-    if beneficiary_filter != "All Types":
-        filtered = [s for s in filtered if s['beneficiary'] == beneficiary_filter]
+    def __init__(self, report: StartupReport, http_client: AzureHttpClient,
+                 background: bool = True, semantic: bool = True):
+        self.report = report
+        self.http_client = http_client
+        self.background = background
+        self.structures = [(name, builder) for name, builder in WARMUP_STRUCTURES
+                           if semantic or name != 'semantic_index']
+        self._scheduled_version = None
+        self._lock = threading.Lock()
     
-    # Category filter
-    if category_filter != "All Categories":
-        filtered = [s for s in filtered if s['category'] == category_filter]
+    def ensure(self, catalog: SchemeCatalog):
+        """Warm catalog unless it already was or is being warmed (cheap enough for every rerun)."""
+        with self._lock:
+            if self._scheduled_version == catalog.version:
+                return
+            first = self._scheduled_version is None
+            self._scheduled_version = catalog.version
+        if self.background:
+            threading.Thread(target=self._run, args=(catalog, first), name="schememitra-warmup", daemon=True).start()
+        else:
+            self._run(catalog, first)
     
-    return filtered
+    def _run(self, catalog: SchemeCatalog, first: bool):
+        start = time.perf_counter()
+        error = None
+        try:
+            for name, builder in self.structures:
+                if name not in WARMUP_AFTER_READY:
+                    with self.report.phase(name):
+                        catalog.derived(name, builder)
+        except Exception as e:
+            # Not fatal: whatever is missing is built on first use
+            error = f"Warm-up failed: {e}"
+        if first:
+            self.report.mark_ready(time.perf_counter() - start, error)
+            publish_startup_metrics(self.report)
+        
+        try:
+            for name, builder in self.structures:
+                if name in WARMUP_AFTER_READY:
+                    with self.report.phase(name):
+                        catalog.derived(name, builder)
+            if first:
+                # Imports requests and builds the pooled session even when no endpoint is configured
+                endpoints = [url for url in (AZURE_OPENAI_ENDPOINT, AZURE_TEXTANALYTICS_ENDPOINT) if url]
+                with self.report.phase("http_connections"):
+                    self.http_client.warm(endpoints, WARMUP_CONNECT_TIMEOUT)
+        except Exception:
+            # The replica already serves; these are built or opened on first use instead
+            pass
+        if first:
+            publish_startup_metrics(self.report)
+
+@st.cache_resource
+def get_catalog_warmup() -> CatalogWarmUp:
+    """Return the process-wide warm-up worker."""
+    return CatalogWarmUp(STARTUP, AZURE_HTTP_CLIENT, background=BACKGROUND_WARMUP, semantic=WARMUP_SEMANTIC_INDEX)
+
+# Warm the first catalog snapshot, and each hot-reloaded one, in the background
+CATALOG_WARMUP = get_catalog_warmup()
+CATALOG_WARMUP.ensure(CATALOG)
 
 # ============================================================================
 # MAIN APPLICATION
 # ============================================================================
 
 def render_landing_page():
-    """Render the SchemeMitra landing/homepage with professional design."""
-    
-    # Hero Section using Streamlit
-    st.markdown("""
-    <style>
-        .hero-section {
-            background: linear-gradient(135deg, #0B5ED7 0%, #003366 100%);
-            padding: 5rem 3rem;
-            border-radius: 16px;
-            color: white;
-            text-align: center;
-            margin-bottom: 4rem;
-            box-shadow: 0 20px 60px rgba(0, 0, 0, 0.4);
-        }
-        .hero-title {
-            font-size: 3.5rem;
-            font-weight: 900;
-            margin: 0;
-            letter-spacing: -1px;
-        }
-        .hero-subtitle {
-            font-size: 1.6rem;
-            color: #FFD700;
-            margin: 1.5rem 0 0.5rem;
-            font-weight: 700;
-        }
-        .hero-description {
-            font-size: 1.1rem;
-            color: #D1D5DB;
-            margin: 0.5rem 0 0;
-            max-width: 600px;
-            margin-left: auto;
-            margin-right: auto;
-            line-height: 1.6;
-        }
-    </style>
-    
-    <div class="hero-section">
-        <div class="hero-title">🏛️ SchemeMitra</div>
-        <div class="hero-subtitle">Your AI Assistant for Government Schemes</div>
-        <p class="hero-description">
-            Discover and apply for government schemes you're eligible for using advanced AI-powered analysis. 
-            No login required. Completely free. Your privacy is our priority.
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    # Key Features Section
-    st.markdown("""
-    <div style="margin-bottom: 4rem;">
-        <h2 style="color: #FF9933; font-size: 2.2rem; text-align: center; margin-bottom: 3rem; font-weight: 800;">✨ Key Features</h2>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    col1, col2, col3 = st.columns(3, gap="large")
-    
-    with col1:
-        st.markdown("""
-        <div style="background: #1F2937; padding: 2.5rem; border-radius: 12px; border: 2px solid #374151; height: 100%; transition: all 0.3s ease;">
-            <div style="font-size: 3rem; margin-bottom: 1rem; text-align: center;">🤖</div>
-            <h3 style="color: #FF9933; margin: 0 0 0.75rem 0; text-align: center; font-size: 1.2rem;">AI-Powered Matching</h3>
-            <p style="color: #D1D5DB; margin: 0; text-align: center; line-height: 1.6;">Azure OpenAI analyzes your profile and matches you with relevant schemes instantly.</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown("""
-        <div style="background: #1F2937; padding: 2.5rem; border-radius: 12px; border: 2px solid #374151; height: 100%; transition: all 0.3s ease;">
-            <div style="font-size: 3rem; margin-bottom: 1rem; text-align: center;">📊</div>
-            <h3 style="color: #FF9933; margin: 0 0 0.75rem 0; text-align: center; font-size: 1.2rem;">Real-Time Analysis</h3>
-            <p style="color: #D1D5DB; margin: 0; text-align: center; line-height: 1.6;">Advanced Text Analytics extract your key information to determine eligibility accurately.</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown("""
-        <div style="background: #1F2937; padding: 2.5rem; border-radius: 12px; border: 2px solid #374151; height: 100%; transition: all 0.3s ease;">
-            <div style="font-size: 3rem; margin-bottom: 1rem; text-align: center;">📚</div>
-            <h3 style="color: #FF9933; margin: 0 0 0.75rem 0; text-align: center; font-size: 1.2rem;">12+ Schemes</h3>
-            <p style="color: #D1D5DB; margin: 0; text-align: center; line-height: 1.6;">Verified schemes from government portals covering all major beneficiary categories.</p>
-        </div>
-        """, unsafe_allow_html=True)
+    """Render the SchemeMitra landing/homepage from the precompiled markup in StaticAssets."""
+    landing = get_static_assets().landing
     
-    st.markdown("")  # Spacer
-    
-    col1, col2, col3 = st.columns(3, gap="large")
-    
-    with col1:
-        st.markdown("""
-        <div style="background: #1F2937; padding: 2.5rem; border-radius: 12px; border: 2px solid #374151; height: 100%; transition: all 0.3s ease;">
-            <div style="font-size: 3rem; margin-bottom: 1rem; text-align: center;">⭐</div>
-            <h3 style="color: #FF9933; margin: 0 0 0.75rem 0; text-align: center; font-size: 1.2rem;">Bookmarking</h3>
-            <p style="color: #D1D5DB; margin: 0; text-align: center; line-height: 1.6;">Save your favorite schemes for later and build your personalized opportunities list.</p>
-        </div>
-        """, unsafe_allow_html=True)
+    # Hero Section
+    st.markdown(landing["hero"], unsafe_allow_html=True)
     
-    with col2:
-        st.markdown("""
-        <div style="background: #1F2937; padding: 2.5rem; border-radius: 12px; border: 2px solid #374151; height: 100%; transition: all 0.3s ease;">
-            <div style="font-size: 3rem; margin-bottom: 1rem; text-align: center;">🔐</div>
-            <h3 style="color: #FF9933; margin: 0 0 0.75rem 0; text-align: center; font-size: 1.2rem;">Privacy First</h3>
-            <p style="color: #D1D5DB; margin: 0; text-align: center; line-height: 1.6;">No login required. No personal data stored. No external tracking. Ever.</p>
-        </div>
-        """, unsafe_allow_html=True)
+    # Key Features Section
+    st.markdown(landing["features_heading"], unsafe_allow_html=True)
     
-    with col3:
-        st.markdown("""
-        <div style="background: #1F2937; padding: 2.5rem; border-radius: 12px; border: 2px solid #374151; height: 100%; transition: all 0.3s ease;">
-            <div style="font-size: 3rem; margin-bottom: 1rem; text-align: center;">🌐</div>
-            <h3 style="color: #FF9933; margin: 0 0 0.75rem 0; text-align: center; font-size: 1.2rem;">Official Links</h3>
-            <p style="color: #D1D5DB; margin: 0; text-align: center; line-height: 1.6;">Every scheme links directly to official government portals for verification.</p>
-        </div>
-        """, unsafe_allow_html=True)
+    features = landing["features"]
+    for start in (0, 3):
+        if start:
+            st.markdown("")  # Spacer
+        for markup, col in zip(features[start:start + 3], st.columns(3, gap="large")):
+            with col:
+                st.markdown(markup, unsafe_allow_html=True)
     
     st.divider()
     
     # How It Works Section
-    st.markdown("""
-    <div style="margin-bottom: 4rem;">
-        <h2 style="color: #FF9933; font-size: 2.2rem; text-align: center; margin-bottom: 3rem; font-weight: 800;">🚀 How It Works</h2>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    col1, col2, col3, col4 = st.columns(4, gap="medium")
-    
-    with col1:
-        st.markdown("""
-        <div style="text-align: center;">
-            <div style="width: 80px; height: 80px; background: linear-gradient(135deg, #FF9933, #FFB366); border-radius: 50%; display: flex; align-items: center; justify-content: center; margin: 0 auto 1rem; font-size: 2rem; font-weight: 900; color: #0F172A;">1</div>
-            <h4 style="color: #F3F4F6; margin: 0 0 0.5rem 0; font-size: 1rem;">Tell Us About Yourself</h4>
-            <p style="color: #D1D5DB; font-size: 0.85rem; margin: 0; line-height: 1.5;">Share basic information like age, category, and skills.</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown("""
-        <div style="text-align: center;">
-            <div style="width: 80px; height: 80px; background: linear-gradient(135deg, #0B5ED7, #003366); border-radius: 50%; display: flex; align-items: center; justify-content: center; margin: 0 auto 1rem; font-size: 2rem; font-weight: 900; color: #fff;">2</div>
-            <h4 style="color: #F3F4F6; margin: 0 0 0.5rem 0; font-size: 1rem;">AI Analyzes</h4>
-            <p style="color: #D1D5DB; font-size: 0.85rem; margin: 0; line-height: 1.5;">Our AI engine matches you with relevant schemes.</p>
-        </div>
-        """, unsafe_allow_html=True)
+    st.markdown(landing["steps_heading"], unsafe_allow_html=True)
     
-    with col3:
-        st.markdown("""
-        <div style="text-align: center;">
-            <div style="width: 80px; height: 80px; background: linear-gradient(135deg, #138808, #1FBF1F); border-radius: 50%; display: flex; align-items: center; justify-content: center; margin: 0 auto 1rem; font-size: 2rem; font-weight: 900; color: #fff;">3</div>
-            <h4 style="color: #F3F4F6; margin: 0 0 0.5rem 0; font-size: 1rem;">Review Results</h4>
-            <p style="color: #D1D5DB; font-size: 0.85rem; margin: 0; line-height: 1.5;">Check eligibility and learn why you match.</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col4:
-        st.markdown("""
-        <div style="text-align: center;">
-            <div style="width: 80px; height: 80px; background: linear-gradient(135deg, #FF9933, #FFB366); border-radius: 50%; display: flex; align-items: center; justify-content: center; margin: 0 auto 1rem; font-size: 2rem; font-weight: 900; color: #0F172A;">4</div>
-            <h4 style="color: #F3F4F6; margin: 0 0 0.5rem 0; font-size: 1rem;">Apply Now</h4>
-            <p style="color: #D1D5DB; font-size: 0.85rem; margin: 0; line-height: 1.5;">Bookmark and apply via official portals.</p>
-        </div>
-        """, unsafe_allow_html=True)
+    for markup, col in zip(landing["steps"], st.columns(4, gap="medium")):
+        with col:
+            st.markdown(markup, unsafe_allow_html=True)
     
     st.divider()
     
     # Coverage Section
-    st.markdown("""
-    <div style="margin-bottom: 4rem;">
-        <h2 style="color: #FF9933; font-size: 2.2rem; text-align: center; margin-bottom: 3rem; font-weight: 800;">📋 We Cover All Categories</h2>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    col1, col2, col3, col4, col5, col6 = st.columns(6, gap="small")
-    
-    categories = [
-        ("🌾", "Farmers"),
-        ("👩‍💼", "Women"),
-        ("👨‍🎓", "Youth"),
-        ("🏭", "MSME"),
-        ("📚", "Education"),
-        ("👴", "Seniors"),
-    ]
+    st.markdown(landing["categories_heading"], unsafe_allow_html=True)
     
-    for (emoji, name), col in zip(categories, [col1, col2, col3, col4, col5, col6]):
+    for markup, col in zip(landing["categories"], st.columns(6, gap="small")):
         with col:
-            st.markdown(f"""
-            <div style="text-align: center; padding: 1.5rem; background: #1F2937; border-radius: 10px; border: 2px solid #374151;">
-                <div style="font-size: 2.5rem; margin-bottom: 0.5rem;">{emoji}</div>
-                <p style="color: #F3F4F6; font-weight: 600; margin: 0; font-size: 0.9rem;">{name}</p>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(markup, unsafe_allow_html=True)
     
     st.divider()
     
     # Tech Stack Section
-    st.markdown("""
-    <div style="margin-bottom: 4rem;">
-        <h2 style="color: #FF9933; font-size: 2.2rem; text-align: center; margin-bottom: 3rem; font-weight: 800;">⚙️ Built With</h2>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    col1, col2, col3, col4, col5, col6 = st.columns(6, gap="small")
-    
-    tech_stack = [
-        ("Streamlit", "Frontend"),
-        ("Python 3.9+", "Language"),
-        ("Azure OpenAI", "AI"),
-        ("Text Analytics", "NLP"),
-        ("Gov Data", "Source"),
-        ("Cloud", "Deploy"),
-    ]
+    st.markdown(landing["tech_heading"], unsafe_allow_html=True)
     
-    for (tech, category), col in zip(tech_stack, [col1, col2, col3, col4, col5, col6]):
+    for markup, col in zip(landing["tech"], st.columns(6, gap="small")):
         with col:
-            st.markdown(f"""
-            <div style="text-align: center; padding: 1.5rem; background: #1F2937; border-radius: 10px; border: 2px solid #374151;">
-                <p style="color: #FF9933; font-weight: 700; margin: 0; font-size: 0.85rem;">{tech}</p>
-                <p style="color: #D1D5DB; font-size: 0.75rem; margin: 0.5rem 0 0 0;">{category}</p>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(markup, unsafe_allow_html=True)
     
     st.divider()
     
     # CTA Section
-    st.markdown("""
-    <div style="background: linear-gradient(135deg, #0B5ED7 0%, #FF9933 100%); padding: 3.5rem 2.5rem; border-radius: 12px; text-align: center; margin-bottom: 2rem; box-shadow: 0 15px 40px rgba(11, 94, 215, 0.25);">
-        <h2 style="color: white; font-size: 2.2rem; margin: 0 0 1rem 0; font-weight: 900;">🎯 Ready to Find Your Schemes?</h2>
-        <p style="color: #F3F4F6; font-size: 1.1rem; margin: 0; line-height: 1.6;">Click the <strong>Finder</strong> tab above to discover government schemes tailored to your profile in seconds.</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(landing["cta"], unsafe_allow_html=True)
     
     # Disclaimer
-    st.markdown("""
-    <div style="background: rgba(255, 153, 51, 0.1); border: 2px solid #FF9933; padding: 2rem; border-radius: 10px;">
-        <p style="color: #FF9933; font-weight: 800; margin: 0 0 0.75rem 0; font-size: 1.1rem;">⚠️ Important Disclaimer</p>
-        <p style="color: #D1D5DB; margin: 0; line-height: 1.8;">
-            <strong>SchemeMitra</strong> is an independent educational application and is <strong>NOT an official government portal</strong>. 
-            This platform provides AI-powered guidance based on your input. 
-            <strong>Always verify all information on official government websites</strong> before applying for any scheme. 
-            We are not responsible for inaccuracies or outdated information. 
-            For official details, eligibility criteria, and applications, please visit government portals directly.
-        </p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(landing["disclaimer"], unsafe_allow_html=True)
 
 def main():
     """Main application entry point."""
     
-    # Inject custom CSS FIRST
-    inject_css()
+    # Every stage below is timed; the spans of this rerun feed the debug panel
+    METRICS.start_trace()
+    rerun_start = time.perf_counter()
     
-    # Add custom styling
-    st.markdown("""
-    <style>
-    [data-testid="stAppViewContainer"] {
-        background-color: #0F172A;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    # Bookmarks, expanded cards, language and profile may have been saved by another replica
+    restore_session_state()
+    
+    # A full run: cards register their fragments again and batch their explanations
+    st.session_state._fragment_rerun = False
+    st.session_state._rendered_cards = set()
+    
+    # Inject custom CSS FIRST
+    with METRICS.stage("inject_css"):
+        inject_css()
     
     # Render navbar
-    render_navbar()
+    with METRICS.stage("navbar"):
+        render_navbar()
     
     # Create tabs
     tab1, tab2 = st.tabs(["🏠 Home", "🔍 Finder"])
     
     # ====== HOME TAB ======
     with tab1:
-        render_landing_page()
+        with METRICS.stage("landing_page"):
+            render_landing_page()
     
     # ====== FINDER TAB ======
     with tab2:
@@ -902,10 +4282,12 @@ def main():
             # Language selector
             language = st.radio(
                 "Language",
-                options=["🇬🇧 English", "🇮🇳 Hindi"],
+                options=list(LANGUAGE_OPTIONS.values()),
                 key="language_select"
             )
-            st.session_state.language = "en" if "English" in language else "hi"
+            st.session_state.language = next(
+                code for code, label in LANGUAGE_OPTIONS.items() if label == language
+            )
             
             # Accessibility mode
             accessibility = st.checkbox(
@@ -926,8 +4308,8 @@ def main():
             
             ### 🔐 Privacy
             - No login required
-            - No personal data stored
-            - Session-based bookmarks only
+            - Bookmarks, language and the profile below are saved for this page's link only
+            - Anyone with the full link (including `?sid=`) can see them, so remove `sid` before sharing
             - No external tracking
             
             ### 📚 Need Help?
@@ -940,28 +4322,34 @@ def main():
         col1, col2 = st.columns([3, 1])
         
         with col1:
-            st.markdown("""
+            st.markdown(compact_html("""
             <div style="text-align: center; margin-bottom: 2rem;">
                 <p style="font-size: 1.1rem; color: #D1D5DB; font-weight: 500;">
                     🎯 Discover government schemes tailored to your profile
                 </p>
             </div>
-            """, unsafe_allow_html=True)
+            """), unsafe_allow_html=True)
         
         # Search section
-        search_query, search_button = render_search_section()
+        with METRICS.stage("search_section"):
+            search_query, search_button, search_ranked, search_semantic = render_search_section()
         
         # User profile input for AI analysis
         with st.expander("📋 Tell us about yourself (Optional - for better matching)", expanded=False):
             col1, col2 = st.columns(2)
             
+            category_options = CATEGORY_NAMES + ["Other"]
+            if st.session_state.get('profile_category') not in category_options:
+                # Not chosen yet, or restored from a catalog without that category
+                st.session_state.profile_category = category_options[0]
+            
             with col1:
-                age = st.number_input("Age", min_value=0, max_value=100, value=30)
+                age = st.number_input("Age", min_value=0, max_value=100, key="profile_age")
             
             with col2:
-                category = st.selectbox("Select your category", CATEGORY_NAMES + ["Other"])
+                category = st.selectbox("Select your category", category_options, key="profile_category")
             
-            skills = st.text_input("Your skills/profession (optional)")
+            skills = st.text_input("Your skills/profession (optional)", key="profile_skills")
             
             # Create user profile for AI
             user_profile = f"{age} years old, {category} category"
@@ -976,43 +4364,50 @@ def main():
         render_category_selector()
         
         # Filters
-        selected_ministry, selected_beneficiary, selected_category = render_filters()
+        effective_query = search_query if search_button or search_query else ""
+        with METRICS.stage("filters"):
+            selected_ministry, selected_beneficiary, selected_category = render_filters(effective_query, search_ranked, search_semantic)
         
         st.divider()
         
         # Get selected category from button clicks
         selected_category = st.session_state.get('selected_category', selected_category)
         
+        # Expanded cards register here and are explained concurrently once the page is laid out
+        pending_explanations = []
+        
         # Filter schemes
-        filtered_schemes = filter_schemes(
-            SCHEMES,
-            search_query=search_query if search_button or search_query else "",
-            ministry_filter=selected_ministry,
-            beneficiary_filter=selected_beneficiary,
-            category_filter=selected_category
-        )
+        with METRICS.stage("filter_schemes"):
+            filtered_schemes = filter_schemes(
+                SCHEMES,
+                search_query=effective_query,
+                ministry_filter=selected_ministry,
+                beneficiary_filter=selected_beneficiary,
+                category_filter=selected_category,
+                ranked=search_ranked,
+                semantic=search_semantic
+            )
         
         # Display results
-        st.markdown("""
+        st.markdown(compact_html("""
         <div style="margin-bottom: 2rem; margin-top: 2rem;">
             <h2 style="color: #FF9933; border-bottom: 3px solid #0B5ED7; padding-bottom: 0.5rem;">
                 🎯 Available Schemes
             </h2>
         </div>
-        """, unsafe_allow_html=True)
+        """), unsafe_allow_html=True)
         
         if filtered_schemes:
-            st.markdown(f"""
-            <div style="padding: 0.8rem; background: rgba(11, 94, 215, 0.15); border-radius: 6px; margin-bottom: 1.5rem; text-align: center; font-weight: 600; color: #0B5ED7; border: 1px solid #374151;">
-                Found {len(filtered_schemes)} scheme(s) matching your criteria
-            </div>
-            """, unsafe_allow_html=True)
-            
-            for idx, scheme in enumerate(filtered_schemes, 1):
-                render_scheme_card(scheme, idx)
+            # Only the visible page of cards is built on each rerun
+            with METRICS.stage("results_page"):
+                render_results_page(
+                    filtered_schemes,
+                    (effective_query, selected_ministry, selected_beneficiary, selected_category, search_ranked, search_semantic),
+                    pending_explanations=pending_explanations
+                )
         
         else:
-            st.markdown("""
+            st.markdown(compact_html("""
             <div style="text-align: center; padding: 3rem 2rem; background: #1F2937; border-radius: 10px; box-shadow: 0 1px 2px rgba(0, 0, 0, 0.3); border: 1px solid #374151;">
                 <div style="font-size: 3rem; margin-bottom: 1rem;">🔍</div>
                 <div style="font-size: 1.3rem; font-weight: 700; color: #FF9933; margin-bottom: 0.5rem;">No Schemes Found</div>
@@ -1023,13 +4418,21 @@ def main():
                     • Browse by category above
                 </div>
             </div>
-            """, unsafe_allow_html=True)
+            """), unsafe_allow_html=True)
         
         st.divider()
         
         # Bookmarked schemes section
-        if st.session_state.bookmarked_schemes:
-            render_bookmarked_schemes()
+        with METRICS.stage("bookmarks"):
+            render_bookmarked_schemes(pending_explanations)
+        
+        # Generate explanations for every expanded card in parallel
+        if pending_explanations:
+            with METRICS.stage("explanations"):
+                render_pending_explanations(
+                    pending_explanations,
+                    st.session_state.get('last_user_profile', 'General user')
+                )
         
         st.divider()
         
@@ -1042,6 +4445,16 @@ def main():
         
         # Footer
         render_footer()
+    
+    persist_session_state()
+    
+    METRICS.observe(STAGE_METRIC, time.perf_counter() - rerun_start, stage="rerun")
+    if STARTUP.mark_first_render():
+        publish_startup_metrics(STARTUP)
+    trace = METRICS.finish_trace()
+    if METRICS_DEBUG_PANEL:
+        with st.sidebar:
+            render_debug_panel(trace, time.perf_counter() - rerun_start)
 
 # ============================================================================
 # ENTRY POINT
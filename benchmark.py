@@ -0,0 +1,431 @@
+"""
+🏛️ SchemeMitra - Finder Hot Path Benchmark
+
+Generates synthetic scheme catalogs (same fields as schemes.json) and times
+each stage of the Finder hot path: loading the catalog, building the search
+index and score matrix, filter_schemes, match scoring and a full headless
+Streamlit render of the app. The cold-start stages import the app in a fresh
+interpreter and time the import and the background warm-up until ready.
+
+Results are written as JSON and compared against the stored baseline
+(benchmark_baseline.json, recorded from this tree with this harness) so
+regressions are caught before a deploy. A stage the baseline has no timing
+for fails the comparison too, until the baseline is re-recorded:
+
+    python benchmark.py                              # compare with benchmark_baseline.json
+    python benchmark.py --sizes 100,10000 --skip-render
+    python benchmark.py --sizes 100 --skip-cold-start --no-baseline
+    python benchmark.py --save-baseline              # re-record benchmark_baseline.json
+
+To see how far the optimisations got, benchmark the pre-optimisation revision
+from a worktree:
+
+    git worktree add /tmp/schememitra-base 8ba74d7
+    python benchmark.py --app-dir /tmp/schememitra-base --no-baseline
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+import subprocess
+import gc
+import shutil
+import tempfile
+import logging
+from datetime import datetime
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_SIZES = "100,10000,1000000"
+DEFAULT_OUTPUT = "benchmark_results.json"
+DEFAULT_BASELINE = os.path.join(REPO_DIR, "benchmark_baseline.json")
+
+# The pre-optimisation app renders every matching card, so its render is only timed up to this size
+LEGACY_RENDER_MAX_SIZE = 1000
+
+# A stage is a regression when it is this much slower than the baseline...
+DEFAULT_TOLERANCE = 1.25
+# ...and slower by at least this many milliseconds (ignores timer noise)
+NOISE_FLOOR_MS = 1.0
+
+# Imports the app in a fresh interpreter and reports (as JSON) how long the import took,
+# how long until the warm-up made it ready, and the app's own start-up report
+COLD_START_SCRIPT = """
+import json, logging, sys, time
+start = time.perf_counter()
+logging.getLogger("streamlit").setLevel(logging.ERROR)
+sys.path.insert(0, sys.argv[1])
+import app
+imported = time.perf_counter() - start
+startup = getattr(app, "STARTUP", None)  # the pre-optimisation app has no background warm-up
+ready, report = None, {}
+if startup is not None:
+    startup.ready.wait()
+    ready, report = time.perf_counter() - start, startup.as_dict()
+print(json.dumps({"import_s": imported, "ready_s": ready, "report": report}))
+"""
+
+SEARCH_QUERIES = ["kisan", "farmer support", "women", "loan", "pradhan mantri", "scholarship", "xyzzy"]
+# Short and common terms: each expands to much of the vocabulary and matches nearly every scheme
+SHORT_QUERIES = ["a", "e", "of", "yojana1"]
+
+PROFILES = [
+    "30 years old, Farmers category",
+    "22 years old, Youth category, skills: student",
+    "65 years old, Senior Citizens category",
+    "General user",
+]
+
+def print_header(text):
+    """Print a formatted header."""
+    print("\n" + "=" * 70)
+    print(f"  {text}")
+    print("=" * 70 + "\n")
+
+def print_info(text):
+    """Print info message."""
+    print(f"ℹ️  {text}")
+
+# ============================================================================
+# SYNTHETIC DATA
+# ============================================================================
+
+def generate_catalog(size: int, seed: int = 42) -> list:
+    """Generate size synthetic schemes with the same fields as schemes.json."""
+    with open(os.path.join(REPO_DIR, "schemes.json"), "r", encoding="utf-8") as f:
+        templates = json.load(f)["schemes"]
+
+    rng = random.Random(seed)
+    words = sorted({w for s in templates for w in f"{s['name']} {s['description']}".split()})
+    words += [f"yojana{i}" for i in range(200)]
+    ministries = sorted({s['ministry'] for s in templates}) + [f"Ministry of Synthetic Affairs {i}" for i in range(40)]
+    beneficiaries = sorted({s['beneficiary'] for s in templates}) + [f"Synthetic beneficiary group {i}" for i in range(150)]
+    categories = sorted({s['category'] for s in templates})
+
+    catalog = []
+    for i in range(size):
+        template = templates[i % len(templates)]
+        catalog.append({
+            "id": f"syn{i:07d}",
+            "name": " ".join(rng.choices(words, k=rng.randint(3, 6))).title(),
+            "ministry": rng.choice(ministries),
+            "category": rng.choice(categories),
+            "beneficiary": rng.choice(beneficiaries),
+            "benefit": template["benefit"],
+            "status": "Active",
+            "source_url": template["source_url"],
+            "source_name": template["source_name"],
+            "description": " ".join(rng.choices(words, k=rng.randint(12, 30))) + "."
+        })
+    return catalog
+
+def write_catalog(catalog: list, directory: str) -> str:
+    """Write a catalog to a schemes.json-style file and return its path."""
+    path = os.path.join(directory, f"schemes_{len(catalog)}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"schemes": catalog}, f, ensure_ascii=False)
+    return path
+
+# ============================================================================
+# TIMING
+# ============================================================================
+
+def time_stage(func, repeat: int = 5) -> dict:
+    """Run func repeat times and summarise wall-clock timings in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return summarise(timings)
+
+def summarise(timings: list) -> dict:
+    """Median, min and max of timings (milliseconds)."""
+    return {
+        "median_ms": round(statistics.median(timings), 4),
+        "min_ms": round(min(timings), 4),
+        "max_ms": round(max(timings), 4),
+        "runs": len(timings)
+    }
+
+def repeats_for(size: int, small: int, large: int = 1) -> int:
+    """Fewer repetitions for expensive stages on big catalogs."""
+    return small if size <= 10000 else large
+
+def is_legacy(app) -> bool:
+    """True for the pre-optimisation app: no catalog store, search index or score matrix."""
+    return not hasattr(app, "CatalogStore")
+
+def load_legacy_schemes(path: str) -> list:
+    """The pre-optimisation load_schemes body (it reads ./schemes.json, uncached here)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+        return data.get('schemes', [])
+
+def benchmark_size(app, app_dir: str, size: int, directory: str, skip_render: bool, skip_cold_start: bool) -> dict:
+    """
+    Time every Finder stage for one synthetic catalog size. Stages the
+    pre-optimisation app has no counterpart for are left out of its results.
+    """
+    print_info(f"Generating {size:,} synthetic schemes...")
+    path = write_catalog(generate_catalog(size), directory)
+    legacy = is_legacy(app)
+    if legacy:
+        shutil.copyfile(path, os.path.join(directory, "schemes.json"))
+    results = {}
+
+    # Each of the three runs holds its own copy of the catalog and its derived structures;
+    # at 10^6 schemes two of them do not fit in memory together, so they run one after another
+    if not skip_cold_start:
+        results.update(benchmark_cold_start(app_dir, path, size, directory))
+
+    results.update(benchmark_stages(app, path, size))
+    if not legacy:
+        app._adhoc_catalogs().clear()
+    gc.collect()
+
+    if skip_render:
+        pass
+    elif legacy and size > LEGACY_RENDER_MAX_SIZE:
+        print_info(f"Skipping the render: the pre-optimisation app renders all {size:,} cards")
+    else:
+        results.update(benchmark_render(app_dir, path, size, directory))
+
+    return results
+
+def benchmark_stages(app, path: str, size: int) -> dict:
+    """Time the in-process stages: catalog load, index builds, filtering and scoring."""
+    legacy = is_legacy(app)
+    results = {}
+
+    # load_schemes: read and parse the data file (and, since the catalog store, hash it into a snapshot)
+    if legacy:
+        results["load_schemes"] = time_stage(lambda: load_legacy_schemes(path), repeats_for(size, 5))
+        schemes = load_legacy_schemes(path)
+    else:
+        results["load_schemes"] = time_stage(lambda: app.CatalogStore(path, check_seconds=3600), repeats_for(size, 5))
+        schemes = app.CatalogStore(path, check_seconds=3600).current().schemes
+
+        results["build_search_index"] = time_stage(lambda: app.SchemeSearchIndex(schemes), repeats_for(size, 5))
+        results["build_score_matrix"] = time_stage(lambda: app.KeywordFeatureMatrix(schemes), repeats_for(size, 5))
+
+        # Warm the per-catalog derived structures, then time queries only
+        app.filter_schemes(schemes, "warm-up")
+        app.KeywordFeatureMatrix.for_schemes(schemes)
+
+    def run_queries(queries=SEARCH_QUERIES, **kwargs):
+        for query in queries:
+            app.filter_schemes(schemes, query, **kwargs)
+
+    results["filter_schemes"] = time_stage(run_queries, repeats_for(size, 20, 5))
+    if not legacy:
+        results["filter_schemes_ranked"] = time_stage(lambda: run_queries(ranked=True), repeats_for(size, 20, 5))
+        run_queries(SHORT_QUERIES, ranked=True)
+        results["filter_schemes_ranked_short"] = time_stage(lambda: run_queries(SHORT_QUERIES, ranked=True),
+                                                            repeats_for(size, 20, 5))
+    results["filter_schemes_with_facets"] = time_stage(
+        lambda: app.filter_schemes(schemes, "", schemes[0]['ministry'], "All Types", schemes[0]['category']),
+        repeats_for(size, 20, 5)
+    )
+
+    def scalar_scores():
+        for profile in PROFILES:
+            for scheme in schemes:
+                app.calculate_match_score(scheme, profile)
+
+    results["calculate_match_score"] = time_stage(scalar_scores, repeats_for(size, 3))
+
+    if not legacy:
+        feature_matrix = app.KeywordFeatureMatrix.for_schemes(schemes)
+        counter = iter(range(10 ** 9))
+
+        def vectorized_scores():
+            # A fresh profile string each time so the per-profile memo is not hit
+            for profile in PROFILES:
+                feature_matrix.score(f"{profile} #{next(counter)}")
+
+        results["vectorized_match_score"] = time_stage(vectorized_scores, repeats_for(size, 20, 5))
+
+    return results
+
+def benchmark_cold_start(app_dir: str, path: str, size: int, directory: str) -> dict:
+    """Time importing the app, and its background warm-up, in fresh interpreters."""
+    env = dict(os.environ,
+               SCHEMEMITRA_BACKGROUND_WARMUP="true",
+               SCHEMEMITRA_WARMUP_SEMANTIC_INDEX="true",
+               SCHEMEMITRA_SCHEMES_PATH=path,
+               SCHEMEMITRA_CATALOG_CHECK_SECONDS="3600",
+               SCHEMEMITRA_CACHE_PATH=os.path.join(directory, "cold_start_cache.sqlite3"))
+    imports, ready = [], []
+    for _ in range(repeats_for(size, 5)):
+        output = subprocess.check_output([sys.executable, "-c", COLD_START_SCRIPT, app_dir],
+                                         cwd=directory, env=env, text=True, stderr=subprocess.DEVNULL)
+        run = json.loads(output.strip().splitlines()[-1])
+        imports.append(run["import_s"] * 1000)
+        if run["ready_s"] is not None:
+            ready.append(run["ready_s"] * 1000)
+    if not ready:
+        return {"cold_import": summarise(imports)}
+    print_info(f"Start-up phases (ms): {run['report']['phases_ms']}")
+    return {"cold_import": summarise(imports), "cold_ready": summarise(ready)}
+
+def benchmark_render(app_dir: str, path: str, size: int, directory: str) -> dict:
+    """
+    Time a cold and a warm headless Streamlit run of the whole app, from the
+    catalog directory (the pre-optimisation app reads ./schemes.json).
+    """
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    os.environ["SCHEMEMITRA_SCHEMES_PATH"] = path
+    os.environ["SCHEMEMITRA_CATALOG_CHECK_SECONDS"] = "3600"
+    st.cache_resource.clear()
+    st.cache_data.clear()
+
+    at = AppTest.from_file(os.path.join(app_dir, "app.py"), default_timeout=max(60, size / 1000))
+
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        start = time.perf_counter()
+        at.run()
+        cold_ms = (time.perf_counter() - start) * 1000
+        if at.exception:
+            raise RuntimeError(f"App raised during benchmark render: {at.exception[0].message}")
+
+        warm = time_stage(at.run, repeats_for(size, 5, 3))
+    finally:
+        os.chdir(cwd)
+    return {
+        "finder_render_cold": {"median_ms": round(cold_ms, 4), "min_ms": round(cold_ms, 4), "max_ms": round(cold_ms, 4), "runs": 1},
+        "finder_render_warm": warm
+    }
+
+# ============================================================================
+# BASELINE COMPARISON
+# ============================================================================
+
+def compare_to_baseline(current: dict, baseline: dict, tolerance: float) -> tuple:
+    """
+    Return a list of (size, stage, baseline_ms, current_ms, ratio) regressions
+    and a list of (size, stage) timed now that the baseline has no timing for.
+    """
+    regressions, missing = [], []
+    print_header("COMPARISON WITH BASELINE")
+    print(f"{'size':>10}  {'stage':<28} {'baseline ms':>12} {'current ms':>12} {'ratio':>7}")
+
+    for size, stages in current["results"].items():
+        for stage, timing in stages.items():
+            base = baseline.get("results", {}).get(size, {}).get(stage)
+            if base is None:
+                print(f"{size:>10}  {stage:<28} {'-':>12} {timing['median_ms']:>12.3f} {'-':>7}  ❔ not in baseline")
+                missing.append((size, stage))
+                continue
+            base_ms, cur_ms = base["median_ms"], timing["median_ms"]
+            ratio = cur_ms / base_ms if base_ms > 0 else float("inf")
+            regressed = ratio > tolerance and cur_ms - base_ms > NOISE_FLOOR_MS
+            marker = "  ❌" if regressed else ""
+            print(f"{size:>10}  {stage:<28} {base_ms:>12.3f} {cur_ms:>12.3f} {ratio:>7.2f}{marker}")
+            if regressed:
+                regressions.append((size, stage, base_ms, cur_ms, ratio))
+
+    return regressions, missing
+
+def git_revision(app_dir: str) -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       cwd=app_dir, text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SchemeMitra Finder hot path.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated catalog sizes (default: %(default)s)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write results JSON (default: %(default)s)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help="Baseline results JSON to compare against (default: benchmark_baseline.json)")
+    parser.add_argument("--no-baseline", action="store_true", help="Do not compare against a baseline")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Write the results to benchmark_baseline.json instead of comparing")
+    parser.add_argument("--app-dir", default=REPO_DIR,
+                        help="Checkout whose app.py is benchmarked, e.g. a worktree of the pre-optimisation revision")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown ratio before a stage counts as a regression (default: %(default)s)")
+    parser.add_argument("--skip-render", action="store_true", help="Skip the headless Streamlit render stage")
+    parser.add_argument("--skip-cold-start", action="store_true", help="Skip the fresh-interpreter cold-start stages")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    # This process times every stage explicitly: a background warm-up here would compete with
+    # the stages, and with the cold-start interpreters, for the CPU
+    os.environ["SCHEMEMITRA_BACKGROUND_WARMUP"] = "false"
+    os.environ["SCHEMEMITRA_WARMUP_SEMANTIC_INDEX"] = "false"
+
+    # Quieten Streamlit's bare-mode warnings when importing the app outside `streamlit run`
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    app_dir = os.path.abspath(args.app_dir)
+    sys.path.insert(0, app_dir)
+    import app
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": git_revision(app_dir),
+            "app": "pre-optimisation" if is_legacy(app) else "current",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+            "cpu_count": os.cpu_count()
+        },
+        "results": {}
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            print_header(f"CATALOG SIZE {size:,}")
+            results["results"][str(size)] = benchmark_size(app, app_dir, size, directory,
+                                                           args.skip_render, args.skip_cold_start)
+            for stage, timing in results["results"][str(size)].items():
+                print(f"  {stage:<28} median {timing['median_ms']:>12.3f} ms   (min {timing['min_ms']:.3f}, runs {timing['runs']})")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print_info(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(DEFAULT_BASELINE, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print_info(f"Baseline saved to {DEFAULT_BASELINE}")
+        return
+
+    if args.no_baseline:
+        return
+    if not os.path.exists(args.baseline):
+        print_info(f"No baseline at {args.baseline}; pass --no-baseline to skip the comparison")
+        sys.exit(2)
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline["meta"].get("cpu_count") != results["meta"]["cpu_count"] or \
+            baseline["meta"].get("processor") != results["meta"]["processor"]:
+        print_info(f"Baseline was recorded on {baseline['meta'].get('processor')} x{baseline['meta'].get('cpu_count')}; "
+                   "timings from different hardware are only roughly comparable")
+    regressions, missing = compare_to_baseline(results, baseline, args.tolerance)
+    if missing:
+        print(f"\n❌ {len(missing)} stage(s) have no baseline timing; re-record it with --save-baseline")
+    if regressions:
+        print(f"\n❌ {len(regressions)} stage(s) regressed beyond {args.tolerance:.2f}x the baseline")
+    if missing or regressions:
+        sys.exit(1)
+    print("\n✅ No regressions against the baseline")
+
+if __name__ == "__main__":
+    main()
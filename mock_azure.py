@@ -0,0 +1,433 @@
+"""
+🏛️ SchemeMitra - Local Azure Stand-in Server
+
+A small offline stand-in for the two Azure routes SchemeMitra calls:
+
+    POST /openai/deployments/<deployment>/chat/completions   (incl. stream=true SSE)
+    POST /text/analytics/<version>/entities/recognition/general
+
+Structured batch prompts (one "[<scheme id>]" block per scheme, asking for
+{"explanations": [...]}) get a JSON reply in that shape; other prompts get
+filler prose. Latency, 429/5xx injection and token counts are configurable, and runs are
+reproducible with --seed, so concurrency, caching and retry behaviour can be
+load-tested without real Azure credentials:
+
+    python mock_azure.py --port 8765 --latency-ms 300 --rate-429 0.05
+    AZURE_OPENAI_ENDPOINT=http://127.0.0.1:8765 AZURE_OPENAI_API_KEY=mock \\
+    AZURE_TEXTANALYTICS_ENDPOINT=http://127.0.0.1:8765 AZURE_TEXTANALYTICS_KEY=mock \\
+    streamlit run app.py
+
+GET /stats returns request, error and token counters as JSON; POST /stats/reset
+clears them.
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, List, Optional, Tuple
+
+CHAT_ROUTE = re.compile(r"^/openai/deployments/(?P<deployment>[^/]+)/chat/completions$")
+ENTITIES_ROUTE = re.compile(r"^/text/analytics/(?P<version>[^/]+)/entities/recognition/general$")
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+
+# Azure's synchronous entity-recognition limit
+ENTITY_MAX_DOCUMENTS = 5
+
+# Filler vocabulary for generated completions
+COMPLETION_WORDS = (
+    "You may be eligible for this scheme because it supports citizens in your category. "
+    "Check the official portal for the latest criteria, required documents and the "
+    "application process. Benefits are paid directly to your bank account after verification."
+).split()
+
+# Batch explanation prompts list each scheme under an "[<id>]" line and ask for this JSON object
+BATCH_FORMAT_MARKER = '{"explanations"'
+BATCH_ID_LINE = re.compile(r"^\[([^\[\]\s]+)\]$", re.M)
+
+ENTITY_CATEGORIES = {
+    "farmer": "PersonType", "farmers": "PersonType", "student": "PersonType", "students": "PersonType",
+    "women": "PersonType", "youth": "PersonType", "entrepreneur": "PersonType", "senior": "PersonType",
+    "india": "Location", "delhi": "Location", "maharashtra": "Location", "bihar": "Location",
+    "ministry": "Organization", "government": "Organization",
+}
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token, like OpenAI's rule of thumb)."""
+    return max(1, (len(text) + 3) // 4) if text else 0
+
+class MockAzureConfig:
+    """Behaviour knobs for the stand-in server."""
+
+    def __init__(self, latency_ms: float = 200.0, latency_jitter_ms: float = 50.0,
+                 latency_distribution: str = "normal", token_delay_ms: float = 15.0,
+                 rate_429: float = 0.0, rate_5xx: float = 0.0, retry_after: float = 1.0,
+                 completion_tokens: int = 80, api_key: Optional[str] = None,
+                 seed: Optional[int] = None):
+        if latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"latency_distribution must be one of {LATENCY_DISTRIBUTIONS}")
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.latency_distribution = latency_distribution
+        self.token_delay_ms = token_delay_ms
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.retry_after = retry_after
+        self.completion_tokens = completion_tokens
+        self.api_key = api_key
+        self.rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def sample_latency(self) -> float:
+        """Seconds to wait before answering a request."""
+        mean, jitter = self.latency_ms, self.latency_jitter_ms
+        with self._rng_lock:
+            if self.latency_distribution == "fixed":
+                value = mean
+            elif self.latency_distribution == "uniform":
+                value = self.rng.uniform(mean - jitter, mean + jitter)
+            elif self.latency_distribution == "normal":
+                value = self.rng.gauss(mean, jitter)
+            else:
+                # Long-tailed: median at latency_ms, jitter controls the spread
+                sigma = jitter / mean if mean > 0 else 0.0
+                value = mean * self.rng.lognormvariate(0.0, sigma)
+        return max(0.0, value) / 1000
+
+    def sample_fault(self) -> Optional[int]:
+        """Status code to inject for this request, or None to answer normally."""
+        with self._rng_lock:
+            roll = self.rng.random()
+            status = self.rng.choice((500, 502, 503))
+        if roll < self.rate_429:
+            return 429
+        if roll < self.rate_429 + self.rate_5xx:
+            return status
+        return None
+
+class MockAzureStats:
+    """Thread-safe counters exposed on GET /stats."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters: Dict[str, int] = {
+                "chat_requests": 0, "chat_streamed": 0, "entity_requests": 0,
+                "entity_documents": 0, "injected_429": 0, "injected_5xx": 0,
+                "rejected": 0, "prompt_tokens": 0, "completion_tokens": 0,
+            }
+            self.in_flight = 0
+            self.max_in_flight = 0
+
+    def add(self, **counts: int):
+        with self._lock:
+            for name, value in counts.items():
+                self.counters[name] += value
+
+    def enter(self):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return dict(self.counters, in_flight=self.in_flight, max_in_flight=self.max_in_flight)
+
+def generate_completion(prompt: str, max_tokens: int, completion_tokens: int) -> List[str]:
+    """Deterministic completion pieces (one per token) for a prompt."""
+    count = max(1, min(max_tokens, completion_tokens))
+    offset = int(hashlib.sha1(prompt.encode("utf-8")).hexdigest(), 16) % len(COMPLETION_WORDS)
+    return [COMPLETION_WORDS[(offset + i) % len(COMPLETION_WORDS)] + " " for i in range(count)]
+
+def generate_batch_completion(prompt: str, max_tokens: int, completion_tokens: int) -> Optional[List[str]]:
+    """
+    JSON reply pieces for a structured batch prompt: a deterministic explanation
+    per listed scheme id, sharing max_tokens. None if the prompt is not a batch prompt.
+    """
+    scheme_ids = BATCH_ID_LINE.findall(prompt)
+    if BATCH_FORMAT_MARKER not in prompt or not scheme_ids:
+        return None
+    per_scheme = max(1, max_tokens // len(scheme_ids))
+    entries = [
+        {"id": scheme_id,
+         "explanation": "".join(generate_completion(f"{scheme_id}|{prompt}", per_scheme, completion_tokens)).strip()}
+        for scheme_id in scheme_ids
+    ]
+    return re.findall(r"\S+\s*", json.dumps({"explanations": entries}, ensure_ascii=False))
+
+def recognize_entities(text: str) -> List[Dict]:
+    """Cheap keyword/number based stand-in for general entity recognition."""
+    entities = []
+    for match in re.finditer(r"\w+", text):
+        word = match.group(0)
+        category = ENTITY_CATEGORIES.get(word.lower())
+        if category is None and word.isdigit():
+            category = "Quantity"
+        if category is None:
+            continue
+        entities.append({
+            "text": word,
+            "category": category,
+            "offset": match.start(),
+            "length": len(word),
+            "confidenceScore": 0.9
+        })
+    return entities
+
+class MockAzureHandler(BaseHTTPRequestHandler):
+    """Request handler; the server object carries config and stats."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # ---- helpers -----------------------------------------------------------
+
+    def send_json(self, status: int, payload: Dict, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status: int, code: str, message: str, headers: Optional[Dict[str, str]] = None):
+        self.send_json(status, {"error": {"code": code, "message": message}}, headers)
+
+    def read_json(self) -> Optional[Dict]:
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self.server.stats.add(rejected=1)
+            self.send_error_json(400, "InvalidRequest", "Request body is not valid JSON.")
+            return None
+
+    def authorized(self, header: str) -> bool:
+        expected = self.server.config.api_key
+        if expected is None or self.headers.get(header) == expected:
+            return True
+        self.server.stats.add(rejected=1)
+        self.send_error_json(401, "401", "Access denied due to invalid subscription key.")
+        return False
+
+    def injected_fault(self) -> bool:
+        """Reply with an injected 429/5xx if the dice say so."""
+        status = self.server.config.sample_fault()
+        if status is None:
+            return False
+        if status == 429:
+            self.server.stats.add(injected_429=1)
+            retry_after = self.server.config.retry_after
+            self.send_error_json(429, "429", "Requests to the deployment have exceeded the rate limit.",
+                                 {"Retry-After": str(int(retry_after)), "retry-after-ms": str(int(retry_after * 1000))})
+        else:
+            self.server.stats.add(injected_5xx=1)
+            self.send_error_json(status, "InternalServerError", "Injected server error.")
+        return True
+
+    # ---- routes ------------------------------------------------------------
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/health":
+            self.send_json(200, {"status": "ok"})
+        elif path == "/stats":
+            self.send_json(200, self.server.stats.snapshot())
+        else:
+            self.send_error_json(404, "NotFound", f"No route for GET {path}")
+
+    def do_HEAD(self):
+        # The app's warm-up pre-opens keep-alive connections with HEAD; answer like Azure does
+        self.send_response(404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/stats/reset":
+            self.server.stats.reset()
+            self.send_json(200, {"status": "reset"})
+            return
+
+        chat = CHAT_ROUTE.match(path)
+        entities = ENTITIES_ROUTE.match(path)
+        if not chat and not entities:
+            self.send_error_json(404, "NotFound", f"No route for POST {path}")
+            return
+
+        self.server.stats.enter()
+        try:
+            if chat:
+                self.handle_chat(chat.group("deployment"))
+            else:
+                self.handle_entities()
+        finally:
+            self.server.stats.leave()
+
+    def handle_chat(self, deployment: str):
+        if not self.authorized("api-key"):
+            return
+        body = self.read_json()
+        if body is None:
+            return
+
+        time.sleep(self.server.config.sample_latency())
+        if self.injected_fault():
+            return
+
+        prompt = " ".join(str(m.get("content", "")) for m in body.get("messages", []))
+        prompt_tokens = estimate_tokens(prompt)
+        max_tokens = int(body.get("max_tokens") or 16)
+        pieces = (generate_batch_completion(prompt, max_tokens, self.server.config.completion_tokens)
+                  or generate_completion(prompt, max_tokens, self.server.config.completion_tokens))
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(pieces),
+                 "total_tokens": prompt_tokens + len(pieces)}
+        self.server.stats.add(chat_requests=1, prompt_tokens=prompt_tokens, completion_tokens=len(pieces))
+
+        completion_id = f"chatcmpl-mock-{hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:12]}"
+        created = int(time.time())
+
+        if not body.get("stream"):
+            self.send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": deployment,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": "".join(pieces).strip()}}],
+                "usage": usage
+            })
+            return
+
+        self.server.stats.add(chat_streamed=1)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def send_event(payload):
+            data = f"data: {payload if isinstance(payload, str) else json.dumps(payload)}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+        def chunk(delta: Dict, finish_reason: Optional[str] = None) -> Dict:
+            return {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                    "model": deployment, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+
+        # Azure sends a content-filter preamble with an empty choices list first
+        send_event({"id": "", "object": "", "created": 0, "model": "", "choices": [],
+                    "prompt_filter_results": [{"prompt_index": 0, "content_filter_results": {}}]})
+        send_event(chunk({"role": "assistant"}))
+        for piece in pieces:
+            time.sleep(self.server.config.token_delay_ms / 1000)
+            send_event(chunk({"content": piece}))
+        send_event(chunk({}, "stop"))
+        send_event("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def handle_entities(self):
+        if not self.authorized("Ocp-Apim-Subscription-Key"):
+            return
+        body = self.read_json()
+        if body is None:
+            return
+
+        documents = body.get("documents") or []
+        if len(documents) > ENTITY_MAX_DOCUMENTS:
+            self.server.stats.add(rejected=1)
+            self.send_error_json(400, "InvalidDocumentBatch",
+                                 f"Batch request contains too many records. Max {ENTITY_MAX_DOCUMENTS} records are permitted.")
+            return
+
+        time.sleep(self.server.config.sample_latency())
+        if self.injected_fault():
+            return
+
+        results, errors = [], []
+        for doc in documents:
+            text = doc.get("text") or ""
+            if not text.strip():
+                errors.append({"id": doc.get("id"), "error": {"code": "InvalidArgument",
+                                                              "message": "Document text is empty."}})
+                continue
+            results.append({"id": doc.get("id"), "entities": recognize_entities(text), "warnings": []})
+
+        self.server.stats.add(entity_requests=1, entity_documents=len(documents))
+        self.send_json(200, {"documents": results, "errors": errors, "modelVersion": "mock-2021-06-01"})
+
+class MockAzureServer(ThreadingHTTPServer):
+    """Threaded server that stays quiet when load-test clients drop keep-alive connections."""
+
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+def start_server(config: MockAzureConfig, host: str = "127.0.0.1", port: int = 0,
+                 verbose: bool = False) -> Tuple[MockAzureServer, threading.Thread]:
+    """Start the stand-in on a daemon thread (port 0 picks a free port) for use from scripts."""
+    server = MockAzureServer((host, port), MockAzureHandler)
+    server.config = config
+    server.stats = MockAzureStats()
+    server.verbose = verbose
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, thread
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Azure OpenAI / Text Analytics stand-in for load testing.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Mean (or median for lognormal) response latency")
+    parser.add_argument("--latency-jitter-ms", type=float, default=50.0, help="Spread of the latency distribution")
+    parser.add_argument("--latency-distribution", choices=LATENCY_DISTRIBUTIONS, default="normal")
+    parser.add_argument("--token-delay-ms", type=float, default=15.0, help="Delay between streamed tokens")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="Fraction of requests answered with 500/502/503")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--completion-tokens", type=int, default=80, help="Tokens per completion (capped by max_tokens)")
+    parser.add_argument("--api-key", help="Require this key in api-key / Ocp-Apim-Subscription-Key headers")
+    parser.add_argument("--seed", type=int, help="Seed latency and fault injection for reproducible runs")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    config = MockAzureConfig(
+        latency_ms=args.latency_ms, latency_jitter_ms=args.latency_jitter_ms,
+        latency_distribution=args.latency_distribution, token_delay_ms=args.token_delay_ms,
+        rate_429=args.rate_429, rate_5xx=args.rate_5xx, retry_after=args.retry_after,
+        completion_tokens=args.completion_tokens, api_key=args.api_key, seed=args.seed
+    )
+    server, thread = start_server(config, args.host, args.port, args.verbose)
+    print(f"🧪 Mock Azure listening on http://{args.host}:{server.server_address[1]}")
+    print(f"   Set AZURE_OPENAI_ENDPOINT and AZURE_TEXTANALYTICS_ENDPOINT to this URL (Ctrl+C to stop)")
+    try:
+        thread.join()
+    except KeyboardInterrupt:
+        server.shutdown()
+        print("\n" + json.dumps(server.stats.snapshot(), indent=2))
+        sys.exit(0)
+
+if __name__ == "__main__":
+    main()
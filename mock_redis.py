@@ -0,0 +1,211 @@
+"""
+🏛️ SchemeMitra - Local Session Store Stand-in
+
+A small in-memory server speaking the Redis protocol (RESP2), with just the
+commands the app's RedisSessionStore uses. Several app replicas can share
+session state locally, or in tests, without installing Redis:
+
+    python mock_redis.py --port 6390
+    SCHEMEMITRA_SESSION_STORE=redis://127.0.0.1:6390/0 streamlit run app.py --server.port 8501
+    SCHEMEMITRA_SESSION_STORE=redis://127.0.0.1:6390/0 streamlit run app.py --server.port 8502
+
+Supported: PING, AUTH, SELECT, HSET, HGET, HGETALL, HDEL, DEL, EXISTS,
+EXPIRE, TTL, DBSIZE, FLUSHALL and INFO (command and connection counters).
+Keys expire lazily on access and on DBSIZE.
+"""
+
+import sys
+import time
+import argparse
+import threading
+from socketserver import ThreadingTCPServer, StreamRequestHandler
+from typing import Dict, List, Optional, Tuple
+
+class RespProtocolError(Exception):
+    """Malformed request from a client."""
+
+class MockRedisStore:
+    """Hashes per database with optional expiry, guarded by one lock."""
+
+    def __init__(self, password: Optional[str] = None):
+        self.password = password
+        self.databases: Dict[int, Dict[bytes, Dict[bytes, bytes]]] = {}
+        self.expiry: Dict[Tuple[int, bytes], float] = {}
+        self.commands = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    def db(self, index: int) -> Dict[bytes, Dict[bytes, bytes]]:
+        return self.databases.setdefault(index, {})
+
+    def live(self, index: int, key: bytes) -> Optional[Dict[bytes, bytes]]:
+        """Return the hash at key, dropping it first if it has expired."""
+        deadline = self.expiry.get((index, key))
+        if deadline is not None and time.time() >= deadline:
+            self.db(index).pop(key, None)
+            del self.expiry[(index, key)]
+        return self.db(index).get(key)
+
+class Error(str):
+    """An error reply."""
+
+class Status(str):
+    """A simple-string reply."""
+
+OK = Status("OK")
+
+def encode_reply(value) -> bytes:
+    if isinstance(value, Error):
+        return b"-" + value.encode("utf-8") + b"\r\n"
+    if isinstance(value, Status):
+        return b"+" + value.encode("utf-8") + b"\r\n"
+    if isinstance(value, int):
+        return b":" + str(value).encode() + b"\r\n"
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, bytes):
+        return b"$" + str(len(value)).encode() + b"\r\n" + value + b"\r\n"
+    if isinstance(value, list):
+        return b"*" + str(len(value)).encode() + b"\r\n" + b"".join(encode_reply(item) for item in value)
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+class MockRedisHandler(StreamRequestHandler):
+    """One client connection: read commands (pipelined or not) and answer in order."""
+
+    def read_command(self) -> Optional[List[bytes]]:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            # Inline command (e.g. typed into telnet)
+            return line.strip().split()
+        args = []
+        for _ in range(int(line[1:-2])):
+            header = self.rfile.readline()
+            if not header.startswith(b"$"):
+                raise RespProtocolError("expected bulk string")
+            length = int(header[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        store: MockRedisStore = self.server.store
+        self.db = 0
+        self.authenticated = store.password is None
+        with store.lock:
+            store.connections += 1
+        while True:
+            try:
+                command = self.read_command()
+            except (RespProtocolError, ValueError) as e:
+                self.wfile.write(encode_reply(Error(f"ERR Protocol error: {e}")))
+                return
+            except (ConnectionError, OSError):
+                return
+            if command is None:
+                return
+            if not command:
+                continue
+            with store.lock:
+                store.commands += 1
+                reply = self.execute(store, command[0].upper().decode("utf-8", "replace"), command[1:])
+            try:
+                self.wfile.write(encode_reply(reply))
+            except (ConnectionError, OSError):
+                return
+
+    def execute(self, store: MockRedisStore, name: str, args: List[bytes]):
+        if name == "AUTH":
+            if store.password is None:
+                return Error("ERR AUTH <password> called without any password configured for the default user")
+            if args and args[-1].decode("utf-8", "replace") == store.password:
+                self.authenticated = True
+                return OK
+            return Error("WRONGPASS invalid username-password pair or user is disabled.")
+        if not self.authenticated:
+            return Error("NOAUTH Authentication required.")
+        if name == "PING":
+            return Status("PONG") if not args else args[0]
+        if name == "SELECT":
+            self.db = int(args[0])
+            return OK
+        if name == "HSET":
+            if len(args) < 3 or len(args) % 2 == 0:
+                return Error("ERR wrong number of arguments for 'hset' command")
+            values = store.live(self.db, args[0])
+            if values is None:
+                values = store.db(self.db)[args[0]] = {}
+            added = 0
+            for field, value in zip(args[1::2], args[2::2]):
+                added += field not in values
+                values[field] = value
+            return added
+        if name == "HGET":
+            return (store.live(self.db, args[0]) or {}).get(args[1])
+        if name == "HGETALL":
+            values = store.live(self.db, args[0]) or {}
+            return [item for pair in values.items() for item in pair]
+        if name == "HDEL":
+            values = store.live(self.db, args[0]) or {}
+            return sum(values.pop(field, None) is not None for field in args[1:])
+        if name == "DEL":
+            removed = 0
+            for key in args:
+                removed += store.live(self.db, key) is not None
+                store.db(self.db).pop(key, None)
+                store.expiry.pop((self.db, key), None)
+            return removed
+        if name == "EXISTS":
+            return sum(store.live(self.db, key) is not None for key in args)
+        if name == "EXPIRE":
+            if store.live(self.db, args[0]) is None:
+                return 0
+            store.expiry[(self.db, args[0])] = time.time() + int(args[1])
+            return 1
+        if name == "TTL":
+            if store.live(self.db, args[0]) is None:
+                return -2
+            deadline = store.expiry.get((self.db, args[0]))
+            return -1 if deadline is None else max(0, int(deadline - time.time()))
+        if name == "DBSIZE":
+            return sum(store.live(self.db, key) is not None for key in list(store.db(self.db)))
+        if name == "FLUSHALL":
+            store.databases.clear()
+            store.expiry.clear()
+            return OK
+        if name == "INFO":
+            return f"# Stats\r\ntotal_commands_processed:{store.commands}\r\ntotal_connections_received:{store.connections}\r\n".encode()
+        return Error(f"ERR unknown command '{name.lower()}'")
+
+class MockRedisServer(ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+def start_server(host: str = "127.0.0.1", port: int = 0,
+                 password: Optional[str] = None) -> Tuple[MockRedisServer, threading.Thread]:
+    """Start the stand-in on a daemon thread (port 0 picks a free port) for use from scripts."""
+    server = MockRedisServer((host, port), MockRedisHandler)
+    server.store = MockRedisStore(password)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, thread
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Redis-protocol session store stand-in.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    parser.add_argument("--password", help="Require AUTH with this password")
+    args = parser.parse_args()
+
+    server, thread = start_server(args.host, args.port, args.password)
+    print(f"🧪 Mock session store listening on redis://{args.host}:{server.server_address[1]}/0")
+    print(f"   Set SCHEMEMITRA_SESSION_STORE to this URL (Ctrl+C to stop)")
+    try:
+        thread.join()
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"\n{server.store.commands} commands from {server.store.connections} connections")
+        sys.exit(0)
+
+if __name__ == "__main__":
+    main()
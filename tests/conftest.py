@@ -0,0 +1,28 @@
+"""
+Shared test set-up. The app reads its configuration at import time, so the
+environment is pinned here first: caches and lock files go to a temporary
+directory, Azure is left unconfigured and the background warm-up is off.
+"""
+
+import os
+import sys
+import logging
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_DIR = tempfile.mkdtemp(prefix="schememitra-tests-")
+
+os.environ.update({
+    "SCHEMEMITRA_CACHE_PATH": os.path.join(TEST_DIR, "explanations.sqlite3"),
+    "SCHEMEMITRA_SESSION_STORE": "memory",
+    "SCHEMEMITRA_BACKGROUND_WARMUP": "false",
+    "SCHEMEMITRA_METRICS_PORT": "0",
+    "AZURE_OPENAI_API_KEY": "",
+    "AZURE_OPENAI_ENDPOINT": "",
+    "AZURE_TEXTANALYTICS_KEY": "",
+    "AZURE_TEXTANALYTICS_ENDPOINT": "",
+})
+sys.path.insert(0, ROOT)
+
+# Importing the app outside `streamlit run` is supported ("bare mode"); silence its warnings
+logging.getLogger("streamlit").setLevel(logging.ERROR)
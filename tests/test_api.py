@@ -0,0 +1,228 @@
+"""Request validation of the headless API: client mistakes are 400s, never 500s."""
+
+import json
+import time
+import asyncio
+import threading
+
+import pytest
+from starlette.requests import Request
+
+import api
+
+def send(handler, payload=None, body=None, path_params=None):
+    """Run an endpoint handler on a synthetic request, inside the app's lifespan; returns the response."""
+    raw = body if body is not None else json.dumps(payload).encode("utf-8")
+
+    async def receive():
+        return {"type": "http.request", "body": raw, "more_body": False}
+
+    async def run():
+        async with api.lifespan(api.api):
+            scope = {"type": "http", "method": "POST", "path": "/", "query_string": b"", "headers": [],
+                     "path_params": path_params or {}, "app": api.api}
+            return await handler(Request(scope, receive))
+
+    return asyncio.run(run())
+
+def call(handler, payload=None, body=None, path_params=None):
+    """Like send(); returns (status, JSON body)."""
+    response = send(handler, payload, body, path_params)
+    return response.status_code, json.loads(response.body)
+
+@pytest.mark.parametrize("handler, payload, message", [
+    (api.explain, {"scheme_id": {"id": "pm001"}}, "'scheme_id' must be a string"),
+    (api.explain, {"scheme_id": ["pm001"]}, "'scheme_id' must be a string"),
+    (api.explain, {}, "'scheme_id' must be a string"),
+    (api.score, {"scheme_ids": [["pm001"]]}, "'scheme_ids' must be a list of strings"),
+    (api.score, {"scheme_ids": "pm001"}, "'scheme_ids' must be a non-empty list"),
+    (api.search, {"ranked": "false"}, "'ranked' must be true or false"),
+    (api.search, {"semantic": 1}, "'semantic' must be true or false"),
+    (api.search, {"limit": "5"}, "'limit' must be an integer"),
+    (api.search, {"offset": True}, "'offset' must be an integer"),
+    (api.search, {"query": 5}, "'query' must be a string"),
+    (api.search, {"profile": ["farmer"]}, "'profile' must be a string"),
+])
+def test_mistyped_fields_are_rejected(handler, payload, message):
+    assert call(handler, payload) == (400, {"error": message})
+
+@pytest.mark.parametrize("body", [b"[", b"[1, 2]", b'"text"'])
+def test_body_must_be_a_json_object(body):
+    status, response = call(api.search, body=body)
+    assert status == 400
+
+def test_unknown_scheme_is_404():
+    status, response = call(api.score, {"scheme_ids": ["pm001", "no-such-scheme"]})
+    assert status == 404
+
+def test_valid_search_and_score():
+    status, response = call(api.search, {"query": "kisan", "ranked": False, "semantic": None,
+                                         "limit": 2, "profile": "farmer"})
+    assert status == 200
+    assert len(response["results"]) <= 2
+    assert all("match_score" in scheme for scheme in response["results"])
+
+    scheme_id = api.current_catalog().schemes[0]['id']
+    status, response = call(api.score, {"scheme_ids": [scheme_id], "profile": "farmer"})
+    assert status == 200 and set(response["scores"]) == {scheme_id}
+
+def test_batch_reports_errors_per_operation(monkeypatch):
+    def broken(payload, catalog):
+        raise RuntimeError("kaboom")
+
+    monkeypatch.setitem(api.BATCH_OPERATIONS, "score", broken)
+    status, response = call(api.batch, {"requests": [
+        {"op": "score", "scheme_ids": ["pm001"]},
+        {"op": "search", "query": "loan", "limit": 1},
+        {"op": "explain", "scheme_id": ["pm001"]},
+        {"op": "nope"},
+        "not an object",
+    ]})
+    assert status == 200
+    first, second, third, fourth, fifth = response["responses"]
+    assert first == {"error": "Unexpected error: kaboom", "status": 500}
+    assert "results" in second
+    assert third == {"error": "'scheme_id' must be a string", "status": 400}
+    assert fourth["status"] == 400 and fifth["status"] == 400
+
+def test_batch_explain_failure_stays_in_its_entries(monkeypatch):
+    def broken(schemes, profile, catalog, max_in_flight):
+        raise RuntimeError("explainer down")
+
+    monkeypatch.setattr(api, "op_explain_batch", broken)
+    status, response = call(api.batch, {"requests": [
+        {"op": "explain", "scheme_id": "pm001"},
+        {"op": "search", "limit": 1},
+    ]})
+    assert status == 200
+    assert response["responses"][0] == {"error": "Unexpected error: explainer down", "status": 500}
+    assert "results" in response["responses"][1]
+
+def test_unexpected_errors_are_json_500s(monkeypatch):
+    def broken(payload, catalog):
+        raise RuntimeError("kaboom")
+
+    monkeypatch.setattr(api, "op_search", broken)
+    monkeypatch.setattr(api, "runs_blocking", lambda *args: False)
+    series = (api.API_REQUEST_METRIC, (("route", "/search"), ("status", "500")))
+
+    def failures():
+        histogram = api.schememitra.METRICS._histograms.get(series)
+        return histogram.count if histogram else 0
+
+    before = failures()
+    assert call(api.search, {"query": "kisan"}) == (500, {"error": "Unexpected error: kaboom"})
+    assert failures() == before + 1
+
+def test_batch_size_is_limited():
+    status, response = call(api.batch, {"requests": [{"op": "search"}] * (api.API_MAX_BATCH + 1)})
+    assert status == 400
+
+def test_explanations_from_a_batch_are_reported_as_cached():
+    catalog = api.current_catalog()
+    scheme = catalog.schemes[0]
+    cache = api.schememitra.get_explanation_cache(catalog)
+    key = api.schememitra.ExplanationCache.make_key(scheme, "api profile",
+                                                    prompt_version=api.schememitra.BATCH_PROMPT_VERSION)
+    cache.put(key, scheme, "from the batch")
+    response = api.op_explain(scheme, "api profile", catalog)
+    assert response["explanation"] == "from the batch" and response["cached"] is True
+    assert api.op_explain_batch([scheme], "api profile", catalog)[0]["cached"] is True
+
+@pytest.fixture
+def explanation(monkeypatch):
+    """Make every explanation call answer with the given text."""
+    answer = {}
+    monkeypatch.setattr(api.schememitra, "explain_eligibility", lambda *args, **kwargs: answer["text"])
+    monkeypatch.setattr(api.schememitra, "lookup_explanation", lambda *args, **kwargs: None)
+    return answer
+
+def test_busy_answer_is_503_with_retry_after(explanation):
+    explanation["text"] = api.schememitra.RATE_LIMITED_MESSAGE
+    response = send(api.explain, {"scheme_id": "pm001"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(api.API_BUSY_RETRY_AFTER)
+
+def test_upstream_failure_is_502_without_retry_after(explanation):
+    explanation["text"] = "⚠️ Error calling Azure OpenAI: 500 Server Error"
+    response = send(api.explain, {"scheme_id": "pm001"})
+    assert response.status_code == 502
+    assert "Retry-After" not in response.headers
+
+def test_busy_batch_entries_carry_retry_after(explanation, monkeypatch):
+    monkeypatch.setattr(api.schememitra, "EXPLANATION_BATCH_MODE", False)
+    explanation["text"] = api.schememitra.RATE_LIMITED_MESSAGE
+    status, response = call(api.batch, {"requests": [{"op": "explain", "scheme_id": "pm001"}]})
+    assert response["responses"] == [{"error": api.schememitra.RATE_LIMITED_MESSAGE, "status": 503,
+                                      "retry_after": api.API_BUSY_RETRY_AFTER}]
+
+def test_explain_slots_are_made_per_app_lifespan(explanation, monkeypatch):
+    # Waiting on a semaphore binds it to that event loop; each call() is a new loop and lifespan
+    monkeypatch.setattr(api.schememitra, "LLM_MAX_IN_FLIGHT", 1)
+    monkeypatch.setattr(api.schememitra, "EXPLANATION_BATCH_MODE", False)
+    explanation["text"] = "Eligible."
+    for _ in range(2):
+        status, response = call(api.batch, {"requests": [
+            {"op": "explain", "scheme_id": "pm001", "profile": "farmer"},
+            {"op": "explain", "scheme_id": "pm001", "profile": "weaver"},
+        ]})
+        assert [entry.get("explanation") for entry in response["responses"]] == ["Eligible.", "Eligible."]
+
+def test_batch_explanations_use_the_configured_concurrency(monkeypatch):
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def explain(*args, **kwargs):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return "Eligible."
+
+    monkeypatch.setattr(api.schememitra, "explain_eligibility", explain)
+    monkeypatch.setattr(api.schememitra, "lookup_explanation", lambda *args, **kwargs: None)
+    monkeypatch.setattr(api.schememitra, "LLM_MAX_IN_FLIGHT", 3)
+    monkeypatch.setattr(api.schememitra, "EXPLANATION_BATCH_MODE", False)
+    scheme_ids = [scheme['id'] for scheme in api.current_catalog().schemes[:6]]
+    # Two profiles run side by side and still share the process-wide limit
+    status, response = call(api.batch, {"requests": [
+        {"op": "explain", "scheme_id": scheme_id, "profile": profile}
+        for profile in ("farmer", "weaver") for scheme_id in scheme_ids
+    ]})
+    assert all(entry.get("explanation") == "Eligible." for entry in response["responses"])
+    assert peak[0] == 3
+
+def test_semantic_search_runs_off_the_event_loop(monkeypatch):
+    threads = []
+    for_schemes = api.schememitra.SemanticIndex.for_schemes
+
+    def record(schemes):
+        threads.append(threading.current_thread())
+        return for_schemes(schemes)
+
+    monkeypatch.setattr(api.schememitra.SemanticIndex, "for_schemes", record)
+    status, response = call(api.search, {"query": "loan for women", "semantic": True})
+    assert status == 200
+    status, response = call(api.batch, {"requests": [{"op": "search", "query": "farmer", "semantic": True}]})
+    assert "results" in response["responses"][0]
+    assert len(threads) == 2 and threading.main_thread() not in threads
+
+def test_keyword_search_stays_off_the_event_loop_until_the_index_is_built(monkeypatch):
+    schemes = list(api.schememitra.SCHEMES)
+    catalog = api.schememitra.catalog_for_schemes(schemes)
+    monkeypatch.setattr(api, "current_catalog", lambda: catalog)
+    threads = []
+    filter_schemes = api.schememitra.filter_schemes
+
+    def record(*args, **kwargs):
+        threads.append(threading.current_thread())
+        return filter_schemes(*args, **kwargs)
+
+    monkeypatch.setattr(api.schememitra, "filter_schemes", record)
+    assert not catalog.has_derived('search_index')
+    for _ in range(2):
+        status, response = call(api.search, {"query": "kisan"})
+        assert status == 200 and response["total"] > 0
+    assert threads[0] is not threading.main_thread()
+    assert threads[1] is threading.main_thread()
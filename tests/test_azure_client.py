@@ -0,0 +1,133 @@
+"""Retries wait at least as long as Azure's Retry-After; the token buckets pace requests."""
+
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from requests.structures import CaseInsensitiveDict
+
+import app
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def post(self, url, **kwargs):
+        self.calls += 1
+        return self.responses.pop(0)
+
+def client_with(responses, max_retries=3):
+    sleeps = []
+    client = app.AzureHttpClient(max_retries=max_retries, backoff_base=0.001, backoff_max=0.001,
+                                 sleep=sleeps.append)
+    client._session = FakeSession(responses)
+    return client, sleeps
+
+def test_retry_waits_for_retry_after_seconds():
+    client, sleeps = client_with([FakeResponse(429, {"Retry-After": "2"}), FakeResponse(200)])
+    assert client.post("https://example.invalid").status_code == 200
+    assert len(sleeps) == 1 and 2.0 <= sleeps[0] < 2.01
+
+def test_retry_after_ms_takes_precedence():
+    client, sleeps = client_with([FakeResponse(503, {"retry-after-ms": "1500", "Retry-After": "9"}),
+                                  FakeResponse(200)])
+    client.post("https://example.invalid")
+    assert 1.5 <= sleeps[0] < 1.51
+
+def test_retry_after_http_date():
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    delay = app.parse_retry_after(FakeResponse(429, {"Retry-After": format_datetime(when, usegmt=True)}))
+    assert 28 <= delay <= 30
+
+@pytest.mark.parametrize("headers", [{}, {"Retry-After": "soon"}, {"Retry-After": "-5"}])
+def test_missing_or_bad_retry_after(headers):
+    delay = app.parse_retry_after(FakeResponse(429, headers))
+    assert delay is None or delay == 0.0
+
+def test_retry_after_over_the_cap_returns_at_once():
+    client, sleeps = client_with([FakeResponse(429, {"Retry-After": "60"}), FakeResponse(200)])
+    client.max_retry_after = 10
+    assert client.post("https://example.invalid").status_code == 429
+    assert sleeps == [] and client.session.calls == 1
+    assert client.circuit_breaker.state == "closed"
+
+def test_throttled_half_open_trial_is_released_without_counting_a_failure():
+    client, sleeps = client_with([FakeResponse(500), FakeResponse(429, {"Retry-After": "60"}),
+                                  FakeResponse(429), FakeResponse(200)], max_retries=0)
+    client.max_retry_after = 10
+    client.circuit_breaker = app.CircuitBreaker(failure_threshold=1, reset_seconds=0)
+    assert client.post("https://example.invalid").status_code == 500
+    assert client.post("https://example.invalid").status_code == 429
+    assert client.post("https://example.invalid").status_code == 429
+    assert client.circuit_breaker._failures == 1
+    assert client.post("https://example.invalid").status_code == 200
+    assert client.circuit_breaker.state == "closed"
+
+def test_only_server_errors_open_the_circuit():
+    client, sleeps = client_with([FakeResponse(429)] * 3 + [FakeResponse(503)] * 2, max_retries=0)
+    client.circuit_breaker = app.CircuitBreaker(failure_threshold=2, reset_seconds=60)
+    for _ in range(3):
+        assert client.post("https://example.invalid").status_code == 429
+    assert client.circuit_breaker.state == "closed"
+    for _ in range(2):
+        assert client.post("https://example.invalid").status_code == 503
+    assert client.circuit_breaker.state == "open"
+    with pytest.raises(app.CircuitOpenError):
+        client.post("https://example.invalid")
+
+def test_unexpected_error_on_half_open_trial_releases_the_circuit():
+    client, sleeps = client_with([FakeResponse(500), FakeResponse(200)], max_retries=0)
+    client.circuit_breaker = app.CircuitBreaker(failure_threshold=1, reset_seconds=0)
+    assert client.post("https://example.invalid").status_code == 500
+    responses = client._session.responses
+    client._session.post = lambda url, **kwargs: (_ for _ in ()).throw(ValueError("bad body"))
+    with pytest.raises(ValueError):
+        client.post("https://example.invalid")
+    client._session = FakeSession(responses)
+    assert client.post("https://example.invalid").status_code == 200
+
+def test_throttled_call_reports_busy(monkeypatch):
+    client, sleeps = client_with([FakeResponse(429, {"Retry-After": "60"})])
+    monkeypatch.setattr(app, "AZURE_HTTP_CLIENT", client)
+    monkeypatch.setattr(app, "AZURE_OPENAI_API_KEY", "test")
+    monkeypatch.setattr(app, "AZURE_OPENAI_ENDPOINT", "https://example.invalid")
+    assert app.call_azure_openai("prompt", max_tokens=10) == app.RATE_LIMITED_MESSAGE
+    assert sleeps == []
+
+def test_gives_up_after_max_retries_and_returns_last_response():
+    responses = [FakeResponse(429, {"Retry-After": "1"}) for _ in range(3)]
+    client, sleeps = client_with(responses, max_retries=2)
+    assert client.post("https://example.invalid").status_code == 429
+    assert len(sleeps) == 2 and all(delay >= 1.0 for delay in sleeps)
+
+def test_non_retryable_status_is_returned_at_once():
+    client, sleeps = client_with([FakeResponse(400)])
+    assert client.post("https://example.invalid").status_code == 400
+    assert sleeps == []
+
+def test_token_bucket_paces_requests_per_minute():
+    now = [0.0]
+    limiter = app.TokenBucketRateLimiter(tokens_per_minute=0, requests_per_minute=60, clock=lambda: now[0])
+    for _ in range(60):
+        assert limiter.acquire(cost=10, timeout=0)
+    assert not limiter.acquire(cost=10, timeout=0)
+    now[0] += 1.0
+    assert limiter.acquire(cost=10, timeout=0)
+
+def test_token_bucket_charges_tokens():
+    now = [0.0]
+    limiter = app.TokenBucketRateLimiter(tokens_per_minute=600, requests_per_minute=0, clock=lambda: now[0])
+    assert limiter.acquire(cost=500, timeout=0)
+    assert not limiter.acquire(cost=200, timeout=0)
+    now[0] += 10.0
+    assert limiter.acquire(cost=200, timeout=0)
@@ -0,0 +1,60 @@
+"""Tests for the slotted scheme records and catalog snapshots."""
+
+import json
+
+import pytest
+
+import app
+
+def test_record_round_trips_known_and_extra_fields():
+    data = {'id': 'x1', 'name': 'Scheme', 'ministry': 'Finance', 'launched': 2015}
+    record = app.SchemeRecord(data)
+    assert dict(record) == data
+    assert record['launched'] == 2015
+    assert 'status' not in record
+
+def test_record_without_extra_fields_keeps_no_overflow_dict():
+    record = app.SchemeRecord({'id': 'x1', 'name': 'Scheme'})
+    assert record._extra is None
+    with pytest.raises(KeyError):
+        record['benefit']
+
+def test_record_is_read_only():
+    record = app.SchemeRecord({'id': 'x1'})
+    with pytest.raises(AttributeError):
+        record.name = 'Other'
+
+def test_reload_diffs_only_changed_schemes(tmp_path):
+    path = tmp_path / "schemes.json"
+    schemes = [{'id': f"s{i}", 'name': f"Scheme {i}"} for i in range(3)]
+    path.write_text(json.dumps({'schemes': schemes}), encoding='utf-8')
+    store = app.CatalogStore(str(path), check_seconds=3600)
+    # The first snapshot has nothing to diff against, so it is not fingerprinted
+    assert store.current()._fingerprints is None
+    assert store.current().changed_ids is None
+
+    schemes[1]['name'] = "Renamed"
+    schemes.append({'id': 's3', 'name': "New"})
+    path.write_text(json.dumps({'schemes': schemes}), encoding='utf-8')
+    assert store.refresh(force=True)
+    assert store.current().changed_ids == {'s1', 's3'}
+
+def test_warm_up_reports_ready_before_the_semantic_index_and_connections():
+    report = app.StartupReport(0.0)
+    catalog = app.SchemeCatalog(list(app.SCHEMES), version="v1")
+    seen = []
+
+    class RecordingClient:
+        def warm(self, urls, timeout):
+            seen.append((report.ready.is_set(), catalog.has_derived('semantic_index')))
+            return 0
+
+    warmup = app.CatalogWarmUp(report, RecordingClient(), background=False)
+    ready_at = []
+    mark_ready = report.mark_ready
+    report.mark_ready = lambda *args: (ready_at.append(catalog.has_derived('semantic_index')), mark_ready(*args))
+    warmup.ensure(catalog)
+
+    assert ready_at == [False]
+    assert all(catalog.has_derived(name) for name in ('search_index', 'keyword_matrix', 'prompt_contexts'))
+    assert seen == [(True, True)]
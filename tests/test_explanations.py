@@ -0,0 +1,78 @@
+"""Explanations cached by a batch call are reused by the single-scheme paths."""
+
+import os
+
+import pytest
+
+import app
+import mock_azure
+
+PROFILE = "30 years old, Farmers category"
+
+@pytest.fixture
+def cache(tmp_path):
+    return app.ExplanationCache(str(tmp_path / "explanations.sqlite3"))
+
+@pytest.fixture
+def no_azure(monkeypatch):
+    """Fail the test if anything tries to reach Azure OpenAI."""
+    def refuse(*args, **kwargs):
+        raise AssertionError("unexpected Azure OpenAI call")
+    monkeypatch.setattr(app, "call_azure_openai", refuse)
+    monkeypatch.setattr(app, "stream_azure_openai", refuse)
+
+def prime_batch_entry(cache, scheme, profile, text):
+    cache.put(app.ExplanationCache.make_key(scheme, profile, prompt_version=app.BATCH_PROMPT_VERSION), scheme, text)
+
+def test_explain_eligibility_reads_batch_entries(cache, no_azure):
+    scheme = app.SCHEMES[0]
+    prime_batch_entry(cache, scheme, PROFILE, "from the batch")
+    assert app.explain_eligibility(scheme, PROFILE, cache) == "from the batch"
+
+def test_streamed_explanation_reads_batch_entries(cache, no_azure):
+    scheme = app.SCHEMES[0]
+    prime_batch_entry(cache, scheme, PROFILE, "from the batch")
+    assert list(app.stream_eligibility_explanation(scheme, PROFILE, cache)) == ["from the batch"]
+
+def test_ab_entry_wins_over_batch_entry(cache, no_azure):
+    scheme = app.SCHEMES[0]
+    prime_batch_entry(cache, scheme, PROFILE, "from the batch")
+    cache.put(app.ExplanationCache.make_key(scheme, PROFILE), scheme, "from a single call")
+    assert app.lookup_explanation(scheme, PROFILE, cache) == "from a single call"
+
+def test_hits_write_their_access_time_only_once_it_is_stale(cache):
+    scheme = app.SCHEMES[0]
+    cache.put("key", scheme, "cached")
+    writes = cache._conn.total_changes
+    for _ in range(3):
+        assert cache.get("key") == "cached"
+    assert cache._conn.total_changes == writes
+
+    cache.touch_seconds = 0
+    assert cache.get("key") == "cached"
+    assert cache._conn.total_changes == writes + 1
+
+def test_reexpanding_a_batch_explained_card_makes_no_request(monkeypatch):
+    from streamlit.testing.v1 import AppTest
+
+    server, _ = mock_azure.start_server(mock_azure.MockAzureConfig(latency_ms=0, latency_jitter_ms=0))
+    try:
+        endpoint = f"http://127.0.0.1:{server.server_address[1]}"
+        monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", endpoint)
+        monkeypatch.setenv("AZURE_OPENAI_API_KEY", "test")
+
+        # The profile main() builds from the form defaults; the entry a batch call would have written
+        scheme = next(s for s in app.SCHEMES if s['id'] == "pm001")
+        profile = f"30 years old, {app.CATEGORY_NAMES[0]} category"
+        prime_batch_entry(app.get_explanation_cache(), scheme, profile, "Explained earlier in a batch.")
+
+        at = AppTest.from_file(os.path.join(os.path.dirname(app.__file__), "app.py"), default_timeout=60).run()
+        for _ in range(3):  # expand, collapse, expand again
+            at.button(key="finder_expand_pm001").click().run()
+            at.run()
+        assert not at.exception
+        assert "pm001" in at.session_state.expanded_schemes
+        assert any("Explained earlier in a batch." in info.value for info in at.info)
+        assert server.stats.snapshot()["chat_requests"] == 0
+    finally:
+        server.shutdown()
@@ -0,0 +1,77 @@
+"""Vectorized match scores must equal calculate_match_score for every scheme."""
+
+import sys
+import threading
+
+import numpy as np
+
+import app
+from benchmark import generate_catalog
+
+PROFILES = [
+    "", "General user", "30 years old, Farmers category", "45 years old, Women category, skills: tailoring",
+    "22 years old, Youth category, skills: student, software", "senior citizen", "FEMALE ENTREPRENEUR, msme",
+    "small business owner, old farmer, young girl",
+]
+
+def test_scores_match_scalar_on_shipped_catalog():
+    matrix = app.KeywordFeatureMatrix(app.SCHEMES)
+    for profile in PROFILES:
+        expected = [app.calculate_match_score(scheme, profile) for scheme in app.SCHEMES]
+        assert matrix.score(profile).tolist() == expected, profile
+
+def test_scores_match_scalar_on_synthetic_catalog():
+    schemes = generate_catalog(500, seed=3)
+    matrix = app.KeywordFeatureMatrix(schemes)
+    for profile in PROFILES:
+        expected = np.array([app.calculate_match_score(scheme, profile) for scheme in schemes])
+        assert np.array_equal(matrix.score(profile), expected), profile
+
+def test_get_match_score_uses_catalog_scores():
+    for profile in PROFILES:
+        for scheme in app.SCHEMES:
+            assert app.get_match_score(scheme, profile) == app.calculate_match_score(scheme, profile)
+
+def test_unknown_scheme_falls_back_to_scalar():
+    scheme = dict(app.SCHEMES[0], id="not-in-catalog", name="Women entrepreneur fund")
+    profile = "women entrepreneur"
+    assert app.get_match_score(scheme, profile) == app.calculate_match_score(scheme, profile)
+
+def test_incremental_matrix_matches_fresh():
+    schemes = generate_catalog(200, seed=5)
+    previous = app.KeywordFeatureMatrix(schemes)
+    changed = [dict(s) for s in schemes]
+    changed[10] = dict(changed[10], name="Scheme for senior women farmers")
+    changed.insert(0, dict(schemes[1], id="syn_new", beneficiary="Youth and students"))
+    derived = app.KeywordFeatureMatrix(changed, previous=previous, changed_ids={changed[11]['id'], "syn_new"})
+    fresh = app.KeywordFeatureMatrix(changed)
+    assert np.array_equal(derived.matrix, fresh.matrix)
+
+def test_scores_are_read_only():
+    scores = app.KeywordFeatureMatrix(app.SCHEMES).score("farmer")
+    assert not scores.flags.writeable
+
+def test_concurrent_scoring_evicts_safely():
+    matrix = app.KeywordFeatureMatrix(app.SCHEMES)
+    errors = []
+
+    def score_many(worker):
+        try:
+            for i in range(500):
+                matrix.score(f"farmer {worker}-{i}")
+        except Exception as e:
+            errors.append(e)
+
+    # Switch threads as often as possible so that evictions interleave
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=score_many, args=(worker,)) for worker in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert errors == []
+    assert len(matrix._profile_scores) <= matrix._MAX_CACHED_PROFILES
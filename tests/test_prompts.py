@@ -0,0 +1,32 @@
+"""Prompt builders use the precompiled contexts of the catalog the scheme came from."""
+
+import json
+
+import app
+
+def test_reloaded_catalog_uses_precompiled_contexts(tmp_path, monkeypatch):
+    path = tmp_path / "schemes.json"
+    schemes = [dict(s) for s in app.SCHEMES]
+    path.write_text(json.dumps({"schemes": schemes}), encoding="utf-8")
+    store = app.CatalogStore(str(path), check_seconds=3600)
+    # A hot reload, as a long-lived API process sees it
+    schemes[0]["benefit"] = "A changed benefit after the reload"
+    path.write_text(json.dumps({"schemes": schemes}), encoding="utf-8")
+    assert store.refresh(force=True)
+    monkeypatch.setattr(app, "get_catalog_store", lambda: store)
+    catalog = store.current()
+    contexts = catalog.derived('prompt_contexts', app.SchemePromptContexts)
+
+    compacted = []
+    compact = app.compact_scheme_context
+    monkeypatch.setattr(app, "compact_scheme_context", lambda scheme: compacted.append(scheme) or compact(scheme))
+    for scheme in catalog.schemes:
+        assert app.SchemePromptContexts.context_for(scheme) == contexts.get(scheme) == compact(scheme)
+    app.build_batch_explanation_prompt(catalog.schemes[:3], "farmer")
+    app.build_eligibility_request(catalog.schemes[0], "farmer", prompt_version="v2")
+    assert compacted == []
+    assert "A changed benefit after the reload" in app.SchemePromptContexts.context_for(catalog.schemes[0])
+
+def test_unknown_records_are_compacted_on_the_fly():
+    scheme = dict(app.SCHEMES[0], benefit="Not in any catalog")
+    assert app.SchemePromptContexts.context_for(scheme) == app.compact_scheme_context(scheme)
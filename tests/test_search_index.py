@@ -0,0 +1,136 @@
+"""The inverted index must answer exactly what the original linear scan did."""
+
+import math
+import time
+
+import pytest
+
+import app
+from benchmark import generate_catalog
+
+def linear_scan(schemes, search_query="", ministry_filter="All Ministries",
+                beneficiary_filter="All Types", category_filter="All Categories"):
+    """filter_schemes as it was before the index: substring match over four fields, catalog order."""
+    filtered = schemes.copy()
+    if search_query:
+        search_lower = search_query.lower()
+        filtered = [
+            s for s in filtered
+            if (search_lower in s['name'].lower() or
+                search_lower in s['description'].lower() or
+                search_lower in s['ministry'].lower() or
+                search_lower in s['beneficiary'].lower())
+        ]
+    if ministry_filter != "All Ministries":
+        filtered = [s for s in filtered if s['ministry'] == ministry_filter]
+    if beneficiary_filter != "All Types":
+        filtered = [s for s in filtered if s['beneficiary'] == beneficiary_filter]
+    if category_filter != "All Categories":
+        filtered = [s for s in filtered if s['category'] == category_filter]
+    return filtered
+
+QUERIES = [
+    "", "a", "kisan", "KISAN", "isa", "farmer", "farmers ", " farmer", "pradhan mantri",
+    "mantri kisan", "loan for", "women", "ministry of", "of", "yojana1", "-", "₹",
+    "rural development", "no such scheme anywhere", "e s", "  ",
+]
+
+@pytest.fixture(scope="module")
+def synthetic():
+    return generate_catalog(400, seed=7)
+
+def catalog_queries(schemes):
+    """QUERIES plus words, word fragments and phrases taken from the catalog itself."""
+    queries = list(QUERIES)
+    for scheme in schemes[:25]:
+        words = scheme['name'].split()
+        queries += [words[0], words[-1][1:4], " ".join(words[:2]), scheme['ministry'][-6:]]
+    return queries
+
+@pytest.mark.parametrize("catalog", ["shipped", "synthetic"])
+def test_queries_match_linear_scan(catalog, synthetic):
+    schemes = app.SCHEMES if catalog == "shipped" else synthetic
+    for query in catalog_queries(schemes):
+        assert app.filter_schemes(schemes, search_query=query) == linear_scan(schemes, query), query
+
+def test_facet_filters_match_linear_scan(synthetic):
+    scheme = synthetic[3]
+    combinations = [
+        {"ministry_filter": scheme['ministry']},
+        {"beneficiary_filter": scheme['beneficiary']},
+        {"category_filter": scheme['category']},
+        {"ministry_filter": scheme['ministry'], "category_filter": scheme['category']},
+        {"ministry_filter": "No Such Ministry"},
+    ]
+    for filters in combinations:
+        for query in ("", scheme['name'].split()[0], "zzz"):
+            assert app.filter_schemes(synthetic, search_query=query, **filters) == \
+                linear_scan(synthetic, query, **filters), (query, filters)
+
+def test_incremental_rebuild_matches_fresh_index(synthetic):
+    previous = app.SchemeSearchIndex(synthetic)
+    changed = [dict(s) for s in synthetic]
+    changed[0] = dict(changed[0], name="Completely Renamed Scheme", ministry="Ministry of Tests")
+    del changed[5]
+    changed.append(dict(synthetic[9], id="syn_new", description="A brand new entry about widgets."))
+    changed_ids = {changed[0]['id'], synthetic[5]['id'], "syn_new"}
+
+    derived = app.SchemeSearchIndex(changed, previous=previous, changed_ids=changed_ids)
+    fresh = app.SchemeSearchIndex(changed)
+    for query in catalog_queries(changed) + ["renamed", "widgets", "tests"]:
+        expected = [changed.index(s) for s in linear_scan(changed, query)]
+        assert derived.search(query) == fresh.search(query) == expected, query
+
+def test_ranked_mode_requires_every_word(synthetic):
+    words = synthetic[0]['name'].lower().split()[:2]
+    positions = app.SchemeSearchIndex(synthetic).search(" ".join(words), ranked=True)
+    assert 0 in positions
+    for pos in positions:
+        scheme = synthetic[pos]
+        text = " ".join(scheme[f] for f in app.SEARCH_FIELDS).lower()
+        assert all(word in text for word in words)
+
+def loop_bm25_ranking(index, terms, doc_ids):
+    """
+    Ranked order as BM25 was first scored: one posting entry at a time. Each
+    term's expansions are summed in sorted order and then added to the total,
+    as the index does, so equal scores come out bit-for-bit equal.
+    """
+    n_docs = len(index.schemes)
+    scores = dict.fromkeys(doc_ids, 0.0)
+    for term in terms:
+        term_scores = dict.fromkeys(doc_ids, 0.0)
+        for expanded in sorted(index.expand_term(term)):
+            posting = index.postings[expanded]
+            weight = 1.0 if expanded == term else 0.5
+            idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+            for doc_id in doc_ids.intersection(posting):
+                tf = posting[doc_id]
+                norm = tf + index.BM25_K1 * (1 - index.BM25_B + index.BM25_B * index.doc_lengths[doc_id] / index.avg_doc_length)
+                term_scores[doc_id] += weight * idf * tf * (index.BM25_K1 + 1) / norm
+        for doc_id in doc_ids:
+            scores[doc_id] += term_scores[doc_id]
+    return [index.positions[sid] for sid in sorted(doc_ids, key=lambda sid: (-scores[sid], index.positions[sid]))]
+
+def test_ranked_mode_matches_loop_scoring(synthetic):
+    index = app.SchemeSearchIndex(synthetic)
+    ministry = synthetic[3]['ministry']
+    for query in catalog_queries(synthetic):
+        terms = app.tokenize(query)
+        if not terms:
+            continue
+        doc_ids = index._candidates(terms)
+        assert index.search(query, ranked=True) == loop_bm25_ranking(index, terms, doc_ids), query
+        with_facet = doc_ids & index.facets['ministry'][ministry]
+        assert index.search(query, ministry=ministry, ranked=True) == \
+            loop_bm25_ranking(index, terms, with_facet), query
+
+def test_ranked_short_terms_stay_fast():
+    # Short and common terms expand to much of the vocabulary and match nearly every scheme
+    index = app.SchemeSearchIndex(generate_catalog(20000, seed=3))
+    for query in ("a", "e", "of", "yojana1"):
+        index.search(query, ranked=True)
+        start = time.perf_counter()
+        for _ in range(5):
+            index.search(query, ranked=True)
+        assert (time.perf_counter() - start) / 5 < 0.05, query
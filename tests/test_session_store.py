@@ -0,0 +1,111 @@
+"""Persisted session state survives a write and a load through every local backend."""
+
+import os
+
+import pytest
+
+import app
+import mock_redis
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        yield app.MemorySessionStore()
+    elif request.param == "sqlite":
+        yield app.SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"))
+    else:
+        server, _ = mock_redis.start_server()
+        try:
+            yield app.RedisSessionStore(f"redis://127.0.0.1:{server.server_address[1]}/0")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+STATE = {
+    'bookmarked_schemes': {"pm001", "mudra001"},
+    'expanded_schemes': set(),
+    'language': "hi",
+    'last_user_profile': "52 years old, Women category, skills: weaving",
+    'profile_age': 52,
+    'profile_category': "Women",
+    'profile_skills': "weaving",
+}
+
+def test_every_persisted_key_is_covered():
+    assert set(STATE) == set(app.PERSISTED_SESSION_KEYS)
+
+def test_round_trip_through_write_buffer(backend):
+    store = app.SessionWriteBuffer(backend, flush_seconds=0)
+    store.put("session-a", {key: app.encode_session_value(value) for key, value in STATE.items()})
+    loaded = app.SessionWriteBuffer(backend, flush_seconds=0).load("session-a")
+    assert {key: app.decode_session_value(key, raw) for key, raw in loaded.items()} == STATE
+
+def test_later_writes_update_single_fields(backend):
+    store = app.SessionWriteBuffer(backend, flush_seconds=0)
+    store.put("session-a", {'language': app.encode_session_value("hi"), 'profile_age': "30"})
+    store.put("session-a", {'language': app.encode_session_value("en")})
+    assert backend.load("session-a") == {'language': '"en"', 'profile_age': "30"}
+    assert backend.load("session-b") == {}
+
+def test_unflushed_writes_are_visible_to_loads(backend):
+    store = app.SessionWriteBuffer(backend, flush_seconds=3600)
+    store.put("session-a", {'language': '"hi"'})
+    assert backend.load("session-a") == {}
+    assert store.load("session-a") == {'language': '"hi"'}
+    assert store.flush() == 1
+    assert backend.load("session-a") == {'language': '"hi"'}
+
+def test_expired_sessions_are_not_loaded(backend):
+    backend.ttl_seconds = -1
+    backend.save_many({"session-a": {'language': '"hi"'}})
+    assert backend.load("session-a") == {}
+
+def test_redis_store_authenticates_selects_and_reconnects():
+    server, _ = mock_redis.start_server(password="s3cret")
+    try:
+        store = app.RedisSessionStore(f"redis://:s3cret@127.0.0.1:{server.server_address[1]}/2")
+        store.save_many({"session-a": {'language': '"hi"'}, "session-b": {'profile_age': "30"}})
+        assert 2 in server.store.databases and not server.store.databases.get(0)
+        # A dropped connection is reopened (with AUTH and SELECT again) on the next call
+        store._sock.close()
+        assert store.load("session-a") == {'language': '"hi"'}
+        assert store.load("session-b") == {'profile_age': "30"}
+    finally:
+        server.shutdown()
+        server.server_close()
+
+@pytest.mark.parametrize("key, raw", [
+    ('profile_age', '"52"'),
+    ('profile_age', 'true'),
+    ('language', '1'),
+    ('profile_skills', 'null'),
+    ('bookmarked_schemes', '"pm001"'),
+])
+def test_decode_rejects_wrong_types(key, raw):
+    with pytest.raises(TypeError):
+        app.decode_session_value(key, raw)
+
+def test_store_errors_degrade_to_an_empty_session():
+    class Broken:
+        def load(self, session_id):
+            raise ConnectionError("store down")
+
+        def save_many(self, updates):
+            raise ConnectionError("store down")
+
+    store = app.SessionWriteBuffer(Broken(), flush_seconds=3600)
+    assert store.load("session-a") == {}
+    assert "store down" in store.error
+    store.put("session-a", {'language': '"hi"'})
+    assert store.flush() == 0
+    assert store.load("session-a") == {'language': '"hi"'}
+
+def test_a_session_id_in_the_url_is_dropped_not_adopted():
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(os.path.dirname(app.__file__), "app.py"), default_timeout=60)
+    at.query_params[app.LEGACY_SESSION_ID_PARAM] = "from-a-shared-link-0123"
+    at.run()
+    assert not at.exception
+    assert app.LEGACY_SESSION_ID_PARAM not in at.query_params
+    assert at.session_state._session_id != "from-a-shared-link-0123"
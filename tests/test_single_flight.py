@@ -0,0 +1,107 @@
+"""Identical concurrent explanation requests share one call."""
+
+import os
+import threading
+
+import pytest
+
+import app
+
+def run_concurrently(count, target):
+    results = [None] * count
+    def worker(i):
+        results[i] = target()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+class CountingSingleFlight(app.SingleFlight):
+    """Signals every join, so a test can hold the leader until all callers have arrived."""
+
+    def __init__(self):
+        super().__init__()
+        self.joined = threading.Semaphore(0)
+
+    def join(self, key):
+        result = super().join(key)
+        self.joined.release()
+        return result
+
+def test_concurrent_callers_share_one_call():
+    group = CountingSingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        release.wait(5)
+        return "explanation"
+
+    threads, results = run_concurrently(8, lambda: group.do("key", work, timeout=5))
+    for _ in range(8):
+        assert group.joined.acquire(timeout=5)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert [result for result, _ in results] == ["explanation"] * 8
+    assert sum(shared for _, shared in results) == 7
+    assert len(group) == 0
+
+def test_followers_receive_the_leaders_exception():
+    group = app.SingleFlight()
+    flight, leader = group.join("key")
+    assert leader
+    follower = group.join("key")
+    assert follower == (flight, False)
+    group.finish("key", flight, error=ValueError("boom"))
+    with pytest.raises(ValueError):
+        flight.wait(1)
+
+def test_nothing_is_remembered_after_a_call():
+    group = app.SingleFlight()
+    assert group.do("key", lambda: 1) == (1, False)
+    assert group.do("key", lambda: 2) == (2, False)
+
+@pytest.fixture
+def cache(tmp_path):
+    return app.ExplanationCache(str(tmp_path / "explanations.sqlite3"))
+
+def test_timed_out_follower_reports_busy(cache, monkeypatch):
+    monkeypatch.setattr(app, "SINGLE_FLIGHT_TIMEOUT_SECONDS", 0.05)
+    scheme = app.SCHEMES[0]
+    cache_key = app.ExplanationCache.make_key(scheme, "farmer")
+    flight, leader = app.SINGLE_FLIGHT.join(cache_key)
+    assert leader
+    try:
+        assert app.explain_eligibility(scheme, "farmer", cache) == app.RATE_LIMITED_MESSAGE
+    finally:
+        app.SINGLE_FLIGHT.finish(cache_key, flight, "leader result")
+
+def test_timed_out_follower_serves_a_result_cached_meanwhile(cache, monkeypatch):
+    monkeypatch.setattr(app, "SINGLE_FLIGHT_TIMEOUT_SECONDS", 0.3)
+    scheme = app.SCHEMES[1]
+    cache_key = app.ExplanationCache.make_key(scheme, "farmer")
+    flight, leader = app.SINGLE_FLIGHT.join(cache_key)
+    assert leader
+    # Another process's leader writes the shared cache while this one is still running
+    writer = threading.Timer(0.05, cache.put, args=(cache_key, scheme, "cached explanation"))
+    writer.start()
+    try:
+        assert app.explain_eligibility(scheme, "farmer", cache) == "cached explanation"
+    finally:
+        writer.join()
+        app.SINGLE_FLIGHT.finish(cache_key, flight, "leader result")
+
+@pytest.mark.skipif(app.fcntl is None, reason="lock files need fcntl")
+def test_cross_process_lock_is_exclusive(tmp_path):
+    lock_dir = str(tmp_path / "locks")
+    key = "ab" * 32
+    with app.cross_process_lock(key, lock_dir=lock_dir) as first:
+        assert first
+        # flock locks belong to the open file, so a second handle in this process contends too
+        with app.cross_process_lock(key, lock_dir=lock_dir, timeout=0.1) as second:
+            assert not second
+    assert os.listdir(lock_dir)